@@ -1,6 +1,7 @@
 /**
  * Main JavaScript file for the example site
- * Handles dark/light mode toggle, lazy loading, and other client-side functionality
+ * Handles dark/light mode toggle, code copy buttons, and other client-side functionality.
+ * Lazy loading, external link attributes and code block wrappers are added at build time.
  */
 
 /**
@@ -17,9 +18,7 @@ function buildUrl(baseUrl, ...pathSegments) {
 document.addEventListener('DOMContentLoaded', function() {
   // Initialize components
   initDarkModeToggle();
-  initLazyLoading();
-  enhanceCodeBlocks();
-  initExternalLinks();
+  initCodeCopyButtons();
   initInfiniteScroll();
   initShareCopyButtons();
   initShareMenuToggle();
@@ -130,55 +129,15 @@ function initDarkModeToggle() {
 }
 
 /**
- * Initialize lazy loading for images and iframes
+ * Wire up the copy buttons the build adds to code blocks
  */
-function initLazyLoading() {
-  // Use native lazy loading if supported by the browser
-  if ('loading' in HTMLImageElement.prototype) {
-    const lazyImages = document.querySelectorAll('img[data-src]');
-    lazyImages.forEach(img => {
-      img.src = img.dataset.src;
-    });
-  } else {
-    // Fallback using IntersectionObserver for older browsers
-    const lazyImages = document.querySelectorAll('img[data-src]');
-    
-    if ('IntersectionObserver' in window) {
-      const imageObserver = new IntersectionObserver((entries, observer) => {
-        entries.forEach(entry => {
-          if (entry.isIntersecting) {
-            const img = entry.target;
-            img.src = img.dataset.src;
-            observer.unobserve(img);
-          }
-        });
-      });
-      
-      lazyImages.forEach(img => imageObserver.observe(img));
-    } else {
-      // Ultimate fallback: load all images immediately
-      lazyImages.forEach(img => {
-        img.src = img.dataset.src;
-      });
-    }
-  }
-}
+function initCodeCopyButtons() {
+  const copyButtons = document.querySelectorAll('.code-block .copy-button');
 
-/**
- * Enhance code blocks with copy button
- */
-function enhanceCodeBlocks() {
-  const codeBlocks = document.querySelectorAll('pre code');
-  
-  codeBlocks.forEach(block => {
-    const pre = block.parentNode;
-    const copyButton = document.createElement('button');
-    copyButton.className = 'copy-button';
-    copyButton.textContent = 'Copy';
-    
+  copyButtons.forEach(copyButton => {
     copyButton.addEventListener('click', function() {
-      const code = block.textContent;
-      navigator.clipboard.writeText(code).then(() => {
+      const block = copyButton.closest('.code-block').querySelector('pre code');
+      navigator.clipboard.writeText(block.textContent).then(() => {
         copyButton.textContent = 'Copied!';
         setTimeout(() => { copyButton.textContent = 'Copy'; }, 2000);
       }).catch(err => {
@@ -187,48 +146,6 @@ function enhanceCodeBlocks() {
         setTimeout(() => { copyButton.textContent = 'Copy'; }, 2000);
       });
     });
-    
-    pre.style.position = 'relative';
-    copyButton.style.position = 'absolute';
-    copyButton.style.right = '5px';
-    copyButton.style.top = '5px';
-    copyButton.style.padding = '3px 10px';
-    copyButton.style.fontSize = '12px';
-    copyButton.style.backgroundColor = 'var(--color-background)';
-    copyButton.style.border = '1px solid var(--color-border)';
-    copyButton.style.borderRadius = '4px';
-    copyButton.style.cursor = 'pointer';
-    copyButton.style.opacity = '0.7';
-    
-    copyButton.addEventListener('mouseenter', function() {
-      this.style.opacity = '1';
-    });
-    
-    copyButton.addEventListener('mouseleave', function() {
-      this.style.opacity = '0.7';
-    });
-    
-    pre.appendChild(copyButton);
-  });
-}
-
-/**
- * Add noopener and noreferrer to external links
- */
-function initExternalLinks() {
-  const links = document.querySelectorAll('a[href^="http"]');
-  
-  links.forEach(link => {
-    if (!link.hasAttribute('rel')) {
-      link.setAttribute('rel', 'noopener noreferrer');
-    } else if (!link.getAttribute('rel').includes('noopener')) {
-      link.setAttribute('rel', link.getAttribute('rel') + ' noopener noreferrer');
-    }
-    
-    // Open external links in new tab if not already specified
-    if (!link.hasAttribute('target')) {
-      link.setAttribute('target', '_blank');
-    }
   });
 }
 
@@ -0,0 +1,136 @@
+"""
+Persistent build cache shared by straightshot's caching layers.
+
+Entries are pickled into `<cache_dir>/<namespace>/` and are only returned when they
+were stored under the same key and input fingerprint. The cache is best-effort:
+unreadable or stale entries are treated as misses.
+"""
+
+import hashlib
+import logging
+import os
+import pickle  # noqa: S403 - only reads files written by straightshot itself
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Any
+
+from straightshot.models import CacheStats
+
+DEFAULT_CACHE_DIR_NAME = ".straightshot-cache"
+CACHE_FORMAT_VERSION = 1
+
+
+def compute_file_fingerprint(file_path: Path) -> tuple[int, int]:
+    """Return the (mtime in ns, size) pair used to detect changed input files."""
+    stat = file_path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_entry_path(cache_dir: Path, namespace: str, key: str) -> Path:
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return cache_dir / namespace / f"{digest}.pickle"
+
+
+def load_cache_entry(
+    cache_dir: Path | None, namespace: str, key: str, fingerprint: Any
+) -> Any | None:
+    """Load a cached value, or None if it is missing or was stored for other inputs."""
+    if cache_dir is None:
+        return None
+    entry_path = _get_entry_path(cache_dir, namespace, key)
+    try:
+        with open(entry_path, "rb") as f:
+            version, stored_key, stored_fingerprint, value = pickle.load(f)  # noqa: S301
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.getLogger(__name__).debug(
+            f"Ignoring unreadable cache entry {entry_path}: {e}"
+        )
+        return None
+    if (
+        version != CACHE_FORMAT_VERSION
+        or stored_key != key
+        or stored_fingerprint != fingerprint
+    ):
+        return None
+    return value
+
+
+def save_cache_entry(
+    cache_dir: Path | None, namespace: str, key: str, fingerprint: Any, value: Any
+) -> None:
+    """Store a value for the given key and input fingerprint."""
+    if cache_dir is None or value is None:
+        return
+    entry_path = _get_entry_path(cache_dir, namespace, key)
+    temp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as f:
+            pickle.dump(
+                (CACHE_FORMAT_VERSION, key, fingerprint, value),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        temp_path.replace(entry_path)
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"Could not write cache entry {key}: {e}")
+        temp_path.unlink(missing_ok=True)
+
+
+class MemoCache:
+    """
+    Thread-safe in-process LRU memo with hit/miss counters.
+
+    The entries can be loaded from and saved to the build cache so that the memo
+    survives between builds. Keys must encode everything the value depends on.
+    """
+
+    def __init__(self, name: str, max_entries: int) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the memoized value for a key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Memoize a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def load(self, cache_dir: Path | None) -> None:
+        """Load previously saved entries from the build cache and reset the counters."""
+        entries = load_cache_entry(cache_dir, "memo", self.name, self.max_entries)
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            if entries is not None:
+                self._entries = OrderedDict(entries)
+
+    def save(self, cache_dir: Path | None) -> None:
+        """Save the current entries to the build cache."""
+        with self._lock:
+            entries = list(self._entries.items())
+        save_cache_entry(cache_dir, "memo", self.name, self.max_entries, entries)
+
+    def compute_stats(self) -> CacheStats:
+        """Return the hit/miss counters of this memo."""
+        return CacheStats(hits=self.hits, misses=self.misses)
@@ -4,33 +4,88 @@ Core site building functionality for straightshot.
 
 import logging
 import time
+from collections.abc import Callable, Mapping, Sequence
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 import jinja2
 
+from straightshot.build_cache import MemoCache
+from straightshot.caching_headers import write_caching_config
 from straightshot.content_processor import (
     collect_site_languages,
     link_alternate_languages,
     load_content_files,
+    render_content_markdown,
     validate_content,
 )
-from straightshot.custom_tags import process_custom_tags
+from straightshot.custom_tags import find_tag_templates, process_custom_tags
+from straightshot.deploy_manifest import process_deploy_manifest
+from straightshot.highlighting import get_code_highlighter
+from straightshot.html_enhancements import enhance_page_html
+from straightshot.image_dimensions import (
+    IMAGE_DIMENSIONS_CACHE_NAME,
+    IMAGE_DIMENSIONS_CACHE_SIZE,
+    ImageDimensionReader,
+)
+from straightshot.memory_profile import MemoryProfiler, write_memory_profile
+from straightshot.metrics import compute_directory_size, get_metrics_collector
 from straightshot.models import (
     BuildResult,
+    BuildVariant,
     ContentFile,
     ContentProcessingConfig,
+    RenderedPage,
     SiteContext,
+    StandalonePageConfig,
 )
+from straightshot.output_archive import OutputArchive
 from straightshot.output_writer import (
+    BoundedPageWriter,
+    OutputTarget,
     copy_static_assets,
     write_json_file,
     write_rendered_page,
 )
+from straightshot.resource_hints import generate_resource_hints
+from straightshot.scheduler import DEFAULT_STAGE_WORKERS, BuildStage, run_build_stages
+from straightshot.sharding import compute_shard_slice, write_shard_manifest
+from straightshot.site_snapshot import restore_site_snapshot, store_site_snapshot
+from straightshot.syntax_css import (
+    SYNTAX_CLASSES_CACHE_NAME,
+    SYNTAX_CLASSES_CACHE_SIZE,
+    compute_site_token_classes,
+    create_syntax_stylesheet,
+    has_highlighted_code,
+    render_with_syntax_stylesheet,
+)
+from straightshot.template_analysis import (
+    create_analysis_environment,
+    find_article_html_reads,
+    find_markdown_includes,
+    report_template_budgets,
+)
+from straightshot.template_dependencies import (
+    RenderTracker,
+    report_render_reasons,
+    save_render_manifest,
+)
 from straightshot.templating import (
+    ARTICLE_TEMPLATE,
+    MARKDOWN_CACHE_NAME,
+    MARKDOWN_CACHE_SIZE,
     create_jinja_environment,
     render_template,
 )
+from straightshot.variants import (
+    compute_variant_content,
+    compute_variant_content_dirs,
+    merge_variant_result,
+)
+
+# Transforms a fully rendered page before it is written
+PagePostProcessor = Callable[[str], str]
 
 
 def build_template_context(
@@ -41,65 +96,186 @@ def build_template_context(
     return context
 
 
+def get_content_page_path(content_file: ContentFile) -> Path:
+    """Return the output path of a content file's page."""
+    return Path("content") / f"{content_file.slug}.html"
+
+
+def create_page_post_processors(
+    site_context: SiteContext, image_reader: ImageDimensionReader | None = None
+) -> list[PagePostProcessor]:
+    """
+    Return the post-processors the site applies to its rendered HTML pages.
+
+    With an image reader, images on the pages are sized from their files.
+    """
+    if not site_context.html_enhancements:
+        return []
+    image_size = image_reader.get_dimensions if image_reader else None
+    return [partial(enhance_page_html, image_size=image_size)]
+
+
+def post_process_page(
+    page: RenderedPage, post_processors: Sequence[PagePostProcessor]
+) -> None:
+    """Run a rendered page through the post-processors, if it is an HTML page."""
+    if page.relative_path.suffix != ".html":
+        return
+    for post_process in post_processors:
+        page.content = post_process(page.content)
+
+
+def render_content_page(
+    env: jinja2.Environment,
+    site_context: SiteContext,
+    build_result: BuildResult,
+    content_file: ContentFile,
+) -> RenderedPage | None:
+    """Run a content file through custom tags and the article template."""
+    logger = logging.getLogger(__name__)
+    logger.debug(f"Processing content file: {content_file.path}")
+
+    # Process custom tags first, passing the Jinja environment
+    content_file.html = process_custom_tags(
+        content_file.html,
+        env,
+        site_context,
+        build_result,
+    )
+    resource_hints = generate_resource_hints(site_context, content_file)
+    try:
+        # Only pages with code load the syntax stylesheet
+        rendered_html = render_with_syntax_stylesheet(
+            site_context,
+            lambda syntax_stylesheet: render_template(
+                env,
+                ARTICLE_TEMPLATE,
+                build_template_context(
+                    site_context,
+                    page=content_file,
+                    syntax_stylesheet=syntax_stylesheet,
+                    resource_hints=resource_hints,
+                ),
+            ),
+            has_highlighted_code(content_file.html),
+        )
+        return RenderedPage(
+            relative_path=get_content_page_path(content_file),
+            content=rendered_html,
+        )
+    except jinja2.TemplateNotFound as e:
+        error_msg = f"Template not found for content file {content_file.path}: {e}"
+    except jinja2.TemplateSyntaxError as e:
+        error_msg = f"Template syntax error in article.html at line {e.lineno} (processing {content_file.path}): {e.message}"
+    except jinja2.TemplateRuntimeError as e:
+        error_msg = f"Template runtime error in article.html (processing {content_file.path}): {e.message}"
+    except Exception as e:
+        error_msg = f"Error rendering template for {content_file.path}: {e}"
+    logger.error(error_msg)
+    build_result.errors.append(error_msg)
+    build_result.success = False
+    return None
+
+
+def _render_page_markdown(content_file: ContentFile, build_result: BuildResult) -> bool:
+    """Render a content file's markdown right before its page, if it was deferred."""
+    try:
+        content_file.html = render_content_markdown(content_file)
+    except Exception as e:
+        build_result.errors.append(f"Error processing {content_file.path}: {e}")
+        build_result.success = False
+        return False
+    return True
+
+
+def _record_page_templates(
+    render_tracker: RenderTracker | None,
+    reason: str | None,
+    site_context: SiteContext,
+    content_file: ContentFile,
+    build_result: BuildResult,
+) -> None:
+    """Record the templates a re-rendered content page depends on."""
+    if render_tracker is None or reason is None:
+        return
+    tag_templates = find_tag_templates(content_file.html, site_context.custom_tags)
+    render_tracker.record_page(
+        get_content_page_path(content_file).as_posix(),
+        [ARTICLE_TEMPLATE, *tag_templates],
+        reason,
+        build_result,
+    )
+
+
 def process_content(
     env: jinja2.Environment,
     site_context: SiteContext,
     content_config: ContentProcessingConfig,
     build_result: BuildResult,
     content_files: list[ContentFile],
+    post_processors: Sequence[PagePostProcessor] = (),
+    output: OutputTarget | None = None,
+    render_tracker: RenderTracker | None = None,
+    release_html: bool = True,
 ) -> None:
-    """Process and render content files."""
+    """
+    Render content files through a bounded render -> post-process -> write pipeline.
+
+    Rendered pages are run through `post_processors` and handed to a pool of `content_config.write_workers` writer
+    threads that keeps at most `content_config.render_window` pages in flight, so
+    writes overlap with rendering. If the content was loaded without rendering
+    markdown (the default), each file's markdown is rendered right before its
+    page, and with `release_html` its HTML is released once the page has been
+    rendered: only the pages inside the window are then held in memory. Markdown
+    rendered while loading keeps every article's HTML in memory until its page
+    is rendered. Pages are written to `output`, which defaults to the output
+    directory. With a render tracker, pages whose inputs and templates are
+    unchanged since the previous build are kept.
+    """
     logger = logging.getLogger(__name__)
     logger.info(f"Rendering {len(content_files)} content files...")
+    metrics = get_metrics_collector()
 
-    for content_file in content_files:
-        logger.debug(f"Processing content file: {content_file.path}")
-
-        # Process custom tags first, passing the Jinja environment
-        content_file.html = process_custom_tags(
-            content_file.html,
-            env,
-            site_context,
-            build_result,
-        )
-        try:
-            rendered_html = render_template(
-                env,
-                "article.html",
-                build_template_context(site_context, page=content_file),
-            )
-            relative_output_path = Path("content") / f"{content_file.slug}.html"
-            if not write_rendered_page(
-                content_config.output_dir,
-                relative_output_path,
-                rendered_html,
-                build_result,
+    with BoundedPageWriter(
+        output or content_config.output_dir,
+        content_config.render_window,
+        build_result,
+        content_config.write_workers,
+    ) as writer:
+        for content_file in content_files:
+            relative_path = get_content_page_path(content_file).as_posix()
+            reason = None
+            if render_tracker is not None:
+                reason = render_tracker.compute_render_reason(relative_path)
+                if reason is None:
+                    render_tracker.keep_page(relative_path, build_result)
+                    if release_html:
+                        content_file.html = ""
+                    continue
+            page_start = time.perf_counter()
+            if not content_config.render_markdown and not _render_page_markdown(
+                content_file, build_result
             ):
-                build_result.success = False
-        except jinja2.TemplateNotFound as e:
-            error_msg = f"Template not found for content file {content_file.path}: {e}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
-        except jinja2.TemplateSyntaxError as e:
-            error_msg = f"Template syntax error in article.html at line {e.lineno} (processing {content_file.path}): {e.message}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
-        except jinja2.TemplateRuntimeError as e:
-            error_msg = f"Template runtime error in article.html (processing {content_file.path}): {e.message}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
-        except Exception as e:
-            error_msg = f"Error rendering template for {content_file.path}: {e}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
+                continue
+            _record_page_templates(
+                render_tracker, reason, site_context, content_file, build_result
+            )
+            page = render_content_page(env, site_context, build_result, content_file)
+            if release_html:
+                content_file.html = ""
+            if page is None:
+                continue
+            post_process_page(page, post_processors)
+            metrics.record_page_render(
+                page.relative_path.as_posix(), time.perf_counter() - page_start
+            )
+            writer.submit(page)
+    if writer.failed:
+        build_result.success = False
 
 
-def _generate_article_index_data(
-    env: jinja2.Environment, content_files: list[ContentFile]
+def generate_article_index_data(
+    content_files: list[ContentFile],
 ) -> list[dict[str, Any]]:
     """Generates the list of dictionaries for the article index JSON."""
     article_index = []
@@ -124,59 +300,87 @@ def _generate_article_index_data(
     return article_index
 
 
+def render_standalone_page(
+    env: jinja2.Environment,
+    site_context: SiteContext,
+    build_result: BuildResult,
+    page_cfg: StandalonePageConfig,
+    article_index: list[dict[str, Any]],
+) -> RenderedPage | None:
+    """Render a standalone page as defined in the site configuration."""
+    logger = logging.getLogger(__name__)
+    logger.debug(f"Rendering standalone page: {page_cfg.template} -> {page_cfg.output}")
+
+    context = build_template_context(
+        site_context,
+        articles=site_context.articles,
+        topics=site_context.topics,
+        article_index=article_index,
+        resource_hints=generate_resource_hints(site_context),
+    )
+
+    try:
+        template = env.get_template(page_cfg.template)
+        rendered = render_with_syntax_stylesheet(
+            site_context,
+            lambda syntax_stylesheet: template.render(
+                context, syntax_stylesheet=syntax_stylesheet
+            ),
+        )
+        return RenderedPage(relative_path=page_cfg.output, content=rendered)
+    except jinja2.TemplateNotFound as e:
+        error_msg = f"Template not found for standalone page: {e}"
+    except jinja2.TemplateSyntaxError as e:
+        error_msg = f"Template syntax error in {page_cfg.template} at line {e.lineno}: {e.message}"
+    except jinja2.TemplateRuntimeError as e:
+        error_msg = f"Template runtime error in {page_cfg.template}: {e.message}"
+    except Exception as e:
+        error_msg = f"Failed to render standalone page {page_cfg.template}: {e}"
+    logger.error(error_msg)
+    build_result.errors.append(error_msg)
+    build_result.success = False
+    return None
+
+
 def build_standalone_pages(
     env: jinja2.Environment,
     site_context: SiteContext,
     content_config: ContentProcessingConfig,
     build_result: BuildResult,
     article_index: list[dict[str, Any]],
+    output: OutputTarget,
+    render_tracker: RenderTracker | None = None,
+    post_processors: Sequence[PagePostProcessor] = (),
 ) -> None:
     """Render all standalone pages as defined in the site configuration."""
     logger = logging.getLogger(__name__)
 
     logger.info(f"Rendering {len(site_context.standalone_pages)} standalone pages...")
 
-    for page_cfg in site_context.standalone_pages:
-        logger.debug(
-            f"Rendering standalone page: {page_cfg.template} -> {page_cfg.output}"
-        )
-
-        context = build_template_context(
-            site_context,
-            articles=site_context.articles,
-            topics=site_context.topics,
-            article_index=article_index,
-        )
-
-        try:
-            rendered = env.get_template(page_cfg.template).render(context)
-            if not write_rendered_page(
-                content_config.output_dir,
-                page_cfg.output,
-                rendered,
-                build_result,
-            ):
-                build_result.success = False
-        except jinja2.TemplateNotFound as e:
-            error_msg = f"Template not found for standalone page: {e}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
-        except jinja2.TemplateSyntaxError as e:
-            error_msg = f"Template syntax error in {page_cfg.template} at line {e.lineno}: {e.message}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
-        except jinja2.TemplateRuntimeError as e:
-            error_msg = f"Template runtime error in {page_cfg.template}: {e.message}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
-        except Exception as e:
-            error_msg = f"Failed to render standalone page {page_cfg.template}: {e}"
-            logger.error(error_msg)
-            build_result.errors.append(error_msg)
-            build_result.success = False
+    with BoundedPageWriter(
+        output,
+        content_config.render_window,
+        build_result,
+        content_config.write_workers,
+    ) as writer:
+        for page_cfg in site_context.standalone_pages:
+            if render_tracker is not None:
+                relative_path = page_cfg.output.as_posix()
+                reason = render_tracker.compute_render_reason(relative_path)
+                if reason is None:
+                    render_tracker.keep_page(relative_path, build_result)
+                    continue
+                render_tracker.record_page(
+                    relative_path, [page_cfg.template], reason, build_result
+                )
+            page = render_standalone_page(
+                env, site_context, build_result, page_cfg, article_index
+            )
+            if page is not None:
+                post_process_page(page, post_processors)
+                writer.submit(page)
+    if writer.failed:
+        build_result.success = False
 
 
 def update_site_topics(
@@ -270,6 +474,9 @@ def compute_related_content_for_files(
 def setup_build_environment(content_config: ContentProcessingConfig) -> None:
     """Set up the build environment by creating necessary directories."""
     logger = logging.getLogger(__name__)
+    if content_config.output_archive is not None:
+        logger.info(f"Writing output to archive {content_config.output_archive}")
+        return
     logger.info("Creating output directory...")
     content_config.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -306,17 +513,25 @@ def load_and_process_content(
 def process_site_metadata(
     content_files: list[ContentFile], site_context: SiteContext
 ) -> None:
-    """Process site-wide metadata including topics, languages, and related content."""
+    """
+    Process site-wide metadata including topics, languages, and related content.
+
+    Previously computed metadata is replaced, so this can be re-run after
+    content files were added, changed or removed.
+    """
     logger = logging.getLogger(__name__)
 
     # Assign loaded articles to the site context
     site_context.articles = content_files
 
     # Collect all topics from content files and add them to the site context
+    site_context.topics = {}
     update_site_topics(site_context.articles, site_context)
 
     # Process multi-language support
     logger.info("Processing multi-language content...")
+    for content_file in content_files:
+        content_file.alternate_languages = {}
     link_alternate_languages(content_files)
     site_context.languages = collect_site_languages(content_files)
 
@@ -325,6 +540,50 @@ def process_site_metadata(
     compute_related_content_for_files(site_context.articles, site_context)
 
 
+def load_site_model(
+    content_config: ContentProcessingConfig,
+    site_context: SiteContext,
+    build_result: BuildResult,
+) -> list[ContentFile]:
+    """
+    Load and validate the content and compute the site metadata.
+
+    If the build cache holds a site snapshot for unchanged content, the model is
+    restored from it instead; otherwise a new snapshot is stored.
+    """
+    metrics = get_metrics_collector()
+    with metrics.measure_phase("load_snapshot"):
+        restored, fingerprint = restore_site_snapshot(
+            content_config, site_context, build_result
+        )
+    if restored is not None:
+        return restored
+
+    warnings_start = len(build_result.warnings)
+
+    # Load and validate content
+    with metrics.measure_phase("load_content"):
+        content_files = load_and_process_content(
+            content_config, site_context, build_result
+        )
+
+    # Process site metadata
+    with metrics.measure_phase("site_metadata"):
+        process_site_metadata(content_files, site_context)
+
+    if fingerprint is not None:
+        with metrics.measure_phase("save_snapshot"):
+            store_site_snapshot(
+                content_config,
+                site_context,
+                content_files,
+                fingerprint,
+                build_result,
+                build_result.warnings[warnings_start:],
+            )
+    return content_files
+
+
 def generate_site_output(
     content_config: ContentProcessingConfig,
     site_context: SiteContext,
@@ -335,48 +594,359 @@ def generate_site_output(
     logger = logging.getLogger(__name__)
     logger.info("Generating site HTML...")
 
-    # Create Jinja environment
+    # Create Jinja environment with a build-wide include_markdown cache
+    markdown_cache = MemoCache(MARKDOWN_CACHE_NAME, MARKDOWN_CACHE_SIZE)
+    markdown_cache.load(content_config.cache_dir)
+    # Image dimensions, memoized by file fingerprint across builds
+    image_cache = MemoCache(IMAGE_DIMENSIONS_CACHE_NAME, IMAGE_DIMENSIONS_CACHE_SIZE)
+    image_cache.load(content_config.cache_dir)
+    image_reader = ImageDimensionReader(
+        content_config.static_dir, site_context.base_url, image_cache
+    )
     jinja_env = create_jinja_environment(
-        content_config.templates_dir, site_context, content_config.content_root
+        content_config.templates_dir,
+        site_context,
+        content_config.content_root,
+        markdown_cache,
+        image_reader,
     )
 
-    # Process content files
-    process_content(
-        jinja_env,
-        site_context,
-        content_config,
-        build_result,
-        content_files,
+    token_classes = compute_token_classes_in_use(
+        jinja_env, site_context, content_config, build_result
     )
+    syntax_css = create_syntax_stylesheet(site_context, token_classes, build_result)
 
-    # Generate article index JSON
-    logger.info("Generating article index JSON...")
-    article_index_data = _generate_article_index_data(jinja_env, site_context.articles)
-    content_index_json_rel_path = Path("content") / "index.json"
-    if not write_json_file(
-        content_config.output_dir,
-        content_index_json_rel_path,
-        article_index_data,
-        build_result,
-    ):
-        logger.error("Failed to write article index JSON file.")
-        build_result.success = False
+    # Without a build cache there is no record of previously rendered pages
+    render_tracker = None
+    if content_config.cache_dir is not None:
+        render_tracker = RenderTracker(jinja_env, content_config, site_context)
 
-    # Copy static assets
-    if not copy_static_assets(
-        content_config.static_dir, content_config.output_dir, build_result
-    ):
-        logger.error("Failed to copy static assets.")
-        build_result.success = False
+    output: OutputTarget = content_config.output_dir
+    if content_config.output_archive is not None:
+        output = OutputArchive(content_config.output_archive)
+    try:
+        stages = create_output_stages(
+            jinja_env,
+            content_config,
+            site_context,
+            content_files,
+            build_result,
+            output,
+            render_tracker,
+            syntax_css,
+            create_page_post_processors(site_context, image_reader),
+        )
+        # Concurrent stages would share the phase boundaries of a memory profile
+        max_workers = 1 if content_config.profile_memory else DEFAULT_STAGE_WORKERS
+        build_result.critical_path = run_build_stages(stages, build_result, max_workers)
+    finally:
+        if isinstance(output, OutputArchive):
+            output.close()
+
+    # Only a complete build may serve as the record the next build keeps pages from
+    if render_tracker is not None and not build_result.errors:
+        save_render_manifest(
+            content_config, render_tracker.compute_manifest(build_result)
+        )
 
-    # Build standalone pages
-    build_standalone_pages(
-        jinja_env,
-        site_context,
-        content_config,
-        build_result,
-        article_index_data,
-    )
+    markdown_cache.save(content_config.cache_dir)
+    build_result.cache_stats[markdown_cache.name] = markdown_cache.compute_stats()
+    image_cache.save(content_config.cache_dir)
+    build_result.cache_stats[image_cache.name] = image_cache.compute_stats()
+
+
+def generate_variant_outputs(
+    content_config: ContentProcessingConfig,
+    site_context: SiteContext,
+    content_files: list[ContentFile],
+    variants: list[BuildVariant],
+    build_result: BuildResult,
+) -> None:
+    """
+    Generate the output of every build variant from one loaded site model.
+
+    The content files and highlighting are shared, and so is their markdown
+    HTML when it was rendered while loading. Site
+    metadata is recomputed only for a variant with other content than the one
+    before it; the templates are rendered for each variant with its base URL.
+    """
+    logger = logging.getLogger(__name__)
+    metrics = get_metrics_collector()
+    # Rendering a page releases its HTML and custom tags replace it with
+    # URL-dependent markup, so every variant starts again from the markdown HTML
+    markdown_html = {
+        content_file.path: content_file.html for content_file in content_files
+    }
+    metadata_files = content_files
+    for variant in variants:
+        variant_files = compute_variant_content(content_files, variant.content_dirs)
+        if variant_files != metadata_files:
+            with metrics.measure_phase("site_metadata"):
+                process_site_metadata(variant_files, site_context)
+            metadata_files = variant_files
+        for content_file in variant_files:
+            content_file.html = markdown_html[content_file.path]
+        site_context.base_url = variant.base_url
+        site_context.__post_init__()  # re-normalize
+
+        logger.info(
+            f"Building variant {variant} with base URL {site_context.base_url} "
+            f"and {len(variant_files)} content files..."
+        )
+        variant_config = content_config.model_copy(
+            update={
+                "output_dir": variant.output_dir,
+                "content_dirs": variant.content_dirs,
+            }
+        )
+        variant_result = BuildResult()
+        setup_build_environment(variant_config)
+        generate_site_output(
+            variant_config, site_context, variant_files, variant_result
+        )
+        if not variant_result.errors:
+            process_deploy_manifest(variant_config, variant_result)
+        merge_variant_result(build_result, variant_result, variant)
+
+
+def compute_token_classes_in_use(
+    env: jinja2.Environment,
+    site_context: SiteContext,
+    content_config: ContentProcessingConfig,
+    build_result: BuildResult,
+) -> set[str] | None:
+    """Return the token classes the syntax stylesheet needs, None for all of them."""
+    logger = logging.getLogger(__name__)
+    # Without a style there is no stylesheet; shards only render their own slice
+    if not site_context.theme.get("highlight_style") or content_config.shard:
+        return None
+    # Markdown that templates include is only highlighted while pages render
+    markdown_includes = find_markdown_includes(env)
+    if markdown_includes:
+        logger.info(
+            "Generating syntax rules for every token type, templates include "
+            f"markdown: {', '.join(markdown_includes)}"
+        )
+        return None
+    if content_config.render_markdown:
+        return compute_site_token_classes(site_context.articles)
+    memo = MemoCache(SYNTAX_CLASSES_CACHE_NAME, SYNTAX_CLASSES_CACHE_SIZE)
+    memo.load(content_config.cache_dir)
+    token_classes = compute_site_token_classes(site_context.articles, memo)
+    memo.save(content_config.cache_dir)
+    build_result.cache_stats[memo.name] = memo.compute_stats()
+    return token_classes
+
+
+def compute_keep_article_html(env: jinja2.Environment) -> bool:
+    """Return whether templates read the HTML of other articles, which must be kept."""
+    logger = logging.getLogger(__name__)
+    html_readers = find_article_html_reads(env)
+    if html_readers:
+        logger.info(
+            f"Keeping article HTML in memory, read by: {', '.join(html_readers)}"
+        )
+    return bool(html_readers)
+
+
+def create_output_stages(
+    env: jinja2.Environment,
+    content_config: ContentProcessingConfig,
+    site_context: SiteContext,
+    content_files: list[ContentFile],
+    build_result: BuildResult,
+    output: OutputTarget,
+    render_tracker: RenderTracker | None = None,
+    syntax_css: RenderedPage | None = None,
+    post_processors: Sequence[PagePostProcessor] = (),
+) -> list[BuildStage]:
+    """
+    Declare the stages writing the output of this build.
+
+    Content pages are rendered while the site-wide outputs are written, unless
+    sharded: then only shard 1 writes the site-wide outputs. The caching
+    configuration and the archive wait until every other file is written.
+
+    Article HTML is released once a page is rendered, unless a template reads the
+    HTML of other articles: then it is kept, and the standalone pages wait for the
+    content pages so they see the HTML with the custom tags processed.
+    """
+    logger = logging.getLogger(__name__)
+
+    keep_html = compute_keep_article_html(env)
+
+    shard = content_config.shard
+    if shard is not None:
+        content_files = compute_shard_slice(content_files, shard)
+        logger.info(
+            f"Shard {shard}: rendering {len(content_files)} of "
+            f"{len(site_context.articles)} content files"
+        )
+
+    def render_content(_: Mapping[str, Any]) -> None:
+        process_content(
+            env,
+            site_context,
+            content_config,
+            build_result,
+            content_files,
+            post_processors,
+            output=output,
+            render_tracker=render_tracker,
+            release_html=not keep_html,
+        )
+
+    stages = [BuildStage("render_content", render_content, output="content_pages")]
+    if shard is None or shard.is_primary:
+        stages += create_site_wide_stages(
+            env,
+            content_config,
+            site_context,
+            build_result,
+            output,
+            render_tracker,
+            syntax_css,
+            post_processors,
+            wait_for_content=keep_html,
+        )
+
+    def write_caching(_: Mapping[str, Any]) -> None:
+        if not write_caching_config(output, site_context, build_result):
+            build_result.success = False
+
+    written = [stage.output for stage in stages if stage.output is not None]
+    if site_context.caching is not None and shard is not None:
+        build_result.warnings.append(
+            "Caching configuration is not generated for sharded builds"
+        )
+    else:
+        stages.append(
+            BuildStage(
+                "caching_config", write_caching, inputs=written, output="caching_config"
+            )
+        )
+        written.append("caching_config")
+
+    if isinstance(output, OutputArchive):
+        archive = output
+
+        def write_archive(_: Mapping[str, Any]) -> None:
+            logger.info(f"Writing archive {archive.archive_path}...")
+            try:
+                archive.write_archive()
+            except Exception as e:
+                build_result.errors.append(
+                    f"Error writing archive {archive.archive_path}: {e}"
+                )
+                build_result.success = False
+
+        stages.append(BuildStage("write_archive", write_archive, inputs=written))
+    return stages
+
+
+def create_site_wide_stages(
+    env: jinja2.Environment,
+    content_config: ContentProcessingConfig,
+    site_context: SiteContext,
+    build_result: BuildResult,
+    output: OutputTarget,
+    render_tracker: RenderTracker | None = None,
+    syntax_css: RenderedPage | None = None,
+    post_processors: Sequence[PagePostProcessor] = (),
+    wait_for_content: bool = False,
+) -> list[BuildStage]:
+    """
+    Declare the stages writing the outputs that do not belong to a single article.
+
+    Static assets need nothing but the static directory; the article index JSON
+    and the standalone pages both need the article index data (and, with
+    `wait_for_content`, the rendered content pages). The generated syntax
+    stylesheet, if any, is written into the copied static directory.
+    """
+    logger = logging.getLogger(__name__)
+
+    def compute_article_index(_: Mapping[str, Any]) -> list[dict[str, Any]]:
+        logger.info("Generating article index JSON...")
+        return generate_article_index_data(site_context.articles)
+
+    def write_article_index(inputs: Mapping[str, Any]) -> None:
+        content_index_json_rel_path = Path("content") / "index.json"
+        if not write_json_file(
+            output,
+            content_index_json_rel_path,
+            inputs["article_index"],
+            build_result,
+        ):
+            logger.error("Failed to write article index JSON file.")
+            build_result.success = False
+
+    def copy_static(_: Mapping[str, Any]) -> None:
+        if not copy_static_assets(content_config.static_dir, output, build_result):
+            logger.error("Failed to copy static assets.")
+            build_result.success = False
+
+    def render_standalone(inputs: Mapping[str, Any]) -> None:
+        build_standalone_pages(
+            env,
+            site_context,
+            content_config,
+            build_result,
+            inputs["article_index"],
+            output,
+            render_tracker,
+            post_processors,
+        )
+
+    stages = [
+        BuildStage("article_index", compute_article_index, output="article_index"),
+        BuildStage(
+            "index_json",
+            write_article_index,
+            inputs=["article_index"],
+            output="index_json",
+        ),
+        BuildStage("static_assets", copy_static, output="static_assets"),
+        BuildStage(
+            "standalone_pages",
+            render_standalone,
+            inputs=["article_index", "content_pages"]
+            if wait_for_content
+            else ["article_index"],
+            output="standalone_pages",
+        ),
+    ]
+    if syntax_css is not None:
+        stylesheet = syntax_css
+
+        def write_syntax_css(_: Mapping[str, Any]) -> None:
+            if not write_rendered_page(
+                output, stylesheet.relative_path, stylesheet.content, build_result
+            ):
+                build_result.success = False
+
+        # Copying the static assets replaces the static directory it is written to
+        stages.append(
+            BuildStage(
+                "syntax_css",
+                write_syntax_css,
+                inputs=["static_assets"],
+                output="syntax_css",
+            )
+        )
+    return stages
+
+
+def compute_bytes_read(
+    content_config: ContentProcessingConfig, content_files: list[ContentFile]
+) -> int:
+    """Return the size of the content sources and static files a build reads."""
+    content_bytes = 0
+    for content_file in content_files:
+        try:
+            content_bytes += content_file.path.stat().st_size
+        except OSError:
+            continue
+    return content_bytes + compute_directory_size(content_config.static_dir)
 
 
 def print_build_summary(build_result: BuildResult, elapsed_time: float) -> None:
@@ -385,6 +955,28 @@ def print_build_summary(build_result: BuildResult, elapsed_time: float) -> None:
     logger.info(f"Build completed in {elapsed_time:.2f} seconds")
     logger.info(f"Processed: {build_result.files_processed} files")
     logger.info(f"Skipped: {build_result.files_skipped} files")
+    logger.info(
+        f"Peak in-flight page HTML: {build_result.peak_in_flight_bytes / 1024:.1f} KiB"
+    )
+    report_render_reasons(build_result)
+    if build_result.critical_path:
+        path = " -> ".join(
+            f"{stage.name} ({stage.seconds:.2f}s)"
+            for stage in build_result.critical_path
+        )
+        total = sum(stage.seconds for stage in build_result.critical_path)
+        logger.info(f"Critical path: {path}, {total:.2f}s")
+    if build_result.metrics is not None:
+        for phase_name, phase in build_result.metrics.phases.items():
+            logger.debug(
+                f"Phase {phase_name}: {phase.wall_seconds:.3f}s wall, "
+                f"{phase.cpu_seconds:.3f}s CPU"
+            )
+    for cache_name, stats in build_result.cache_stats.items():
+        logger.info(
+            f"Cache {cache_name}: {stats.hits} hits, {stats.misses} misses "
+            f"({stats.hit_rate:.0%} hit rate)"
+        )
     if build_result.warnings:
         logger.warning(f"Warnings ({len(build_result.warnings)}):")
         for warning in build_result.warnings:
@@ -395,40 +987,118 @@ def print_build_summary(build_result: BuildResult, elapsed_time: float) -> None:
             logger.error(f"- {error}")
 
 
+def compute_build_config(
+    content_config: ContentProcessingConfig, variants: list[BuildVariant] | None
+) -> ContentProcessingConfig:
+    """
+    Adapt the content configuration to a sharded or multi-variant build.
+
+    Markdown is rendered right before each page, unless templates read the
+    HTML of other articles: then every article's HTML is needed up front.
+    """
+    if content_config.shard is not None:
+        # Every shard needs all frontmatter, but only its own slice of the markdown
+        content_config = content_config.model_copy(update={"render_markdown": False})
+    elif not content_config.render_markdown and find_article_html_reads(
+        create_analysis_environment(content_config.templates_dir)
+    ):
+        content_config = content_config.model_copy(update={"render_markdown": True})
+    if variants:
+        # Load the content of every variant, the first one's output comes first
+        content_config = content_config.model_copy(
+            update={
+                "output_dir": variants[0].output_dir,
+                "content_dirs": compute_variant_content_dirs(variants),
+            }
+        )
+    return content_config
+
+
 def build_site(
     site_context: SiteContext,
     content_config: ContentProcessingConfig,
+    variants: list[BuildVariant] | None = None,
 ) -> BuildResult:
-    """Build the complete static site."""
+    """
+    Build the complete static site.
+
+    With `variants`, the content of all variants is loaded once and the site is
+    written to each variant's output directory; `content_config` then only
+    provides the settings the variants share.
+    """
     logger = logging.getLogger(__name__)
 
     start_time = time.time()
     build_result = BuildResult()
+    code_highlighter = get_code_highlighter()
+    metrics = get_metrics_collector()
+    memory_profiler = MemoryProfiler() if content_config.profile_memory else None
+    if memory_profiler is not None:
+        memory_profiler.start()
+    metrics.reset(
+        memory_profiler, measure_blocks=content_config.template_budget_ms is not None
+    )
+    content_files: list[ContentFile] = []
+
+    content_config = compute_build_config(content_config, variants)
 
     try:
         # Setup
-        setup_build_environment(content_config)
-
-        # Load and validate content
-        content_files = load_and_process_content(
-            content_config, site_context, build_result
-        )
+        with metrics.measure_phase("setup"):
+            setup_build_environment(content_config)
+            code_highlighter.memo.load(content_config.cache_dir)
 
-        # Process site metadata
-        process_site_metadata(content_files, site_context)
+        # Load content and site metadata, or restore them from a snapshot
+        content_files = load_site_model(content_config, site_context, build_result)
+        if memory_profiler is not None:
+            # Every article is loaded and linked at this point
+            memory_profiler.record_article_footprint(content_files)
 
         # Generate output
-        generate_site_output(content_config, site_context, content_files, build_result)
+        if variants:
+            generate_variant_outputs(
+                content_config, site_context, content_files, variants, build_result
+            )
+        else:
+            generate_site_output(
+                content_config, site_context, content_files, build_result
+            )
+
+        with metrics.measure_phase("finalize"):
+            code_highlighter.memo.save(content_config.cache_dir)
+            build_result.cache_stats[code_highlighter.memo.name] = (
+                code_highlighter.memo.compute_stats()
+            )
+
+            if content_config.shard is not None:
+                write_shard_manifest(
+                    content_config.output_dir, content_config.shard, build_result
+                )
+
+            # Only a complete build may replace the manifest the next delta is based on
+            # (variants replace their own manifests)
+            if not build_result.errors and not variants:
+                process_deploy_manifest(content_config, build_result)
 
     except Exception as e:
         logger.error(f"Critical error during site build: {e}")
         build_result.errors.append(f"Critical build error: {e}")
         build_result.success = False
 
+    if memory_profiler is not None:
+        build_result.memory_profile = memory_profiler.compute_profile()
+        memory_profiler.stop()
+        write_memory_profile(content_config, build_result.memory_profile, build_result)
+
     # Final error check
     if build_result.errors:
         build_result.success = False
 
+    build_result.metrics = metrics.compute_metrics(
+        build_result, compute_bytes_read(content_config, content_files)
+    )
+    report_template_budgets(content_config, site_context, build_result)
+
     elapsed_time = time.time() - start_time
     print_build_summary(build_result, elapsed_time)
 
@@ -0,0 +1,134 @@
+"""
+Generated HTTP caching configuration for the output tree.
+
+Every output file is assigned to a category (HTML pages, feeds and indexes, static
+assets) whose `Cache-Control` policy comes from the `caching` section of the site
+configuration. Together with its content type and a strong ETag derived from the
+content hash recorded at write time, this is written as a Netlify/Cloudflare style
+`_headers` file and as nginx `map` blocks.
+"""
+
+import logging
+import mimetypes
+from pathlib import Path
+
+from straightshot.models import (
+    BuildResult,
+    CachingConfig,
+    OutputFileRecord,
+    OutputHeaders,
+    SiteContext,
+)
+from straightshot.output_writer import OutputTarget, write_rendered_page
+
+TEXT_CONTENT_TYPES = {"application/json", "application/xml", "application/javascript"}
+
+
+def compute_cache_control(relative_path: str, caching: CachingConfig) -> str:
+    """Return the Cache-Control policy of an output file's category."""
+    if relative_path.startswith("static/"):
+        return caching.static
+    if relative_path.endswith(".html"):
+        return caching.html
+    return caching.feeds
+
+
+def compute_content_type(relative_path: str) -> str:
+    """Return the Content-Type of an output file, with a charset for text formats."""
+    content_type, _ = mimetypes.guess_type(relative_path)
+    if content_type is None:
+        return "application/octet-stream"
+    if content_type.startswith("text/") or content_type in TEXT_CONTENT_TYPES:
+        return f"{content_type}; charset=utf-8"
+    return content_type
+
+
+def compute_output_headers(
+    output_files: dict[str, OutputFileRecord], caching: CachingConfig, base_url: str
+) -> list[OutputHeaders]:
+    """Compute the response headers of every output file, sorted by URL."""
+    headers = []
+    for relative_path, record in sorted(output_files.items()):
+        urls = [base_url + relative_path]
+        if relative_path == "index.html" or relative_path.endswith("/index.html"):
+            urls.append(base_url + relative_path.removesuffix("index.html"))
+        for url in urls:
+            headers.append(
+                OutputHeaders(
+                    url=url,
+                    cache_control=compute_cache_control(relative_path, caching),
+                    content_type=compute_content_type(relative_path),
+                    etag=f'"{record.sha256[:32]}"',
+                )
+            )
+    return sorted(headers, key=lambda h: h.url)
+
+
+def generate_headers_file(headers: list[OutputHeaders]) -> str:
+    """Generate a `_headers` file as understood by Netlify and Cloudflare Pages."""
+    lines = ["# Generated by straightshot"]
+    for h in headers:
+        lines.append(h.url)
+        lines.append(f"  Cache-Control: {h.cache_control}")
+        lines.append(f"  Content-Type: {h.content_type}")
+        lines.append(f"  ETag: {h.etag}")
+    return "\n".join(lines) + "\n"
+
+
+def _quote_nginx(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def generate_nginx_map(headers: list[OutputHeaders]) -> str:
+    """
+    Generate nginx `map` blocks setting caching headers per URI.
+
+    Include the file in the `http` block and use the variables in a `location`:
+    `add_header Cache-Control $straightshot_cache_control;` and
+    `add_header ETag $straightshot_etag;` (with `etag off;`).
+    """
+    lines = ["# Generated by straightshot"]
+    for variable, attribute in (
+        ("straightshot_cache_control", "cache_control"),
+        ("straightshot_content_type", "content_type"),
+        ("straightshot_etag", "etag"),
+    ):
+        lines.append(f"map $uri ${variable} {{")
+        lines.append('    default "";')
+        for h in headers:
+            lines.append(
+                f"    {_quote_nginx(h.url)} {_quote_nginx(getattr(h, attribute))};"
+            )
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def write_caching_config(
+    output: OutputTarget, site_context: SiteContext, build_result: BuildResult
+) -> bool:
+    """Write the configured caching configuration files for the files written so far."""
+    logger = logging.getLogger(__name__)
+    caching = site_context.caching
+    if caching is None:
+        return True
+
+    headers = compute_output_headers(
+        build_result.output_files, caching, site_context.base_url
+    )
+    logger.info(f"Generating caching configuration for {len(headers)} URLs...")
+    success = True
+    if caching.headers_file:
+        success &= write_rendered_page(
+            output,
+            Path(caching.headers_file),
+            generate_headers_file(headers),
+            build_result,
+        )
+    if caching.nginx_map_file:
+        success &= write_rendered_page(
+            output,
+            Path(caching.nginx_map_file),
+            generate_nginx_map(headers),
+            build_result,
+        )
+    return success
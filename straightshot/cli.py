@@ -8,124 +8,305 @@ from pathlib import Path
 
 
 def _get_docs_choices() -> list[str]:
-    """Get available documentation choices, with fallback for import issues."""
+    """Get available documentation choices, precomputed when the package is built."""
     try:
+        from straightshot.docs_index import DOC_NAMES
+
+        return DOC_NAMES
+    except ImportError:
+        # Fallback if the listing has not been generated (e.g. a fresh checkout)
         from straightshot.docs_utils import get_available_docs
 
         return get_available_docs()
-    except ImportError:
-        # Fallback if there are import issues
-        return ["features", "architecture"]
 
 
-def setup_args() -> argparse.Namespace:
-    """Set up command-line argument parsing."""
-    parser = argparse.ArgumentParser(description="straightshot static site generator")
+def _parse_shard(value: str) -> tuple[int, int]:
+    """Parse an `i/N` shard specification into a 1-based (index, count) pair."""
+    index_str, separator, count_str = value.partition("/")
+    if separator and index_str.isdigit() and count_str.isdigit():
+        index, count = int(index_str), int(count_str)
+        if 1 <= index <= count:
+            return index, count
+    raise argparse.ArgumentTypeError(
+        f"invalid shard '{value}', expected i/N with 1 <= i <= N"
+    )
 
-    # Create subcommands
-    subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
-    # Build command (default)
-    build_parser = subparsers.add_parser("build", help="Build the static site")
-    build_parser.add_argument(
+def _parse_archive_path(value: str) -> Path:
+    """Check that an output archive path has a supported archive suffix."""
+    from straightshot.output_archive import ARCHIVE_SUFFIXES, get_archive_format
+
+    path = Path(value)
+    if get_archive_format(path) is None:
+        raise argparse.ArgumentTypeError(
+            f"unsupported archive '{value}', expected one of: {', '.join(ARCHIVE_SUFFIXES)}"
+        )
+    return path
+
+
+def _parse_variant(value: str) -> tuple[Path, str | None, bool | None]:
+    """
+    Parse an `output_dir=DIR[,base_url=URL][,drafts=true|false]` build variant.
+
+    A base URL or drafts setting that is not given is taken from the main build.
+    """
+    fields: dict[str, str] = {}
+    for item in value.split(","):
+        key, separator, field_value = item.partition("=")
+        key = key.strip()
+        if not separator or key not in ("output_dir", "base_url", "drafts"):
+            raise argparse.ArgumentTypeError(
+                f"invalid variant '{value}', expected "
+                "output_dir=DIR[,base_url=URL][,drafts=true|false]"
+            )
+        fields[key] = field_value.strip()
+    if not fields.get("output_dir"):
+        raise argparse.ArgumentTypeError(f"variant '{value}' has no output_dir")
+    drafts = fields.get("drafts")
+    if drafts is not None and drafts.lower() not in ("true", "false"):
+        raise argparse.ArgumentTypeError(
+            f"invalid drafts value '{drafts}' in variant '{value}', expected true or false"
+        )
+    return (
+        Path(fields["output_dir"]),
+        fields.get("base_url"),
+        drafts.lower() == "true" if drafts is not None else None,
+    )
+
+
+def _add_build_arguments(parser: argparse.ArgumentParser, required: bool) -> None:
+    """Add the arguments shared by all commands that build the site."""
+    parser.add_argument(
         "--content-dir",
         type=Path,
-        required=True,
+        required=required,
         help="Path to the root content directory",
     )
-    build_parser.add_argument(
+    parser.add_argument(
         "--templates-dir",
         type=Path,
-        required=True,
+        required=required,
         help="Path to the templates directory",
     )
-    build_parser.add_argument(
+    parser.add_argument(
         "--static-dir",
         type=Path,
-        required=True,
+        required=required,
         help="Path to the static files directory",
     )
-    build_parser.add_argument(
+    parser.add_argument(
         "--output-dir",
         type=Path,
-        required=True,
+        required=required,
         help="Path to the output (build) directory",
     )
-    build_parser.add_argument(
+    parser.add_argument(
         "--site-config",
         type=Path,
-        required=True,
+        required=required,
         help="Path to the site configuration YAML file (e.g., site.yaml in project root)",
     )
-    build_parser.add_argument(
-        "--drafts", action="store_true", help="Include draft articles"
-    )
-    build_parser.add_argument(
-        "--verbose", action="store_true", help="Enable verbose output"
-    )
-    build_parser.add_argument(
+    parser.add_argument("--drafts", action="store_true", help="Include draft articles")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
+    parser.add_argument(
         "--clean",
         action="store_true",
         help="Clean output directory before building",
     )
-    build_parser.add_argument(
+    parser.add_argument(
         "--base-url",
         type=str,
         default=None,
         help="Override the base_url specified in site.yaml. Use '/' for root.",
     )
-
-    # Docs command
-    docs_parser = subparsers.add_parser("docs", help="Show documentation")
-    docs_choices = _get_docs_choices()
-    docs_parser.add_argument(
-        "doc_name",
-        nargs="?",
-        default=None,
-        choices=docs_choices,
-        help="Documentation to display (default: list all available docs)",
+    parser.add_argument(
+        "--render-window",
+        type=int,
+        default=16,
+        help="Maximum number of rendered pages held in memory while waiting to be written",
     )
-
-    # For backward compatibility, add the build arguments at the top level too
     parser.add_argument(
-        "--content-dir",
-        type=Path,
-        help="Path to the root content directory",
+        "--write-workers",
+        type=int,
+        default=4,
+        help="Number of threads writing rendered pages to the output directory",
     )
     parser.add_argument(
-        "--templates-dir",
+        "--cache-dir",
         type=Path,
-        help="Path to the templates directory",
+        default=None,
+        help="Directory for the persistent build cache (default: .straightshot-cache next to the site config)",
     )
     parser.add_argument(
-        "--static-dir",
-        type=Path,
-        help="Path to the static files directory",
+        "--no-cache",
+        action="store_true",
+        help="Disable the persistent build cache",
     )
     parser.add_argument(
-        "--output-dir",
+        "--no-site-snapshot",
+        action="store_true",
+        help="Always load and process all content instead of restoring the cached site model",
+    )
+
+
+def setup_args() -> argparse.Namespace:
+    """Set up command-line argument parsing."""
+    parser = argparse.ArgumentParser(description="straightshot static site generator")
+
+    # Create subcommands
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+
+    # Build command (default)
+    build_parser = subparsers.add_parser("build", help="Build the static site")
+    _add_build_arguments(build_parser, required=True)
+    build_parser.add_argument(
+        "--shard",
+        type=_parse_shard,
+        default=None,
+        metavar="I/N",
+        help="Render only shard I of N; combine the shard outputs with 'straightshot merge'",
+    )
+    build_parser.add_argument(
+        "--output-archive",
+        type=_parse_archive_path,
+        default=None,
+        metavar="ARCHIVE",
+        help="Write the site to a .zip, .tar, .tar.gz or .tar.zst archive instead of the output directory",
+    )
+    build_parser.add_argument(
+        "--deploy-delta",
         type=Path,
-        help="Path to the output (build) directory",
+        default=None,
+        metavar="FILE",
+        help="Write the output files added, changed and removed since the previous build as JSON",
     )
-    parser.add_argument(
-        "--site-config",
+    build_parser.add_argument(
+        "--variant",
+        type=_parse_variant,
+        action="append",
+        default=None,
+        metavar="output_dir=DIR[,base_url=URL][,drafts=true|false]",
+        help="Also write the site to DIR with another base URL or drafts setting, sharing the content processing with the main build (repeatable)",
+    )
+    build_parser.add_argument(
+        "--metrics-json",
         type=Path,
-        help="Path to the site configuration YAML file (e.g., site.yaml in project root)",
+        default=None,
+        metavar="FILE",
+        help="Write build metrics (phase timings, template stats, bytes, caches, peak RSS) as JSON",
     )
-    parser.add_argument("--drafts", action="store_true", help="Include draft articles")
-    parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
-    parser.add_argument(
-        "--clean",
+    build_parser.add_argument(
+        "--metrics-baseline",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Fail the build if its metrics regressed against this earlier --metrics-json report",
+    )
+    build_parser.add_argument(
+        "--metrics-threshold",
+        type=float,
+        default=0.2,
+        help="Allowed regression against --metrics-baseline as a fraction (default: 0.2)",
+    )
+    build_parser.add_argument(
+        "--profile-memory",
         action="store_true",
-        help="Clean output directory before building",
+        help="Trace memory allocations per build phase and write a report next to the output (slow)",
     )
-    parser.add_argument(
-        "--base-url",
+    build_parser.add_argument(
+        "--template-budget",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="Time every template and block and warn about templates averaging more than MS milliseconds per render",
+    )
+
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Build the site, serve it locally and rebuild and reload on changes",
+    )
+    _add_build_arguments(serve_parser, required=True)
+    serve_parser.add_argument(
+        "--host",
         type=str,
+        default="127.0.0.1",
+        help="Address to listen on (default: 127.0.0.1)",
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=8080, help="Port to listen on (default: 8080)"
+    )
+    serve_parser.add_argument(
+        "--no-live-reload",
+        action="store_true",
+        help="Do not inject the live reload script into HTML pages",
+    )
+    serve_parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Render pages on request from frontmatter and sources instead of building the whole site",
+    )
+
+    # Merge command
+    merge_parser = subparsers.add_parser(
+        "merge", help="Combine the outputs of a sharded build"
+    )
+    merge_parser.add_argument(
+        "shard_dirs",
+        type=Path,
+        nargs="+",
+        help="Output directories of all shards",
+    )
+    merge_parser.add_argument(
+        "--output-dir",
+        type=Path,
+        required=True,
+        help="Path to the merged output directory",
+    )
+    merge_parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Clean output directory before merging",
+    )
+    merge_parser.add_argument(
+        "--verbose", action="store_true", help="Enable verbose output"
+    )
+
+    # Analyze templates command
+    analyze_parser = subparsers.add_parser(
+        "analyze-templates",
+        help="Find template loops over site-wide collections that make builds quadratic",
+    )
+    analyze_parser.add_argument(
+        "--templates-dir",
+        type=Path,
+        required=True,
+        help="Path to the templates directory",
+    )
+    analyze_parser.add_argument(
+        "--site-config",
+        type=Path,
         default=None,
-        help="Override the base_url specified in site.yaml. Use '/' for root.",
+        help="Path to the site configuration file, for the templates of custom tags",
+    )
+    analyze_parser.add_argument(
+        "--verbose", action="store_true", help="Enable verbose output"
+    )
+
+    # Docs command
+    docs_parser = subparsers.add_parser("docs", help="Show documentation")
+    docs_choices = _get_docs_choices()
+    docs_parser.add_argument(
+        "doc_name",
+        nargs="?",
+        default=None,
+        choices=docs_choices,
+        help="Documentation to display (default: list all available docs)",
     )
 
+    # For backward compatibility, add the build arguments at the top level too
+    _add_build_arguments(parser, required=False)
+
     args = parser.parse_args()
 
     # For backward compatibility: if no command is specified but build args are provided, assume build
@@ -148,8 +329,7 @@ def validate_build_args(args: argparse.Namespace) -> None:
     ]
     missing_args = [arg for arg in required_args if getattr(args, arg) is None]
     if missing_args:
-        print(
-            f"Error: Missing required arguments for build: {', '.join(f'--{arg.replace("_", "-")}' for arg in missing_args)}"
-        )
+        missing_flags = ", ".join(f"--{arg.replace('_', '-')}" for arg in missing_args)
+        print(f"Error: Missing required arguments for build: {missing_flags}")
         print("Use 'straightshot build --help' for more information.")
         sys.exit(1)
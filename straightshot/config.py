@@ -2,14 +2,24 @@
 Configuration settings for the straightshot site generator.
 """
 
+import csv
 import json
 import logging
+import re
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 import yaml
 
+from straightshot.build_cache import (
+    compute_file_fingerprint,
+    load_cache_entry,
+    save_cache_entry,
+)
+
 # Import SiteContext from models
 from straightshot.models import SiteContext
 
@@ -90,60 +100,393 @@ class JsonLoader(DataFileLoader):
             ) from e
 
 
+class RecordFileLoader(DataFileLoader):
+    """
+    Base class for loaders of record-oriented files that are read incrementally.
+
+    Includes using these loaders are exposed to templates as `LazyRecords`
+    instead of being parsed into memory up front.
+    """
+
+    @abstractmethod
+    def iter_records(
+        self, file: IO[bytes], options: dict[str, str]
+    ) -> Iterator[tuple[int, Any]]:
+        """
+        Read records one at a time from a file opened in binary mode.
+
+        Yields:
+            Tuples of the record's byte offset in the file and the parsed record
+        """
+        pass
+
+    @abstractmethod
+    def read_record(self, file: IO[bytes], offset: int, options: dict[str, str]) -> Any:
+        """Read the single record starting at a byte offset yielded by `iter_records`."""
+        pass
+
+    def load(self, file_path: Path) -> Any:
+        """Load and parse all records of a file into a list."""
+        with open(file_path, "rb") as f:
+            return [record for _, record in self.iter_records(f, {})]
+
+
+class JsonLinesLoader(RecordFileLoader):
+    """Loader for JSON Lines files (one JSON document per line)."""
+
+    @property
+    def directive_prefix(self) -> str:
+        return "$$include_jsonl"
+
+    @property
+    def file_format_name(self) -> str:
+        return "JSON Lines"
+
+    def _parse_line(self, line: bytes, offset: int) -> Any:
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(
+                f"Invalid {self.file_format_name} record at byte {offset}: {e}"
+            ) from e
+
+    def iter_records(
+        self, file: IO[bytes], options: dict[str, str]
+    ) -> Iterator[tuple[int, Any]]:
+        offset = file.tell()
+        while line := file.readline():
+            if line.strip():
+                yield offset, self._parse_line(line, offset)
+            offset += len(line)
+
+    def read_record(self, file: IO[bytes], offset: int, options: dict[str, str]) -> Any:
+        file.seek(offset)
+        return self._parse_line(file.readline(), offset)
+
+
+class CsvLoader(RecordFileLoader):
+    """Loader for CSV files with a header row. Records are dictionaries of strings."""
+
+    @property
+    def directive_prefix(self) -> str:
+        return "$$include_csv"
+
+    @property
+    def file_format_name(self) -> str:
+        return "CSV"
+
+    def _create_reader(
+        self, file: IO[bytes], options: dict[str, str]
+    ) -> Iterator[list[str]]:
+        # csv.reader pulls one line per call and never reads ahead, so the file
+        # position before each row is the byte offset where that row starts
+        lines = (line.decode("utf-8-sig") for line in iter(file.readline, b""))
+        return csv.reader(lines, delimiter=options.get("delimiter", ","))
+
+    def _read_header(self, file: IO[bytes], options: dict[str, str]) -> list[str]:
+        file.seek(0)
+        header = next(self._create_reader(file, options), None)
+        if header is None:
+            raise ValueError(f"{self.file_format_name} file has no header row")
+        return header
+
+    def iter_records(
+        self, file: IO[bytes], options: dict[str, str]
+    ) -> Iterator[tuple[int, Any]]:
+        header = self._read_header(file, options)
+        reader = self._create_reader(file, options)
+        while True:
+            offset = file.tell()
+            row = next(reader, None)
+            if row is None:
+                return
+            if row:
+                yield offset, dict(zip(header, row, strict=False))
+
+    def read_record(self, file: IO[bytes], offset: int, options: dict[str, str]) -> Any:
+        header = self._read_header(file, options)
+        file.seek(offset)
+        row = next(self._create_reader(file, options), [])
+        return dict(zip(header, row, strict=False))
+
+
 # Registry of available loaders
-_LOADERS = [YamlLoader(), JsonLoader()]
+_LOADERS = [YamlLoader(), JsonLoader(), JsonLinesLoader(), CsvLoader()]
 _LOADER_MAP = {loader.directive_prefix: loader for loader in _LOADERS}
 
 
-def _process_includes(data: Any, content_root: Path) -> Any:
+class LazyDataInclude:
+    """
+    A `$$include_*` data file that is parsed on first access.
+
+    Templates get the parsed data itself when they reach the include through an
+    attribute or item (see `materialize_data`); the include also behaves like it
+    (attribute and item access, iteration, `length`). The parsed result is kept
+    in the build cache keyed by path, mtime, size and loader, so an unchanged
+    include costs a single `stat`. A file that fails to load is only read once:
+    the error is logged and raised again on every later access.
+    """
+
+    def __init__(
+        self, file_path: Path, loader: DataFileLoader, cache_dir: Path | None
+    ) -> None:
+        self._file_path = file_path
+        self._loader = loader
+        self._cache_dir = cache_dir
+        self._value: Any = None
+        self._loaded = False
+        self._error: ValueError | None = None
+        self._lock = threading.Lock()
+
+    def materialize(self) -> Any:
+        """Return the parsed file content, loading it on first use."""
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            if not self._loaded:
+                try:
+                    self._value = _load_data_file(
+                        self._file_path, self._loader, self._cache_dir
+                    )
+                except ValueError as e:
+                    logging.getLogger(__name__).error(str(e))
+                    self._error = e
+                    raise
+                self._loaded = True
+        return self._value
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.materialize()[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.materialize())
+
+    def __len__(self) -> int:
+        return len(self.materialize())
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.materialize()
+
+    def __bool__(self) -> bool:
+        return bool(self.materialize())
+
+    def __str__(self) -> str:
+        return str(self.materialize())
+
+    def __repr__(self) -> str:
+        return f"LazyDataInclude({self._file_path})"
+
+
+class LazyRecords:
+    """
+    A record-oriented data file include that is read incrementally.
+
+    Iterating reads the file from disk each time, so the parsed records are
+    never held in memory together. With a `key=<field>` option, `get(value)` and
+    `records[value]` look records up through an index of byte offsets that is
+    built once and kept in the build cache.
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        loader: RecordFileLoader,
+        options: dict[str, str],
+        cache_dir: Path | None,
+    ) -> None:
+        self._file_path = file_path
+        self._loader = loader
+        self._options = options
+        self._cache_dir = cache_dir
+        self._index: dict[str, int] | None = None
+        self._count: int | None = None
+
+    def __iter__(self) -> Iterator[Any]:
+        with open(self._file_path, "rb") as f:
+            for _, record in self._loader.iter_records(f, self._options):
+                yield record
+
+    def __len__(self) -> int:
+        if self._count is None:
+            with open(self._file_path, "rb") as f:
+                self._count = sum(
+                    1 for _ in self._loader.iter_records(f, self._options)
+                )
+        return self._count
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, key: Any) -> Any:
+        offset = self._get_index().get(str(key))
+        if offset is None:
+            raise KeyError(key)
+        with open(self._file_path, "rb") as f:
+            return self._loader.read_record(f, offset, self._options)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Look up the record whose key field equals `key`."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _get_index(self) -> dict[str, int]:
+        if self._index is not None:
+            return self._index
+        key_field = self._options.get("key")
+        if not key_field:
+            raise ValueError(
+                f"Lookups in {self._file_path.name} need a key field, "
+                f"e.g. '{self._loader.directive_prefix} <file> key=<field>'"
+            )
+
+        fingerprint = (
+            self._loader.directive_prefix,
+            sorted(self._options.items()),
+            *compute_file_fingerprint(self._file_path),
+        )
+        cached = load_cache_entry(
+            self._cache_dir, "record-index", str(self._file_path), fingerprint
+        )
+        if cached is not None:
+            self._index, self._count = cached
+            return self._index
+
+        index: dict[str, int] = {}
+        count = 0
+        with open(self._file_path, "rb") as f:
+            for offset, record in self._loader.iter_records(f, self._options):
+                count += 1
+                if isinstance(record, dict) and key_field in record:
+                    index.setdefault(str(record[key_field]), offset)
+        self._index, self._count = index, count
+        save_cache_entry(
+            self._cache_dir,
+            "record-index",
+            str(self._file_path),
+            fingerprint,
+            (index, count),
+        )
+        return index
+
+    def __repr__(self) -> str:
+        return f"LazyRecords({self._file_path})"
+
+
+# Matches trailing `name=value` options of an include directive
+_INCLUDE_OPTION_PATTERN = re.compile(r"\s+(\w+)=(\S+)$")
+
+
+def _parse_include_options(argument: str) -> tuple[str, dict[str, str]]:
+    """Split `path key=value ...` into the path and its options."""
+    options: dict[str, str] = {}
+    while match := _INCLUDE_OPTION_PATTERN.search(argument):
+        options[match.group(1)] = match.group(2)
+        argument = argument[: match.start()]
+    return argument.strip(), options
+
+
+def _process_includes(data: Any, content_root: Path, cache_dir: Path | None) -> Any:
     """
     Recursively process $$include_* directives in data structure.
 
     Args:
         data: The data structure to process (dict, list, or any other type)
         content_root: Root directory for resolving file paths
+        cache_dir: Build cache directory for parsed includes (None disables it)
 
     Returns:
-        Processed data structure with includes resolved
+        Processed data structure with includes replaced by lazy includes
 
     Raises:
-        ValueError: If file loading fails or security constraints are violated
+        ValueError: If an include cannot be resolved or security constraints are violated
     """
     if isinstance(data, dict):
         return {
-            key: _process_includes(value, content_root) for key, value in data.items()
+            key: _process_includes(value, content_root, cache_dir)
+            for key, value in data.items()
         }
     elif isinstance(data, list):
-        return [_process_includes(item, content_root) for item in data]
+        return [_process_includes(item, content_root, cache_dir) for item in data]
     elif isinstance(data, str):
         # Check if this string matches any loader directive
         for directive_prefix, loader in _LOADER_MAP.items():
             if data.startswith(f"{directive_prefix} "):
                 file_path = data[len(directive_prefix) + 1 :].strip()
-                return _load_include_file(file_path, content_root, loader)
+                if isinstance(loader, RecordFileLoader):
+                    file_path, options = _parse_include_options(file_path)
+                    return LazyRecords(
+                        _resolve_include_file(file_path, content_root, loader),
+                        loader,
+                        options,
+                        cache_dir,
+                    )
+                return LazyDataInclude(
+                    _resolve_include_file(file_path, content_root, loader),
+                    loader,
+                    cache_dir,
+                )
 
     return data
 
 
-def _load_include_file(
+def compute_data_fingerprint(data: Any) -> Any:
+    """
+    Return a JSON-serializable fingerprint of processed site data.
+
+    Lazy includes are represented by their path, modification time and size,
+    so fingerprinting never parses them.
+    """
+    if isinstance(data, dict):
+        return {
+            str(key): compute_data_fingerprint(value) for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [compute_data_fingerprint(item) for item in data]
+    if isinstance(data, (LazyDataInclude, LazyRecords)):
+        return [repr(data), *compute_file_fingerprint(data._file_path)]
+    return repr(data)
+
+
+def materialize_data(value: Any) -> Any:
+    """Return the parsed content of a data file include, any other value unchanged."""
+    if isinstance(value, LazyDataInclude):
+        return value.materialize()
+    return value
+
+
+def serialize_data(value: Any) -> Any:
+    """`json.dumps` default for site data: includes become their parsed content."""
+    if isinstance(value, LazyDataInclude):
+        return value.materialize()
+    if isinstance(value, LazyRecords):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _resolve_include_file(
     file_path: str, content_root: Path, loader: DataFileLoader
-) -> Any:
+) -> Path:
     """
-    Load and parse a data file using the specified loader.
+    Resolve and check the path of a data file include.
 
     Args:
         file_path: Relative path to the file
         content_root: Root directory for resolving paths
-        loader: The data file loader to use
+        loader: The data file loader that will parse the file
 
     Returns:
-        Parsed file content
+        Absolute path of the data file
 
     Raises:
-        ValueError: If file loading fails or security constraints are violated
+        ValueError: If the file does not exist or security constraints are violated
     """
-    logger = logging.getLogger(__name__)
-
     try:
         # Resolve the path relative to content root
         full_path = (content_root / file_path).resolve()
@@ -155,18 +498,47 @@ def _load_include_file(
         if not full_path.is_file():
             raise ValueError(f"Error: data file not found: {file_path}")
 
+        return full_path
+
+    except Exception as e:
+        raise ValueError(
+            f"Error loading {loader.file_format_name} file {file_path}: {e}"
+        ) from e
+
+
+def _load_data_file(
+    full_path: Path, loader: DataFileLoader, cache_dir: Path | None
+) -> Any:
+    """
+    Load a data file through the build cache, parsing it only if it changed.
+
+    Raises:
+        ValueError: If file loading fails
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        fingerprint = (loader.directive_prefix, *compute_file_fingerprint(full_path))
+        content = load_cache_entry(cache_dir, "includes", str(full_path), fingerprint)
+        if content is not None:
+            logger.debug(f"Using cached {loader.file_format_name} file: {full_path}")
+            return content
+
         # Load and parse the file using the loader
         content = loader.load(full_path)
-        logger.debug(f"Successfully loaded {loader.file_format_name} file: {file_path}")
+        save_cache_entry(cache_dir, "includes", str(full_path), fingerprint, content)
+        logger.debug(f"Successfully loaded {loader.file_format_name} file: {full_path}")
         return content
 
     except Exception as e:
         raise ValueError(
-            f"Error loading {loader.file_format_name} file {file_path}: {e}"
+            f"Error loading {loader.file_format_name} file {full_path}: {e}"
         ) from e
 
 
-def load_site_context_from_path(config_path: Path) -> SiteContext:
+def load_site_context_from_path(
+    config_path: Path, cache_dir: Path | None = None
+) -> SiteContext:
     """Loads site configuration from a specified YAML file path and returns a SiteContext object."""
     logger = logging.getLogger(__name__)
 
@@ -186,7 +558,9 @@ def load_site_context_from_path(config_path: Path) -> SiteContext:
     if "data" in config_data:
         logger.debug("Processing include directives in data section")
         try:
-            config_data["data"] = _process_includes(config_data["data"], content_root)
+            config_data["data"] = _process_includes(
+                config_data["data"], content_root, cache_dir
+            )
         except ValueError as e:
             raise ValueError(
                 f"Error processing includes in site configuration: {e}"
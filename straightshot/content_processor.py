@@ -2,6 +2,7 @@
 Content processor for handling markdown files and frontmatter.
 """
 
+import functools
 import os
 import re
 from datetime import date
@@ -10,10 +11,8 @@ from typing import Any, Dict, List, Optional
 
 import frontmatter
 from markdown_it import MarkdownIt
-from pygments import highlight
-from pygments.formatters import HtmlFormatter
-from pygments.lexers import TextLexer, get_lexer_by_name
 
+from straightshot.highlighting import get_code_highlighter
 from straightshot.models import (
     BuildResult,
     ContentFile,
@@ -83,7 +82,9 @@ def load_content_file(
                 image=metadata_dict.get("image"),
                 lang=metadata_dict.get("lang", "en"),
             )
-        html_content = process_markdown_content(markdown_content)
+        html_content = (
+            process_markdown_content(markdown_content) if config.render_markdown else ""
+        )
         url_slug, reference_slug = generate_slugs(
             config, file_path, metadata, default_language
         )
@@ -233,28 +234,34 @@ def generate_slugs(
     return url_slug, reference_slug
 
 
-def process_markdown_content(markdown_text: str) -> str:
-    """Convert Markdown text to HTML using markdown-it-py and Pygments for code highlighting."""
+def _highlight_code_block(code: str, lang: str, attrs: str) -> str:
+    return get_code_highlighter().highlight_block(code, lang)
 
-    def pygments_highlight(code: str, lang: str, attrs: str) -> str:
-        try:
-            lexer = get_lexer_by_name(lang) if lang else TextLexer()
-        except Exception:
-            lexer = TextLexer()
-        formatter = HtmlFormatter(nowrap=True, cssclass="highlight")
-        highlighted = highlight(code, lexer, formatter)
-        return f'<pre class="highlight"><code>{highlighted}</code></pre>'
 
+@functools.cache
+def _get_markdown_parser() -> MarkdownIt:
+    """Create the markdown-it parser once; it holds no per-document state."""
     md = (
         MarkdownIt("commonmark", {"typographer": True})
         .enable("table")
         .disable("smartquotes")
     )
-    md.options["highlight"] = pygments_highlight
-    html_content = md.render(markdown_text)
+    md.options["highlight"] = _highlight_code_block
+    return md
+
+
+def process_markdown_content(markdown_text: str) -> str:
+    """Convert Markdown text to HTML using markdown-it-py and Pygments for code highlighting."""
+    html_content = _get_markdown_parser().render(markdown_text)
     return str(html_content)
 
 
+def render_content_markdown(content_file: ContentFile) -> str:
+    """Read the markdown body of a content file and convert it to HTML."""
+    post = frontmatter.load(content_file.path, encoding="utf-8")
+    return process_markdown_content(post.content)
+
+
 def generate_content_id(file_path: Path, metadata: Optional["Metadata"] = None) -> str:
     """Generate a content ID for matching articles across languages."""
     if metadata and metadata.id:
@@ -13,6 +13,22 @@ from straightshot.models import (
     SiteContext,
 )
 
+CUSTOM_TAG_PATTERN = re.compile(r"{%\s*(\w+)\s*(.*?)\s*%}")
+LINK_TAG_TEMPLATE = "tags/link.html"
+
+
+def find_tag_templates(html_content: str, custom_tags: Dict[str, str]) -> set[str]:
+    """Return the templates of the configured custom tags used in HTML content."""
+    templates = set()
+    for match in CUSTOM_TAG_PATTERN.finditer(html_content):
+        tag_name = match.group(1)
+        if tag_name in custom_tags:
+            # The link tag always renders its built-in template
+            templates.add(
+                LINK_TAG_TEMPLATE if tag_name == "link" else custom_tags[tag_name]
+            )
+    return templates
+
 
 def parse_tag_args(args_str: str) -> dict[str, str]:
     args_pattern = re.compile(r'(\w+)\s*=\s*(?:"([^"]*)"|\'([^\\\']*)\'|([^\s%]+))')
@@ -41,7 +57,7 @@ def process_link_tag(
     if not target_content:
         return f"<a href=\"#\">Article '{target_slug}' not found</a>"
 
-    template = env.get_template("tags/link.html")
+    template = env.get_template(LINK_TAG_TEMPLATE)
     context = {
         "url": f"{site_context.base_url.rstrip('/')}/{target_content.url}",
         "title": target_content.metadata.title,
@@ -84,7 +100,6 @@ def process_custom_tags(
     reference_content_map = {cf.reference_slug: cf for cf in site_context.articles}
 
     custom_tags_config = site_context.custom_tags
-    tag_pattern = re.compile(r"{%\s*(\w+)\s*(.*?)\s*%}")
 
     def replace_tag(match: re.Match[str]) -> str:
         tag_name = match.group(1).strip()
@@ -140,5 +155,5 @@ def process_custom_tags(
             )
             return original_tag  # Return original tag on render error
 
-    processed_content = tag_pattern.sub(replace_tag, html_content)
+    processed_content = CUSTOM_TAG_PATTERN.sub(replace_tag, html_content)
     return processed_content
@@ -0,0 +1,112 @@
+"""
+Deploy manifest: what changed in the output since the previous build.
+
+Every successful build stores the path, size and hash of each file it wrote in
+the build cache, keyed by the output directory (or archive). Comparing the files
+of the current build with the stored manifest yields the files to upload and the
+files to delete, without hashing the output tree again. The manifest only lists
+what a build wrote, so it stays correct whether or not `--clean` is used.
+"""
+
+import logging
+from pathlib import Path
+
+from straightshot.build_cache import load_cache_entry, save_cache_entry
+from straightshot.models import (
+    BuildResult,
+    ContentProcessingConfig,
+    DeployDelta,
+    OutputFileRecord,
+)
+
+DEPLOY_MANIFEST_NAMESPACE = "deploy-manifest"
+DEPLOY_MANIFEST_VERSION = 1
+
+
+def get_output_key(content_config: ContentProcessingConfig) -> str:
+    """Return the key identifying the output a manifest belongs to."""
+    output = content_config.output_archive or content_config.output_dir
+    return str(output.resolve())
+
+
+def load_deploy_manifest(
+    cache_dir: Path | None, output_key: str
+) -> dict[str, OutputFileRecord] | None:
+    """Load the manifest of the previous build, or None if there is none."""
+    manifest: dict[str, OutputFileRecord] | None = load_cache_entry(
+        cache_dir, DEPLOY_MANIFEST_NAMESPACE, output_key, DEPLOY_MANIFEST_VERSION
+    )
+    return manifest
+
+
+def save_deploy_manifest(
+    cache_dir: Path | None, output_key: str, files: dict[str, OutputFileRecord]
+) -> None:
+    """Store the manifest of the current build."""
+    save_cache_entry(
+        cache_dir, DEPLOY_MANIFEST_NAMESPACE, output_key, DEPLOY_MANIFEST_VERSION, files
+    )
+
+
+def compute_deploy_delta(
+    previous: dict[str, OutputFileRecord], current: dict[str, OutputFileRecord]
+) -> DeployDelta:
+    """Compare two manifests and list the added, changed and removed paths."""
+    return DeployDelta(
+        added={
+            path: record
+            for path, record in sorted(current.items())
+            if path not in previous
+        },
+        changed={
+            path: record
+            for path, record in sorted(current.items())
+            if path in previous and previous[path] != record
+        },
+        removed=sorted(previous.keys() - current.keys()),
+    )
+
+
+def write_deploy_delta(
+    delta_path: Path, delta: DeployDelta, build_result: BuildResult
+) -> bool:
+    """Write a deploy delta as JSON."""
+    try:
+        delta_path.parent.mkdir(parents=True, exist_ok=True)
+        delta_path.write_text(delta.model_dump_json(indent=2), encoding="utf-8")
+        return True
+    except Exception as e:
+        build_result.errors.append(f"Error writing deploy delta {delta_path}: {e}")
+        return False
+
+
+def process_deploy_manifest(
+    content_config: ContentProcessingConfig, build_result: BuildResult
+) -> None:
+    """
+    Write the deploy delta (if requested) and replace the stored manifest.
+
+    Without a build cache there is no previous manifest, so every file is
+    reported as added.
+    """
+    logger = logging.getLogger(__name__)
+    output_key = get_output_key(content_config)
+    previous = load_deploy_manifest(content_config.cache_dir, output_key)
+
+    if content_config.deploy_delta is not None:
+        if previous is None:
+            build_result.warnings.append(
+                "No manifest of a previous build found, the deploy delta lists all files as added"
+            )
+        delta = compute_deploy_delta(previous or {}, build_result.output_files)
+        logger.info(
+            f"Deploy delta: {len(delta.added)} added, {len(delta.changed)} changed, "
+            f"{len(delta.removed)} removed"
+        )
+        if not write_deploy_delta(content_config.deploy_delta, delta, build_result):
+            build_result.success = False
+            return
+
+    save_deploy_manifest(
+        content_config.cache_dir, output_key, build_result.output_files
+    )
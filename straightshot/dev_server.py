@@ -0,0 +1,314 @@
+"""
+Local development server for built sites.
+
+Serves the output directory from a thread per request with strong ETags and
+`304 Not Modified` responses, serves precompressed `.gz` siblings to clients that
+accept gzip, and pushes a `reload` Server-Sent Event to open pages whenever a
+rebuild finishes. Pages can also be produced on request by a `PageSource`
+instead of being read from the output directory.
+"""
+
+import hashlib
+import http.server
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Protocol
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+RELOAD_EVENTS_PATH = "/__straightshot/events"
+LIVE_RELOAD_SNIPPET = (
+    f'<script>new EventSource("{RELOAD_EVENTS_PATH}")'
+    '.addEventListener("reload", () => location.reload());</script>'
+).encode("utf-8")
+KEEP_ALIVE_SECONDS = 15.0
+WATCH_INTERVAL_SECONDS = 1.0
+
+
+class PageSource(Protocol):
+    """Produces response bodies for URL paths on request."""
+
+    def render_page(self, url_path: str) -> bytes | None:
+        """Return the body for a URL path, or None if the path is unknown."""
+        ...
+
+    def has_page(self, url_path: str) -> bool:
+        """Return whether a URL path is known, without producing its body."""
+        ...
+
+
+class ReloadBroadcaster:
+    """Lets request threads wait for the next finished rebuild."""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self._condition = threading.Condition()
+
+    def notify_reload(self) -> None:
+        """Wake up every client waiting for a reload."""
+        with self._condition:
+            self.generation += 1
+            self._condition.notify_all()
+
+    def wait_for_reload(self, generation: int, timeout: float) -> int:
+        """Wait until the generation moves past `generation` or the timeout expires."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class DevServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server holding the state shared by all request handlers."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        serve_dir: Path,
+        live_reload: bool,
+        page_source: PageSource | None = None,
+    ) -> None:
+        super().__init__(address, DevRequestHandler)
+        self.serve_dir = serve_dir
+        self.live_reload = live_reload
+        self.page_source = page_source
+        self.broadcaster = ReloadBroadcaster()
+        # Latest ETag per file, so the cache does not grow with every rebuild
+        self._etags: dict[tuple[str, bool], tuple[int, int, str]] = {}
+        self._etag_lock = threading.Lock()
+
+    def finish_request(self, request: Any, client_address: Any) -> None:
+        DevRequestHandler(request, client_address, self, directory=str(self.serve_dir))
+
+    def compute_etag(self, file_path: Path, body: bytes, injected: bool) -> str:
+        """Return a strong ETag for a response body, cached by file path and stat."""
+        stat = file_path.stat()
+        key = (str(file_path), injected)
+        with self._etag_lock:
+            cached = self._etags.get(key)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return cached[2]
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            self._etags[key] = (stat.st_mtime_ns, stat.st_size, etag)
+            return etag
+
+
+class DevRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files with conditional GET, precompression and live reload support."""
+
+    server: DevServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.getLogger(__name__).debug(format % args)
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] == RELOAD_EVENTS_PATH:
+            self._stream_reload_events()
+        else:
+            self._send_file(include_body=True)
+
+    def do_HEAD(self) -> None:
+        self._send_file(include_body=False)
+
+    def _resolve_file(self) -> Path | None:
+        file_path = Path(self.translate_path(self.path))
+        if file_path.is_dir():
+            file_path = file_path / "index.html"
+        return file_path if file_path.is_file() else None
+
+    def _is_directory_without_slash(
+        self, url_path: str, file_path: Path | None
+    ) -> bool:
+        """Return whether a path names a directory but lacks the trailing slash."""
+        if url_path.endswith("/"):
+            return False
+        if Path(self.translate_path(self.path)).is_dir():
+            return True
+        # A path that resolves to a file cannot name a directory of the page source
+        page_source = self.server.page_source
+        return (
+            file_path is None
+            and page_source is not None
+            and page_source.has_page(url_path + "/")
+        )
+
+    def _send_directory_redirect(self) -> None:
+        """Redirect to the path with a trailing slash, as SimpleHTTPRequestHandler does."""
+        url = urlsplit(self.path)
+        self.send_response(301)
+        self.send_header("Location", urlunsplit(url._replace(path=url.path + "/")))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_file(self, include_body: bool) -> None:
+        if self.server.page_source is not None:
+            url_path = unquote(urlsplit(self.path).path)
+            body = self.server.page_source.render_page(url_path)
+            if body is not None:
+                content_type = self.guess_type(
+                    url_path + "index.html" if url_path.endswith("/") else url_path
+                )
+                if content_type == "text/html" and self.server.live_reload:
+                    body = _inject_live_reload(body)
+                etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                self._send_body(body, content_type, etag, include_body)
+                return
+
+        file_path = self._resolve_file()
+        # Relative links in a directory's index page need the trailing slash
+        if self._is_directory_without_slash(
+            unquote(urlsplit(self.path).path), file_path
+        ):
+            self._send_directory_redirect()
+            return
+        if file_path is None:
+            self.send_error(404, "File not found")
+            return
+
+        content_type = self.guess_type(str(file_path))
+        is_html = content_type == "text/html"
+        inject = is_html and self.server.live_reload
+        gzip_path = file_path.with_name(file_path.name + ".gz")
+        use_gzip = (
+            not inject
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+            and gzip_path.is_file()
+        )
+        body_path = gzip_path if use_gzip else file_path
+
+        body = body_path.read_bytes()
+        if inject:
+            body = _inject_live_reload(body)
+        etag = self.server.compute_etag(body_path, body, inject)
+        self._send_body(
+            body, content_type, etag, include_body, "gzip" if use_gzip else None
+        )
+
+    def _send_body(
+        self,
+        body: bytes,
+        content_type: str,
+        etag: str,
+        include_body: bool,
+        content_encoding: str | None = None,
+    ) -> None:
+        if etag in _parse_etags(self.headers.get("If-None-Match", "")):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if content_encoding:
+            self.send_header("Content-Encoding", content_encoding)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def _stream_reload_events(self) -> None:
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        broadcaster = self.server.broadcaster
+        generation = broadcaster.generation
+        try:
+            while True:
+                new_generation = broadcaster.wait_for_reload(
+                    generation, KEEP_ALIVE_SECONDS
+                )
+                if new_generation != generation:
+                    generation = new_generation
+                    self.wfile.write(f"event: reload\ndata: {generation}\n\n".encode())
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def _parse_etags(header_value: str) -> set[str]:
+    """Parse an If-None-Match header into its entity tags."""
+    return {tag.strip() for tag in header_value.split(",") if tag.strip()}
+
+
+def _inject_live_reload(html: bytes) -> bytes:
+    """Insert the live reload script before the closing body tag."""
+    position = html.rfind(b"</body>")
+    if position == -1:
+        return html + LIVE_RELOAD_SNIPPET
+    return html[:position] + LIVE_RELOAD_SNIPPET + html[position:]
+
+
+def compute_watch_snapshot(watch_paths: list[Path]) -> dict[str, int]:
+    """Map every file below the watched paths to its modification time."""
+    snapshot: dict[str, int] = {}
+    for watch_path in watch_paths:
+        if watch_path.is_file():
+            snapshot[str(watch_path)] = watch_path.stat().st_mtime_ns
+            continue
+        for root, _, files in os.walk(watch_path):
+            for file in files:
+                file_path = os.path.join(root, file)
+                try:
+                    snapshot[file_path] = os.stat(file_path).st_mtime_ns
+                except OSError:
+                    continue
+    return snapshot
+
+
+def run_dev_server(
+    server: DevServer,
+    watch_paths: list[Path],
+    rebuild: Callable[[set[str]], bool],
+) -> None:
+    """
+    Serve until interrupted, rebuilding whenever a watched file changes.
+
+    `rebuild` receives the paths of all added, changed or removed files.
+
+    Open pages receive a reload event after every rebuild, successful or not,
+    so build errors are visible as soon as they are fixed.
+    """
+    logger = logging.getLogger(__name__)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    host, port = server.server_address[:2]
+    logger.info(f"Serving {server.serve_dir} at http://{host!s}:{port}/")
+
+    snapshot = compute_watch_snapshot(watch_paths)
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL_SECONDS)
+            new_snapshot = compute_watch_snapshot(watch_paths)
+            if new_snapshot == snapshot:
+                continue
+            changed_paths = {
+                path
+                for path in snapshot.keys() | new_snapshot.keys()
+                if snapshot.get(path) != new_snapshot.get(path)
+            }
+            snapshot = new_snapshot
+            logger.info("Change detected, rebuilding...")
+            if not rebuild(changed_paths):
+                logger.error("Rebuild failed, serving the previous output")
+            server.broadcaster.notify_reload()
+    except KeyboardInterrupt:
+        logger.info("Stopping server...")
+    finally:
+        server.shutdown()
+        server.server_close()
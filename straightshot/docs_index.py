@@ -0,0 +1,16 @@
+"""
+Documentation names available through `straightshot docs`.
+
+Generated by `python -m straightshot.docs_utils` (poe task `docs_index`), do not edit.
+"""
+
+DOC_NAMES = [
+    "configuration",
+    "content",
+    "example-site",
+    "getting-started",
+    "multi-language",
+    "overview",
+    "seo",
+    "templates",
+]
@@ -57,6 +57,30 @@ def get_available_docs() -> list[str]:
     return sorted(docs_map.keys())
 
 
+def generate_docs_index_source(doc_names: list[str]) -> str:
+    """Generate the source of the precomputed `docs_index` module."""
+    entries = "".join(f'    "{name}",\n' for name in doc_names)
+    return (
+        '"""\n'
+        "Documentation names available through `straightshot docs`.\n"
+        "\n"
+        "Generated by `python -m straightshot.docs_utils` (poe task `docs_index`), "
+        "do not edit.\n"
+        '"""\n'
+        "\n"
+        f"DOC_NAMES = [\n{entries}]\n"
+    )
+
+
+def write_docs_index() -> Path:
+    """Write the precomputed documentation listing used for CLI choices."""
+    index_path = Path(__file__).parent / "docs_index.py"
+    index_path.write_text(
+        generate_docs_index_source(get_available_docs()), encoding="utf-8"
+    )
+    return index_path
+
+
 def get_doc_content(doc_path: str) -> str | None:
     """Get documentation content from package data or local development files."""
     docs_root = _get_docs_root()
@@ -71,3 +95,7 @@ def get_doc_content(doc_path: str) -> str | None:
         pass
 
     return None
+
+
+if __name__ == "__main__":
+    print(f"Wrote {write_docs_index()}")
@@ -0,0 +1,75 @@
+"""
+Syntax highlighting of code blocks with Pygments.
+"""
+
+import hashlib
+import html
+import threading
+
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexer import Lexer
+from pygments.lexers import TextLexer, get_lexer_by_name
+
+from straightshot.build_cache import MemoCache
+
+HIGHLIGHT_CACHE_NAME = "highlight"
+HIGHLIGHT_CACHE_SIZE = 4096  # Distinct highlighted code blocks kept in memory
+# Part of the memo keys, so cached blocks are discarded when the markup changes
+HIGHLIGHT_MARKUP_VERSION = 2
+
+
+class CodeHighlighter:
+    """
+    Highlights code blocks with shared Pygments lexers and formatter.
+
+    Lexers are looked up once per language alias and a single formatter is
+    reused for every block. Highlighted output is memoized by language and a
+    hash of the code, so duplicated snippets are only highlighted once.
+    """
+
+    def __init__(self, memo: MemoCache) -> None:
+        self.memo = memo
+        self._formatter = HtmlFormatter(nowrap=True, cssclass="highlight")
+        self._lexers: dict[str, Lexer] = {}
+        self._lock = threading.Lock()
+
+    def _get_lexer(self, lang: str) -> Lexer:
+        with self._lock:
+            lexer = self._lexers.get(lang)
+            if lexer is None:
+                try:
+                    lexer = get_lexer_by_name(lang) if lang else TextLexer()
+                except Exception:
+                    lexer = TextLexer()
+                self._lexers[lang] = lexer
+            return lexer
+
+    def highlight_block(self, code: str, lang: str) -> str:
+        """Return the HTML for a highlighted code block."""
+        cache_key = (
+            HIGHLIGHT_MARKUP_VERSION,
+            lang,
+            hashlib.sha256(code.encode("utf-8")).hexdigest(),
+        )
+        block_html = self.memo.get(cache_key)
+        if block_html is None:
+            highlighted = highlight(code, self._get_lexer(lang), self._formatter)
+            # The language is kept for the code block label
+            language = f' data-language="{html.escape(lang)}"' if lang else ""
+            block_html = (
+                f'<pre class="highlight"{language}><code>{highlighted}</code></pre>'
+            )
+            self.memo.put(cache_key, block_html)
+        return str(block_html)
+
+
+# Shared by every markdown conversion in the process
+_code_highlighter = CodeHighlighter(
+    MemoCache(HIGHLIGHT_CACHE_NAME, HIGHLIGHT_CACHE_SIZE)
+)
+
+
+def get_code_highlighter() -> CodeHighlighter:
+    """Return the process-wide code highlighter."""
+    return _code_highlighter
@@ -0,0 +1,168 @@
+"""
+Build-time HTML enhancements of rendered pages.
+
+Rewrites that browsers would otherwise have a script do on every page load are
+applied once when a page is rendered:
+
+- images get `loading="lazy"` and `decoding="async"` (and `src` from a
+  `data-src` placeholder), and `width` and `height` when the build can look up
+  the image's dimensions; iframes get `loading="lazy"`,
+- external links get `target="_blank"` and `rel="noopener noreferrer"`,
+- code blocks are wrapped with their language label and a copy button, which
+  only needs a click handler on the client.
+
+Attributes a template or article sets explicitly are left alone. The contents
+of `<script>`, `<style>` and `<textarea>` elements are never touched.
+"""
+
+import html
+import re
+from collections.abc import Callable
+from functools import partial
+
+# Elements whose content is raw text that must not be rewritten
+RAW_TEXT_PATTERN = re.compile(
+    r"<(script|style|textarea)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+# Start tag attributes, allowing `>` inside quoted values
+_ATTRIBUTES = r"""((?:[^>"']|"[^"]*"|'[^']*')*)"""
+MEDIA_TAG_PATTERN = re.compile(rf"<(img|iframe)\b{_ATTRIBUTES}>", re.IGNORECASE)
+LINK_TAG_PATTERN = re.compile(rf"<a\b{_ATTRIBUTES}>", re.IGNORECASE)
+CODE_BLOCK_PATTERN = re.compile(
+    rf"<pre\b{_ATTRIBUTES}>(\s*<code\b{_ATTRIBUTES}>.*?)</pre>",
+    re.IGNORECASE | re.DOTALL,
+)
+ATTRIBUTE_PATTERN = re.compile(
+    r"""([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+))?"""
+)
+LANGUAGE_CLASS_PATTERN = re.compile(r"(?:^|\s)language-([\w+#.-]+)")
+EXTERNAL_LINK_PREFIXES = ("http://", "https://")
+EXTERNAL_LINK_REL = "noopener noreferrer"
+
+# Looks up the (width, height) of an image `src`, None if unknown
+ImageSizeLookup = Callable[[str], tuple[int, int] | None]
+
+
+def parse_attributes(attributes: str) -> dict[str, re.Match[str]]:
+    """Map the lowercased names of a start tag's attributes to their matches."""
+    return {
+        match.group(1).lower(): match
+        for match in ATTRIBUTE_PATTERN.finditer(attributes)
+    }
+
+
+def _get_value(match: re.Match[str]) -> str:
+    value = match.group(2) or ""
+    if value[:1] in ('"', "'"):
+        value = value[1:-1]
+    return html.unescape(value)
+
+
+def _add_attributes(tag: str, attributes: str, additions: list[str]) -> str:
+    """Rebuild a start tag with attributes appended, keeping a self-closing slash."""
+    if not additions:
+        return f"<{tag}{attributes}>"
+    body = attributes.rstrip()
+    closing = ""
+    if body.endswith("/"):
+        body, closing = body[:-1].rstrip(), " /"
+    return f"<{tag}{body} {' '.join(additions)}{closing}>"
+
+
+def _compute_size_attributes(
+    present: dict[str, re.Match[str]], image_size: ImageSizeLookup | None
+) -> list[str]:
+    """Return `width` and `height` attributes for an image that sets neither."""
+    src = present.get("src") or present.get("data-src")
+    if image_size is None or src is None or "width" in present or "height" in present:
+        return []
+    dimensions = image_size(_get_value(src))
+    if dimensions is None:
+        return []
+    return [f'width="{dimensions[0]}"', f'height="{dimensions[1]}"']
+
+
+def _enhance_media(image_size: ImageSizeLookup | None, match: re.Match[str]) -> str:
+    tag, attributes = match.group(1), match.group(2)
+    present = parse_attributes(attributes)
+    additions = []
+    if tag.lower() == "img":
+        additions += _compute_size_attributes(present, image_size)
+        placeholder = present.get("data-src")
+        if placeholder is not None and "src" not in present:
+            start, end = placeholder.span(1)
+            attributes = f"{attributes[:start]}src{attributes[end:]}"
+        if "decoding" not in present:
+            additions.append('decoding="async"')
+    if "loading" not in present:
+        additions.append('loading="lazy"')
+    return _add_attributes(tag, attributes, additions)
+
+
+def _enhance_link(match: re.Match[str]) -> str:
+    attributes = match.group(1)
+    present = parse_attributes(attributes)
+    href = present.get("href")
+    if href is None or not _get_value(href).startswith(EXTERNAL_LINK_PREFIXES):
+        return match.group(0)
+    additions = []
+    rel = present.get("rel")
+    if rel is None:
+        additions.append(f'rel="{EXTERNAL_LINK_REL}"')
+    elif "noopener" not in _get_value(rel).split():
+        value = html.escape(f"{_get_value(rel)} {EXTERNAL_LINK_REL}".strip())
+        start, end = rel.span()
+        attributes = f'{attributes[:start]}rel="{value}"{attributes[end:]}'
+    if "target" not in present:
+        additions.append('target="_blank"')
+    return _add_attributes("a", attributes, additions)
+
+
+def _find_code_language(pre_attributes: str, code_attributes: str) -> str | None:
+    language = parse_attributes(pre_attributes).get("data-language")
+    if language is not None:
+        return _get_value(language) or None
+    code_class = parse_attributes(code_attributes).get("class")
+    if code_class is not None:
+        class_match = LANGUAGE_CLASS_PATTERN.search(_get_value(code_class))
+        if class_match:
+            return class_match.group(1)
+    return None
+
+
+def _wrap_code_block(match: re.Match[str]) -> str:
+    language = _find_code_language(match.group(1), match.group(3))
+    label = (
+        f'<span class="code-language">{html.escape(language)}</span>'
+        if language
+        else ""
+    )
+    return (
+        '<div class="code-block"><div class="code-block-header">'
+        f'{label}<button type="button" class="copy-button">Copy</button></div>'
+        f"{match.group(0)}</div>"
+    )
+
+
+def _enhance_markup(markup: str, image_size: ImageSizeLookup | None) -> str:
+    markup = MEDIA_TAG_PATTERN.sub(partial(_enhance_media, image_size), markup)
+    markup = LINK_TAG_PATTERN.sub(_enhance_link, markup)
+    return CODE_BLOCK_PATTERN.sub(_wrap_code_block, markup)
+
+
+def enhance_page_html(page_html: str, image_size: ImageSizeLookup | None = None) -> str:
+    """
+    Apply the build-time enhancements to a rendered HTML page.
+
+    `image_size` looks up the dimensions of images without `width` and `height`.
+    """
+    parts = []
+    position = 0
+    for raw_text in RAW_TEXT_PATTERN.finditer(page_html):
+        parts.append(
+            _enhance_markup(page_html[position : raw_text.start()], image_size)
+        )
+        parts.append(raw_text.group(0))
+        position = raw_text.end()
+    parts.append(_enhance_markup(page_html[position:], image_size))
+    return "".join(parts)
@@ -0,0 +1,230 @@
+"""
+Image dimensions read from file headers, for `width` and `height` attributes.
+
+Images without dimensions shift the page layout when they load. The width and
+height of local images are read directly from the PNG, GIF, WebP and JPEG
+headers (honoring the EXIF orientation of JPEGs) or from the root element of
+SVGs, without decoding the image. References are resolved against the static
+directory, and the dimensions are memoized by path, modification time and size
+in the build cache.
+"""
+
+import re
+import struct
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from straightshot.build_cache import MemoCache, compute_file_fingerprint
+from straightshot.html_enhancements import parse_attributes
+
+IMAGE_DIMENSIONS_CACHE_NAME = "image_dimensions"
+IMAGE_DIMENSIONS_CACHE_SIZE = 4096  # Distinct image files kept in memory
+# Enough for the dimensions of every format but JPEGs with large metadata
+HEADER_BYTES = 64 * 1024
+STATIC_URL_PREFIX = "static/"
+IMAGE_SUFFIXES = (".png", ".gif", ".webp", ".jpg", ".jpeg", ".svg")
+
+Dimensions = tuple[int, int]
+
+SVG_ROOT_PATTERN = re.compile(rb"<svg\b[^>]*>", re.IGNORECASE)
+SVG_LENGTH_PATTERN = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*(px)?\s*$")
+# JPEG start-of-frame markers, which hold the dimensions
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# JPEG markers without a length field
+JPEG_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xDA)])
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def _parse_png(data: bytes) -> Dimensions | None:
+    if len(data) < 24 or data[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", data[16:24])
+    return width, height
+
+
+def _parse_gif(data: bytes) -> Dimensions | None:
+    if len(data) < 10:
+        return None
+    width, height = struct.unpack("<HH", data[6:10])
+    return width, height
+
+
+def _parse_webp(data: bytes) -> Dimensions | None:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30 and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _parse_exif_orientation(segment: bytes) -> int | None:
+    """Return the orientation stored in the TIFF structure of an EXIF segment."""
+    if segment[:6] != b"Exif\x00\x00" or len(segment) < 14:
+        return None
+    tiff = segment[6:]
+    byte_order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if byte_order is None:
+        return None
+    (ifd_offset,) = struct.unpack(f"{byte_order}I", tiff[4:8])
+    if ifd_offset + 2 > len(tiff):
+        return None
+    (entries,) = struct.unpack(f"{byte_order}H", tiff[ifd_offset : ifd_offset + 2])
+    for i in range(entries):
+        entry = tiff[ifd_offset + 2 + i * 12 : ifd_offset + 14 + i * 12]
+        if len(entry) < 12:
+            return None
+        tag, _, _, value = struct.unpack(f"{byte_order}HHIH", entry[:10])
+        if tag == EXIF_ORIENTATION_TAG:
+            return int(value)
+    return None
+
+
+def _parse_jpeg(data: bytes) -> Dimensions | None:
+    orientation = None
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:  # Fill byte
+            position += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+        (length,) = struct.unpack(">H", data[position + 2 : position + 4])
+        segment = data[position + 4 : position + 2 + length]
+        if marker == 0xE1 and orientation is None:
+            orientation = _parse_exif_orientation(segment)
+        elif marker in JPEG_SOF_MARKERS:
+            if len(segment) < 5:
+                return None
+            height, width = struct.unpack(">HH", segment[1:5])
+            # Orientations 5 to 8 rotate the image by 90 degrees when displayed
+            if orientation is not None and 5 <= orientation <= 8:
+                return height, width
+            return width, height
+        position += 2 + length
+    return None
+
+
+def _parse_svg_length(value: str | None) -> float | None:
+    if value is None:
+        return None
+    match = SVG_LENGTH_PATTERN.match(value)
+    return float(match.group(1)) if match else None
+
+
+def _parse_svg(data: bytes) -> Dimensions | None:
+    root = SVG_ROOT_PATTERN.search(data)
+    if root is None:
+        return None
+    attributes = {
+        name: match.group(2).strip("\"'") if match.group(2) else ""
+        for name, match in parse_attributes(
+            root.group(0)[4:-1].decode("utf-8", errors="replace")
+        ).items()
+    }
+    width = _parse_svg_length(attributes.get("width"))
+    height = _parse_svg_length(attributes.get("height"))
+    if width is None or height is None:
+        # Lengths in other units or percentages: fall back to the view box
+        view_box = attributes.get("viewbox", "").replace(",", " ").split()
+        if len(view_box) != 4:
+            return None
+        try:
+            width, height = float(view_box[2]), float(view_box[3])
+        except ValueError:
+            return None
+    return round(width), round(height)
+
+
+def parse_image_dimensions(data: bytes) -> Dimensions | None:
+    """Return the (width, height) of an image from its leading bytes, if recognized."""
+    try:
+        if data.startswith(b"\x89PNG\r\n\x1a\n"):
+            dimensions = _parse_png(data)
+        elif data.startswith((b"GIF87a", b"GIF89a")):
+            dimensions = _parse_gif(data)
+        elif data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+            dimensions = _parse_webp(data)
+        elif data.startswith(b"\xff\xd8"):
+            dimensions = _parse_jpeg(data)
+        elif b"<svg" in data[:4096].lower():
+            dimensions = _parse_svg(data)
+        else:
+            return None
+    except struct.error:
+        return None
+    if dimensions is None or dimensions[0] <= 0 or dimensions[1] <= 0:
+        return None
+    return dimensions
+
+
+def read_image_dimensions(image_path: Path) -> Dimensions | None:
+    """Read the dimensions of an image file, reading past the header only if needed."""
+    with open(image_path, "rb") as f:
+        data = f.read(HEADER_BYTES)
+        dimensions = parse_image_dimensions(data)
+        if dimensions is None and len(data) == HEADER_BYTES:
+            # A JPEG's frame header can follow large EXIF or ICC segments
+            dimensions = parse_image_dimensions(data + f.read())
+    return dimensions
+
+
+class ImageDimensionReader:
+    """
+    Looks up the dimensions of images referenced from pages.
+
+    `src` values are resolved against the static directory: `static/...` with or
+    without the site's base URL in front. Other URLs are not local images.
+    Thread-safe, as pages are rendered concurrently.
+    """
+
+    def __init__(self, static_dir: Path, base_url: str, memo: MemoCache) -> None:
+        self.static_dir = static_dir.resolve()
+        self.base_url = base_url
+        self.memo = memo
+
+    def resolve_image_path(self, src: str) -> Path | None:
+        """Return the static file an image reference points to, if it is one."""
+        url = urlsplit(src)
+        if url.scheme or url.netloc:
+            return None
+        path = unquote(url.path)
+        if path.startswith(self.base_url):
+            path = path[len(self.base_url) :]
+        path = path.lstrip("/")
+        if not path.startswith(STATIC_URL_PREFIX):
+            return None
+        image_path = (self.static_dir / path[len(STATIC_URL_PREFIX) :]).resolve()
+        if not image_path.is_relative_to(self.static_dir):
+            return None
+        return image_path
+
+    def get_dimensions(self, src: str) -> Dimensions | None:
+        """Return the (width, height) of a referenced local image, if known."""
+        image_path = self.resolve_image_path(src)
+        if image_path is None:
+            return None
+        try:
+            cache_key = (str(image_path), *compute_file_fingerprint(image_path))
+        except OSError:
+            return None
+        cached = self.memo.get(cache_key)
+        if cached is None:
+            try:
+                dimensions = read_image_dimensions(image_path)
+            except OSError:
+                return None
+            # Unrecognized images are memoized as () since None means a miss
+            cached = dimensions or ()
+            self.memo.put(cache_key, cached)
+        return (cached[0], cached[1]) if cached else None
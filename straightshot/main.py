@@ -2,19 +2,31 @@
 straightshot Static Site Generator
 
 Main entry point that orchestrates CLI parsing and site building.
+
+Only lightweight modules are imported at startup. The build machinery (Jinja,
+Pygments, markdown-it, pydantic) is imported by the subcommands that need it,
+which keeps `straightshot --help` and `straightshot docs` fast.
 """
 
+import argparse
 import logging
 import shutil
 import sys
 import traceback
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from straightshot.builder import build_site
 from straightshot.cli import setup_args, validate_build_args
-from straightshot.config import load_site_context_from_path
 from straightshot.docs_utils import discover_documentation_files, get_doc_content
-from straightshot.models import ContentProcessingConfig, SiteContext
+
+if TYPE_CHECKING:
+    from straightshot.models import (
+        BuildResult,
+        BuildVariant,
+        ContentProcessingConfig,
+        SiteContext,
+    )
 
 
 def show_documentation(doc_name: str | None = None) -> None:
@@ -75,11 +87,15 @@ def setup_logging(verbose: bool) -> None:
     )
 
 
-def load_config(site_config_path: Path, base_url_override: str | None) -> SiteContext:
+def load_config(
+    site_config_path: Path, base_url_override: str | None, cache_dir: Path | None
+) -> "SiteContext":
     """Load site configuration from file with optional base URL override."""
+    from straightshot.config import load_site_context_from_path
+
     logger = logging.getLogger(__name__)
     try:
-        site_context = load_site_context_from_path(site_config_path)
+        site_context = load_site_context_from_path(site_config_path, cache_dir)
     except (FileNotFoundError, ValueError) as e:
         logger.error(f"Error loading site configuration: {e}")
         sys.exit(1)
@@ -92,6 +108,283 @@ def load_config(site_config_path: Path, base_url_override: str | None) -> SiteCo
     return site_context
 
 
+def get_cache_dir(args: argparse.Namespace) -> Path | None:
+    """Return the build cache directory selected on the command line."""
+    from straightshot.build_cache import DEFAULT_CACHE_DIR_NAME
+
+    if args.no_cache:
+        return None
+    cache_dir: Path = args.cache_dir or (
+        args.site_config.parent / DEFAULT_CACHE_DIR_NAME
+    )
+    return cache_dir
+
+
+def get_content_dirs(content_dir: Path, drafts: bool) -> list[Path]:
+    """Return the content directories to load, with or without drafts."""
+    return [content_dir / "publish"] + ([content_dir / "drafts"] if drafts else [])
+
+
+def create_content_config(
+    args: argparse.Namespace, cache_dir: Path | None
+) -> "ContentProcessingConfig":
+    """Create the content processing configuration from command-line arguments."""
+    from straightshot.models import ContentProcessingConfig, ShardSpec
+
+    shard = getattr(args, "shard", None)
+    return ContentProcessingConfig(
+        content_root=args.content_dir,
+        content_dirs=get_content_dirs(args.content_dir, args.drafts),
+        static_dir=args.static_dir,
+        templates_dir=args.templates_dir,
+        output_dir=args.output_dir,
+        render_window=args.render_window,
+        write_workers=args.write_workers,
+        cache_dir=cache_dir,
+        shard=ShardSpec(index=shard[0], count=shard[1]) if shard else None,
+        output_archive=getattr(args, "output_archive", None),
+        deploy_delta=getattr(args, "deploy_delta", None),
+        profile_memory=getattr(args, "profile_memory", False),
+        template_budget_ms=getattr(args, "template_budget", None),
+        site_snapshot=not args.no_site_snapshot,
+    )
+
+
+def create_build_variants(
+    args: argparse.Namespace, base_url: str
+) -> list["BuildVariant"] | None:
+    """
+    Create the variants of a multi-variant build, None without `--variant`.
+
+    The main build (`--output-dir`, `--base-url`, `--drafts`) is the first
+    variant, and provides the base URL and drafts setting the others omit.
+    """
+    from straightshot.models import BuildVariant
+
+    variant_specs = getattr(args, "variant", None)
+    if not variant_specs:
+        return None
+    return [
+        BuildVariant(
+            output_dir=output_dir,
+            base_url=variant_base_url if variant_base_url is not None else base_url,
+            content_dirs=get_content_dirs(
+                args.content_dir, args.drafts if drafts is None else drafts
+            ),
+        )
+        for output_dir, variant_base_url, drafts in [
+            (args.output_dir, None, None),
+            *variant_specs,
+        ]
+    ]
+
+
+def perform_build(args: argparse.Namespace, clean: bool) -> bool:
+    """Load the site configuration, build the site and return whether it succeeded."""
+    from straightshot.builder import build_site
+
+    logger = logging.getLogger(__name__)
+
+    output_dirs = [args.output_dir] + [
+        spec[0] for spec in getattr(args, "variant", None) or []
+    ]
+    for output_dir in output_dirs:
+        if clean and output_dir.exists():
+            logger.info(f"Cleaning output directory: {output_dir}")
+            shutil.rmtree(output_dir)
+
+    cache_dir = get_cache_dir(args)
+
+    logger.info("Loading site config...")
+    site_context = load_config(args.site_config, args.base_url, cache_dir)
+    content_config = create_content_config(args, cache_dir)
+    variants = create_build_variants(args, site_context.base_url)
+
+    logger.info("Starting site build...")
+    result = build_site(site_context, content_config, variants)
+
+    if not result.success:
+        logger.error(f"Build failed with {len(result.errors)} errors")
+    return report_build_metrics(args, result) and result.success
+
+
+def report_build_metrics(args: argparse.Namespace, result: "BuildResult") -> bool:
+    """Write the metrics report and check it against the baseline, if requested."""
+    from straightshot.metrics import (
+        compare_build_metrics,
+        load_metrics_report,
+        write_metrics_report,
+    )
+
+    logger = logging.getLogger(__name__)
+    metrics_path = getattr(args, "metrics_json", None)
+    baseline_path = getattr(args, "metrics_baseline", None)
+    if result.metrics is None:
+        return True
+
+    # Read the baseline first, it may be the file this build is about to replace
+    baseline = None
+    if baseline_path is not None:
+        try:
+            baseline = load_metrics_report(baseline_path)
+        except FileNotFoundError:
+            logger.warning(
+                f"Metrics baseline {baseline_path} not found, skipping check"
+            )
+        except Exception as e:
+            logger.error(f"Could not read metrics baseline {baseline_path}: {e}")
+            return False
+
+    if metrics_path is not None:
+        write_metrics_report(metrics_path, result.metrics)
+        logger.info(f"Wrote build metrics to {metrics_path}")
+
+    if baseline is None:
+        return True
+    regressions = compare_build_metrics(
+        baseline, result.metrics, args.metrics_threshold
+    )
+    for regression in regressions:
+        logger.error(f"Metrics regression: {regression}")
+    if regressions:
+        logger.error(
+            f"{len(regressions)} metrics regressed by more than "
+            f"{args.metrics_threshold:.0%} against {baseline_path}"
+        )
+    return not regressions
+
+
+def validate_variant_args(args: argparse.Namespace) -> None:
+    """Exit if `--variant` is combined with options that write a single output."""
+    variant_specs = getattr(args, "variant", None)
+    if not variant_specs:
+        return
+    for option in ("shard", "output_archive", "deploy_delta"):
+        if getattr(args, option, None):
+            print(
+                f"Error: --{option.replace('_', '-')} cannot be combined with --variant"
+            )
+            sys.exit(1)
+    output_dirs = [args.output_dir.resolve()] + [
+        spec[0].resolve() for spec in variant_specs
+    ]
+    if len(set(output_dirs)) != len(output_dirs):
+        print("Error: every --variant needs its own output_dir")
+        sys.exit(1)
+
+
+def run_build(args: argparse.Namespace) -> None:
+    """Run the build command and exit with its status."""
+    validate_build_args(args)
+    if getattr(args, "shard", None) and getattr(args, "output_archive", None):
+        print("Error: --output-archive cannot be combined with --shard")
+        sys.exit(1)
+    validate_variant_args(args)
+    setup_logging(args.verbose)
+    sys.exit(0 if perform_build(args, args.clean) else 1)
+
+
+def run_merge(args: argparse.Namespace) -> None:
+    """Merge the outputs of a sharded build and exit with its status."""
+    from straightshot.sharding import merge_shard_outputs
+
+    setup_logging(args.verbose)
+    logger = logging.getLogger(__name__)
+
+    if args.clean and args.output_dir.exists():
+        logger.info(f"Cleaning output directory: {args.output_dir}")
+        shutil.rmtree(args.output_dir)
+
+    result = merge_shard_outputs(args.shard_dirs, args.output_dir)
+    for error in result.errors:
+        logger.error(error)
+    if not result.success:
+        logger.error(f"Merge failed with {len(result.errors)} errors")
+        sys.exit(1)
+    logger.info(
+        f"Merged {len(result.output_files)} files from {len(args.shard_dirs)} shards "
+        f"into {args.output_dir}"
+    )
+
+
+def run_analyze_templates(args: argparse.Namespace) -> None:
+    """Report costly template constructs and exit with status 1 if there are any."""
+    from straightshot.template_analysis import (
+        analyze_templates,
+        create_analysis_environment,
+    )
+
+    setup_logging(args.verbose)
+    logger = logging.getLogger(__name__)
+
+    if not args.templates_dir.is_dir():
+        logger.error(f"Templates directory not found: {args.templates_dir}")
+        sys.exit(1)
+    custom_tags = {}
+    if args.site_config is not None:
+        custom_tags = load_config(args.site_config, None, None).custom_tags
+
+    env = create_analysis_environment(args.templates_dir)
+    findings = analyze_templates(env, custom_tags)
+    for finding in findings:
+        print(f"{finding.template}:{finding.line}: {finding.message}")
+    if findings:
+        logger.warning(
+            f"Found {len(findings)} template constructs that grow with the site; "
+            "use articles_by(), recent() or a bounded slice instead"
+        )
+        sys.exit(1)
+    logger.info(f"No costly constructs in {len(env.list_templates())} templates")
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """Serve the site and rebuild (or re-render previews) whenever an input changes."""
+    from straightshot.dev_server import DevServer, PageSource, run_dev_server
+
+    setup_logging(args.verbose)
+    logger = logging.getLogger(__name__)
+
+    rebuild: Callable[[set[str]], bool]
+    page_source: PageSource | None = None
+    if args.preview:
+        from straightshot.preview import PreviewSite
+
+        cache_dir = get_cache_dir(args)
+        preview = PreviewSite(
+            lambda: load_config(args.site_config, args.base_url, cache_dir),
+            create_content_config(args, cache_dir),
+        )
+        page_source = preview
+        rebuild = preview.apply_changes
+    else:
+        perform_build(args, args.clean)
+
+        def rebuild(changed_paths: set[str]) -> bool:
+            try:
+                return perform_build(args, clean=False)
+            except SystemExit:
+                # load_config exits on invalid configuration; keep serving
+                return False
+
+    try:
+        server = DevServer(
+            (args.host, args.port),
+            args.output_dir.resolve(),
+            not args.no_live_reload,
+            page_source,
+        )
+    except OSError as e:
+        logger.error(f"Could not listen on {args.host}:{args.port}: {e}")
+        sys.exit(1)
+    watch_paths = [
+        args.content_dir,
+        args.templates_dir,
+        args.static_dir,
+        args.site_config,
+    ]
+    run_dev_server(server, watch_paths, rebuild)
+
+
 def main() -> None:
     """Main entry point for the straightshot CLI."""
     try:
@@ -102,39 +395,21 @@ def main() -> None:
             show_documentation(args.doc_name)
             return
 
-        # Handle build command (default)
-        if args.command == "build":
-            validate_build_args(args)
-            setup_logging(args.verbose)
-
-            logger = logging.getLogger(__name__)
-
-            if args.clean and args.output_dir.exists():
-                logger.info(f"Cleaning output directory: {args.output_dir}")
-                shutil.rmtree(args.output_dir)
-
-            logger.info("Loading site config...")
-            site_context = load_config(args.site_config, args.base_url)
-
-            content_dirs = [args.content_dir / "publish"] + (
-                [args.content_dir / "drafts"] if args.drafts else []
-            )
-            content_config = ContentProcessingConfig(
-                content_root=args.content_dir,
-                content_dirs=content_dirs,
-                static_dir=args.static_dir,
-                templates_dir=args.templates_dir,
-                output_dir=args.output_dir,
-            )
+        if args.command == "serve":
+            run_serve(args)
+            return
 
-            logger.info("Starting site build...")
-            result = build_site(site_context, content_config)
+        if args.command == "merge":
+            run_merge(args)
+            return
 
-            if not result.success:
-                logger.error(f"Build failed with {len(result.errors)} errors")
-                sys.exit(1)
+        if args.command == "analyze-templates":
+            run_analyze_templates(args)
+            return
 
-            sys.exit(0)
+        # Handle build command (default)
+        if args.command == "build":
+            run_build(args)
 
     except Exception as e:
         logger = logging.getLogger(__name__)
@@ -0,0 +1,229 @@
+"""
+Memory profiling: traced Python allocations per build phase.
+
+With `--profile-memory` the build runs under tracemalloc. The metrics collector
+hands every phase boundary to a `MemoryProfiler`, which records the peak traced
+memory while the phase ran, how much memory the phase left behind and the source
+lines that allocated it. After the site metadata is computed, when every article
+is loaded, the memory held per article is estimated by walking the objects.
+
+The profile is written as text and JSON next to the output directory (or
+archive), so it is not deployed with the site.
+"""
+
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from straightshot.models import (
+    AllocationSite,
+    ArticleFootprint,
+    BuildResult,
+    ContentFile,
+    ContentProcessingConfig,
+    MemoryPhaseProfile,
+    MemoryProfile,
+)
+
+TOP_ALLOCATIONS_COUNT = 10
+# ContentFile fields referencing other articles, counted as links rather than model
+LINK_FIELDS = ("previous", "next", "related", "alternate_languages")
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def _compute_size(obj: Any, seen: set[int]) -> int:
+    """Return the size of an object and everything it holds that is not in `seen`."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            _compute_size(key, seen) + _compute_size(value, seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_compute_size(item, seen) for item in obj)
+    elif isinstance(obj, BaseModel):
+        size += _compute_size(obj.__dict__, seen)
+    return size
+
+
+def compute_article_footprint(content_files: list[ContentFile]) -> ArticleFootprint:
+    """
+    Estimate the memory held by the loaded articles.
+
+    Objects shared between articles (interned strings, topic names) are counted
+    once. References to other articles count only the containers holding them,
+    as the referenced articles are counted themselves.
+    """
+    footprint = ArticleFootprint(articles=len(content_files))
+    seen: set[int] = {id(content_file) for content_file in content_files}
+    for content_file in content_files:
+        fields = content_file.__dict__
+        seen.add(id(fields))
+        footprint.model_bytes += sys.getsizeof(content_file) + sys.getsizeof(fields)
+        for name, value in fields.items():
+            if name == "html":
+                footprint.html_bytes += _compute_size(value, seen)
+            elif name in LINK_FIELDS:
+                footprint.link_bytes += _compute_size(value, seen)
+            else:
+                footprint.model_bytes += _compute_size(value, seen)
+        if content_file.html:
+            footprint.articles_with_html += 1
+    return footprint
+
+
+class MemoryProfiler:
+    """Records traced memory at the phase boundaries of one build."""
+
+    def __init__(self) -> None:
+        self._started_tracing = False
+        self._phases: dict[str, MemoryPhaseProfile] = {}
+        self._article_footprint: ArticleFootprint | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._phase_start_bytes = 0
+
+    def start(self) -> None:
+        """Start tracing allocations, unless tracemalloc is already running."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing if `start` started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._snapshot = None
+
+    def start_phase(self) -> None:
+        self._phase_start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self._snapshot = _take_snapshot()
+
+    def end_phase(self, name: str) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        top_allocations = []
+        if self._snapshot is not None:
+            differences = _take_snapshot().compare_to(self._snapshot, "lineno")
+            for difference in differences:
+                if difference.size_diff <= 0:
+                    continue
+                frame = difference.traceback[0]
+                top_allocations.append(
+                    AllocationSite(
+                        location=f"{frame.filename}:{frame.lineno}",
+                        size_bytes=difference.size_diff,
+                        blocks=difference.count_diff,
+                    )
+                )
+                if len(top_allocations) == TOP_ALLOCATIONS_COUNT:
+                    break
+            self._snapshot = None
+
+        phase = self._phases.setdefault(name, MemoryPhaseProfile())
+        phase.peak_bytes = max(phase.peak_bytes, peak)
+        phase.retained_bytes += current - self._phase_start_bytes
+        phase.current_bytes = current
+        phase.top_allocations = top_allocations
+
+    def record_article_footprint(self, content_files: list[ContentFile]) -> None:
+        self._article_footprint = compute_article_footprint(content_files)
+
+    def compute_profile(self) -> MemoryProfile:
+        """Summarize the recorded phases into a profile."""
+        peak = max((phase.peak_bytes for phase in self._phases.values()), default=0)
+        if tracemalloc.is_tracing():
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        return MemoryProfile(
+            peak_bytes=peak,
+            phases=dict(self._phases),
+            article_footprint=self._article_footprint,
+        )
+
+
+def _format_bytes(size: int) -> str:
+    if abs(size) >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MiB"
+    return f"{size / 1024:.1f} KiB"
+
+
+def generate_memory_report(profile: MemoryProfile) -> str:
+    """Generate a human readable report of a memory profile."""
+    lines = [
+        "Memory profile (Python allocations traced by tracemalloc)",
+        f"Peak traced memory: {_format_bytes(profile.peak_bytes)}",
+        "",
+        f"{'Phase':<20} {'Peak':>12} {'Retained':>12} {'Current':>12}",
+    ]
+    for name, phase in profile.phases.items():
+        lines.append(
+            f"{name:<20} {_format_bytes(phase.peak_bytes):>12} "
+            f"{_format_bytes(phase.retained_bytes):>12} "
+            f"{_format_bytes(phase.current_bytes):>12}"
+        )
+
+    footprint = profile.article_footprint
+    if footprint is not None and footprint.articles:
+        lines += [
+            "",
+            f"Per-article footprint ({footprint.articles} articles, "
+            f"{footprint.articles_with_html} with rendered HTML):",
+            f"  ContentFile and metadata  {_format_bytes(footprint.model_bytes // footprint.articles):>12}",
+            f"  HTML                      {_format_bytes(footprint.html_bytes // footprint.articles):>12}",
+            f"  Related and links         {_format_bytes(footprint.link_bytes // footprint.articles):>12}",
+            f"  Total                     {_format_bytes(footprint.bytes_per_article):>12}",
+        ]
+
+    for name, phase in profile.phases.items():
+        if not phase.top_allocations:
+            continue
+        lines += ["", f"Top allocation sites retained by phase {name}:"]
+        for site in phase.top_allocations:
+            lines.append(
+                f"  {_format_bytes(site.size_bytes):>12} {site.blocks:>8} blocks  {site.location}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def get_memory_profile_path(content_config: ContentProcessingConfig) -> Path:
+    """Return the path of the JSON profile; the text report uses the `.txt` suffix."""
+    output = (content_config.output_archive or content_config.output_dir).resolve()
+    return output.with_name(output.name + ".memory-profile.json")
+
+
+def write_memory_profile(
+    content_config: ContentProcessingConfig,
+    profile: MemoryProfile,
+    build_result: BuildResult,
+) -> bool:
+    """Write a memory profile as JSON and as a text report."""
+    logger = logging.getLogger(__name__)
+    json_path = get_memory_profile_path(content_config)
+    text_path = json_path.with_suffix(".txt")
+    try:
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        json_path.write_text(profile.model_dump_json(indent=2) + "\n", encoding="utf-8")
+        text_path.write_text(generate_memory_report(profile), encoding="utf-8")
+    except Exception as e:
+        build_result.errors.append(f"Error writing memory profile {json_path}: {e}")
+        return False
+    logger.info(f"Wrote memory profile to {text_path} and {json_path}")
+    return True
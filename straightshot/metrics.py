@@ -0,0 +1,286 @@
+"""
+Build metrics: phase timings, template render statistics and resource usage.
+
+The collector is process-wide, like the code highlighter: the build resets it
+at the start and turns it into a `BuildMetrics` report at the end. Template
+renders are timed by the `TimedTemplate` class installed in every Jinja
+environment, pages by the render pipeline. When a build times blocks, the
+blocks of templates compiled during that build are timed as well.
+"""
+
+import heapq
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import jinja2
+
+from straightshot.models import (
+    BuildMetrics,
+    BuildResult,
+    PageMetrics,
+    PhaseMetrics,
+    StageTiming,
+    TemplateMetrics,
+)
+
+if TYPE_CHECKING:
+    from straightshot.memory_profile import MemoryProfiler
+
+SLOWEST_PAGES_COUNT = 10
+SECONDS_PRECISION = 6  # Report timings in microseconds
+# Timings below this are too noisy to be reported as regressions
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def get_peak_rss_bytes() -> int:
+    """Return the peak resident set size of this process, or 0 where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _round_phase(wall_seconds: float, cpu_seconds: float) -> PhaseMetrics:
+    return PhaseMetrics(
+        wall_seconds=round(wall_seconds, SECONDS_PRECISION),
+        cpu_seconds=round(cpu_seconds, SECONDS_PRECISION),
+    )
+
+
+def _round_template(stats: TemplateMetrics) -> TemplateMetrics:
+    return TemplateMetrics(
+        renders=stats.renders,
+        total_seconds=round(stats.total_seconds, SECONDS_PRECISION),
+        blocks={
+            name: _round_template(block) for name, block in sorted(stats.blocks.items())
+        },
+    )
+
+
+class MetricsCollector:
+    """Thread-safe collector for the timings of one build."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(
+        self,
+        memory_profiler: "MemoryProfiler | None" = None,
+        measure_blocks: bool = False,
+    ) -> None:
+        """Forget everything recorded by a previous build."""
+        with self._lock:
+            self.memory_profiler = memory_profiler
+            self.measure_blocks = measure_blocks
+            self._start_wall = time.perf_counter()
+            self._start_cpu = time.process_time()
+            self._phases: dict[str, PhaseMetrics] = {}
+            self._templates: dict[str, TemplateMetrics] = {}
+            self._slowest_pages: list[tuple[float, str]] = []
+            self._pages_rendered = 0
+
+    @contextmanager
+    def measure_phase(self, name: str) -> Iterator[None]:
+        """
+        Add the wall clock and CPU time of the enclosed block to a phase.
+
+        The CPU time is that of the calling thread, so phases running
+        concurrently do not count each other's work; work the block hands to
+        other threads (the page writers) only shows in the build's total.
+        With a memory profiler, the phase boundaries are also memory snapshots.
+        """
+        memory_profiler = self.memory_profiler
+        if memory_profiler is not None:
+            memory_profiler.start_phase()
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            with self._lock:
+                phase = self._phases.setdefault(name, PhaseMetrics())
+                phase.wall_seconds += wall
+                phase.cpu_seconds += cpu
+            if memory_profiler is not None:
+                memory_profiler.end_phase(name)
+
+    def record_template_render(self, template_name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._templates.setdefault(template_name, TemplateMetrics())
+            stats.renders += 1
+            stats.total_seconds += seconds
+
+    def record_block_render(
+        self, template_name: str, block_name: str, seconds: float
+    ) -> None:
+        with self._lock:
+            template = self._templates.setdefault(template_name, TemplateMetrics())
+            stats = template.blocks.setdefault(block_name, TemplateMetrics())
+            stats.renders += 1
+            stats.total_seconds += seconds
+
+    def record_page_render(self, relative_path: str, seconds: float) -> None:
+        with self._lock:
+            self._pages_rendered += 1
+            entry = (seconds, relative_path)
+            if len(self._slowest_pages) < SLOWEST_PAGES_COUNT:
+                heapq.heappush(self._slowest_pages, entry)
+            else:
+                heapq.heappushpop(self._slowest_pages, entry)
+
+    def compute_metrics(
+        self, build_result: BuildResult, bytes_read: int
+    ) -> BuildMetrics:
+        """Summarize the recorded timings and the build result into a report."""
+        with self._lock:
+            return BuildMetrics(
+                total=_round_phase(
+                    time.perf_counter() - self._start_wall,
+                    time.process_time() - self._start_cpu,
+                ),
+                phases={
+                    name: _round_phase(phase.wall_seconds, phase.cpu_seconds)
+                    for name, phase in self._phases.items()
+                },
+                templates={
+                    name: _round_template(stats)
+                    for name, stats in sorted(self._templates.items())
+                },
+                pages_rendered=self._pages_rendered,
+                bytes_read=bytes_read,
+                bytes_written=sum(
+                    record.size for record in build_result.output_files.values()
+                ),
+                caches=dict(sorted(build_result.cache_stats.items())),
+                slowest_pages=[
+                    PageMetrics(path=path, seconds=round(seconds, SECONDS_PRECISION))
+                    for seconds, path in sorted(self._slowest_pages, reverse=True)
+                ],
+                critical_path=[
+                    StageTiming(
+                        name=stage.name,
+                        seconds=round(stage.seconds, SECONDS_PRECISION),
+                    )
+                    for stage in build_result.critical_path
+                ],
+                peak_rss_bytes=get_peak_rss_bytes(),
+            )
+
+
+_metrics_collector = MetricsCollector()
+
+
+def get_metrics_collector() -> MetricsCollector:
+    """Return the process-wide metrics collector."""
+    return _metrics_collector
+
+
+BlockRenderFunc = Callable[[jinja2.runtime.Context], Iterator[str]]
+
+
+def _time_block(
+    template_name: str, block_name: str, render_func: BlockRenderFunc
+) -> BlockRenderFunc:
+    def render_block(context: jinja2.runtime.Context) -> Iterator[str]:
+        # Pages are rendered in one go, so this includes the blocks nested in it
+        start = time.perf_counter()
+        try:
+            yield from render_func(context)
+        finally:
+            _metrics_collector.record_block_render(
+                template_name, block_name, time.perf_counter() - start
+            )
+
+    return render_block
+
+
+class TimedTemplate(jinja2.Template):
+    """Jinja template that reports the duration of every render to the collector."""
+
+    @classmethod
+    def _from_namespace(
+        cls,
+        environment: jinja2.Environment,
+        namespace: Any,
+        globals: Any,
+    ) -> jinja2.Template:
+        if _metrics_collector.measure_blocks and not environment.is_async:
+            template_name = namespace["name"] or "<string>"
+            for name, render_func in list(namespace["blocks"].items()):
+                timed_func = _time_block(template_name, name, render_func)
+                namespace["blocks"][name] = timed_func
+                # `super()` looks up the block function by this module global
+                namespace[f"block_{name}"] = timed_func
+        return super()._from_namespace(environment, namespace, globals)
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            _metrics_collector.record_template_render(
+                self.name or "<string>", time.perf_counter() - start
+            )
+
+
+def compute_directory_size(directory: Path) -> int:
+    """Return the total size of the files below a directory."""
+    if not directory.is_dir():
+        return 0
+    return sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+
+
+def write_metrics_report(metrics_path: Path, metrics: BuildMetrics) -> None:
+    """Write a metrics report as JSON."""
+    metrics_path.parent.mkdir(parents=True, exist_ok=True)
+    metrics_path.write_text(metrics.model_dump_json(indent=2) + "\n", encoding="utf-8")
+
+
+def load_metrics_report(metrics_path: Path) -> BuildMetrics:
+    """Load a metrics report written by a previous build."""
+    return BuildMetrics.model_validate_json(metrics_path.read_text(encoding="utf-8"))
+
+
+def _exceeds(current: float, baseline: float, threshold: float) -> bool:
+    return current > baseline * (1 + threshold)
+
+
+def compare_build_metrics(
+    baseline: BuildMetrics, current: BuildMetrics, threshold: float
+) -> list[str]:
+    """
+    List the metrics that regressed by more than `threshold` (0.2 = 20%).
+
+    Compared are the total and per-phase wall time, bytes written and peak RSS.
+    Timings shorter than `MIN_REGRESSION_SECONDS` are ignored as noise.
+    """
+    regressions = []
+    timings = {"total": (baseline.total, current.total)}
+    for name, phase in current.phases.items():
+        if name in baseline.phases:
+            timings[f"phase {name}"] = (baseline.phases[name], phase)
+    for name, (before, after) in timings.items():
+        if after.wall_seconds >= MIN_REGRESSION_SECONDS and _exceeds(
+            after.wall_seconds, before.wall_seconds, threshold
+        ):
+            regressions.append(
+                f"{name} wall time {after.wall_seconds:.3f}s vs {before.wall_seconds:.3f}s"
+            )
+    for name, before_value, after_value in (
+        ("bytes written", baseline.bytes_written, current.bytes_written),
+        ("peak RSS", baseline.peak_rss_bytes, current.peak_rss_bytes),
+    ):
+        if before_value and _exceeds(after_value, before_value, threshold):
+            regressions.append(f"{name} {after_value} vs {before_value}")
+    return regressions
@@ -4,9 +4,9 @@ Data models for the site generator.
 
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 
 DEFAULT_DATE_FORMAT = "%Y-%m-%d"  # Default date format for the site
 REQUIRED_FRONTMATTER = ["title", "written", "topics"]
@@ -22,6 +22,29 @@ class StandalonePageConfig(BaseModel):
     output: Path  # Output path for the rendered file, relative to the output directory.
 
 
+class CachingConfig(BaseModel):
+    """HTTP caching policy per output category, used to generate server configuration."""
+
+    html: str = "public, max-age=0, must-revalidate"  # Article and standalone pages
+    feeds: str = "public, max-age=3600"  # Feeds, sitemaps and JSON indexes
+    static: str = "public, max-age=604800"  # Files copied from the static directory
+    # Generated files, relative to the output directory; None disables a file
+    headers_file: Optional[str] = "_headers"
+    nginx_map_file: Optional[str] = "_nginx_cache_map.conf"
+
+
+class ResourceHintsConfig(BaseModel):
+    """Prefetch hints for the pages a visitor likely opens next, and preload hints."""
+
+    enabled: bool = True
+    # `<link rel="prefetch">` tags, or a `<script type="speculationrules">` block
+    mode: Literal["prefetch", "speculation-rules"] = "prefetch"
+    max_prefetch: int = 3  # Articles prefetched per page: next, previous, related
+    max_related: int = 2  # Related articles among them
+    # Static files every page needs early (CSS, fonts, scripts), relative to the site
+    preload: List[str] = Field(default_factory=list)
+
+
 class Metadata(BaseModel):
     """Content file metadata from frontmatter."""
 
@@ -85,11 +108,17 @@ class SiteContext(BaseModel):
     data: Dict[str, Any] = Field(
         default_factory=dict
     )  # User-defined data from YAML/JSON includes
+    caching: Optional[CachingConfig] = None  # Generate HTTP caching configuration
+    resource_hints: Optional[ResourceHintsConfig] = None  # Prefetch and preload hints
+    # Lazy media, external link attributes and code block wrappers at build time
+    html_enhancements: bool = True
 
     # --- Runtime context fields ---
     articles: List[ContentFile] = Field(default_factory=list)
     topics: Dict[str, List[ContentFile]] = Field(default_factory=dict)
     languages: List[str] = Field(default_factory=list)  # All languages found in content
+    # Generated syntax stylesheet, relative to the output directory
+    syntax_stylesheet: Optional[str] = None
 
     def __post_init__(self) -> None:
         # Normalize base_url
@@ -99,6 +128,122 @@ class SiteContext(BaseModel):
             self.base_url += "/"
 
 
+class CacheStats(BaseModel):
+    """Hit/miss counters of one of the build caches."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PhaseMetrics(BaseModel):
+    """Wall clock time and per-thread CPU time spent in one build phase."""
+
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+
+
+class TemplateMetrics(BaseModel):
+    """How often a template was rendered and the cumulative time it took."""
+
+    renders: int = 0
+    total_seconds: float = 0.0
+    # The same per block of the template, when blocks are timed
+    blocks: Dict[str, "TemplateMetrics"] = Field(default_factory=dict)
+
+
+class PageMetrics(BaseModel):
+    """Time spent rendering one content page."""
+
+    path: str
+    seconds: float
+
+
+class StageTiming(BaseModel):
+    """Duration of one build stage run by the stage scheduler."""
+
+    name: str
+    seconds: float
+
+
+class TemplateFinding(BaseModel):
+    """A construct in a template that makes rendering the site scale badly."""
+
+    template: str
+    line: int
+    message: str
+
+
+class BuildMetrics(BaseModel):
+    """Structured performance report of a build, stable enough to diff between runs."""
+
+    version: int = 1
+    total: PhaseMetrics = Field(default_factory=PhaseMetrics)
+    phases: Dict[str, PhaseMetrics] = Field(default_factory=dict)
+    templates: Dict[str, TemplateMetrics] = Field(default_factory=dict)
+    pages_rendered: int = 0
+    bytes_read: int = 0  # Content sources and static files
+    bytes_written: int = 0
+    caches: Dict[str, CacheStats] = Field(default_factory=dict)
+    slowest_pages: List[PageMetrics] = Field(default_factory=list)
+    critical_path: List[StageTiming] = Field(default_factory=list)
+    peak_rss_bytes: int = 0
+
+
+class AllocationSite(BaseModel):
+    """Memory a source line allocated during a phase and still held at its end."""
+
+    location: str  # file:line
+    size_bytes: int
+    blocks: int
+
+
+class MemoryPhaseProfile(BaseModel):
+    """Traced Python memory of one build phase."""
+
+    peak_bytes: int = 0  # Highest traced memory while the phase ran
+    retained_bytes: int = 0  # Growth of traced memory from start to end of the phase
+    current_bytes: int = 0  # Traced memory at the end of the phase
+    top_allocations: List[AllocationSite] = Field(default_factory=list)
+
+
+class ArticleFootprint(BaseModel):
+    """Estimated memory held by the loaded articles, split by what holds it."""
+
+    articles: int = 0
+    articles_with_html: int = 0
+    model_bytes: int = 0  # ContentFile and metadata objects with their values
+    html_bytes: int = 0
+    link_bytes: int = 0  # related, previous/next and alternate language references
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def bytes_per_article(self) -> int:
+        total = self.model_bytes + self.html_bytes + self.link_bytes
+        return total // self.articles if self.articles else 0
+
+
+class MemoryProfile(BaseModel):
+    """Memory profile of a build, recorded with tracemalloc at every phase boundary."""
+
+    version: int = 1
+    peak_bytes: int = 0
+    phases: Dict[str, MemoryPhaseProfile] = Field(default_factory=dict)
+    article_footprint: Optional[ArticleFootprint] = None
+
+
+class OutputFileRecord(BaseModel):
+    """Size and content hash of a file written to the output directory."""
+
+    size: int
+    sha256: str
+
+
 class BuildResult(BaseModel):
     """Result of a site build operation."""
 
@@ -107,6 +252,118 @@ class BuildResult(BaseModel):
     files_skipped: int = 0
     errors: List[str] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list)
+    peak_in_flight_bytes: int = 0  # Largest amount of rendered HTML awaiting a write
+    cache_stats: Dict[str, CacheStats] = Field(default_factory=dict)
+    # Files written by this build, keyed by POSIX path relative to the output directory
+    output_files: Dict[str, OutputFileRecord] = Field(default_factory=dict)
+    # Chain of dependent output stages that determined the output generation time
+    critical_path: List[StageTiming] = Field(default_factory=list)
+    metrics: Optional[BuildMetrics] = None
+    memory_profile: Optional[MemoryProfile] = None
+    # Why each page was rendered, for pages that could have been kept otherwise
+    render_reasons: Dict[str, str] = Field(default_factory=dict)
+    pages_kept: int = 0  # Pages left unchanged from the previous build
+
+
+class ArticleRecord(BaseModel):
+    """A content file in a site snapshot, with links to other articles as indices."""
+
+    path: Path
+    slug: str
+    reference_slug: str
+    url: str
+    html: str = ""
+    metadata: Metadata
+    content_id: Optional[str] = None
+    previous: Optional[int] = None
+    next: Optional[int] = None
+    related: List[int] = Field(default_factory=list)
+    alternate_languages: Dict[str, int] = Field(default_factory=dict)
+
+
+class SiteSnapshot(BaseModel):
+    """The processed site model, valid as long as the inputs match the fingerprint."""
+
+    version: int = 1
+    fingerprint: str
+    articles: List[ArticleRecord] = Field(default_factory=list)
+    topics: Dict[str, List[int]] = Field(default_factory=dict)
+    languages: List[str] = Field(default_factory=list)
+    # Outcome of loading the content, replayed into the build result on restore
+    files_processed: int = 0
+    files_skipped: int = 0
+    warnings: List[str] = Field(default_factory=list)
+
+
+class PageRenderRecord(BaseModel):
+    """The templates a rendered page depends on and the file it produced."""
+
+    templates: List[str]
+    output: OutputFileRecord
+
+
+class RenderManifest(BaseModel):
+    """What the previous build rendered, to decide which pages a build can keep."""
+
+    inputs_fingerprint: str  # Content files and site configuration
+    templates: Dict[str, str]  # Template name -> SHA-256 of its source
+    pages: Dict[str, PageRenderRecord] = Field(default_factory=dict)
+
+
+class RenderedPage(BaseModel):
+    """A rendered page on its way from the template engine to the output directory."""
+
+    relative_path: Path  # Output path, relative to the output directory
+    content: str
+
+
+class DeployDelta(BaseModel):
+    """Output files that differ from the previous build of the same output."""
+
+    added: Dict[str, OutputFileRecord] = Field(default_factory=dict)
+    changed: Dict[str, OutputFileRecord] = Field(default_factory=dict)
+    removed: List[str] = Field(default_factory=list)
+
+
+class OutputHeaders(BaseModel):
+    """HTTP response headers for one output URL."""
+
+    url: str
+    cache_control: str
+    content_type: str
+    etag: str
+
+
+class ShardSpec(BaseModel):
+    """Selects one of several builds that together render the whole site."""
+
+    index: int  # 1-based; shard 1 also writes the site-wide outputs
+    count: int
+
+    @property
+    def is_primary(self) -> bool:
+        return self.index == 1
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+class ShardManifest(BaseModel):
+    """Files written by one shard of a sharded build."""
+
+    shard: ShardSpec
+    files: Dict[str, OutputFileRecord] = Field(default_factory=dict)
+
+
+class BuildVariant(BaseModel):
+    """One output of a multi-variant build: the site with its own base URL and content."""
+
+    output_dir: Path
+    base_url: str
+    content_dirs: List[Path]  # A subset of the content directories loaded for all
+
+    def __str__(self) -> str:
+        return str(self.output_dir)
 
 
 class ContentProcessingConfig(BaseModel):
@@ -117,6 +374,21 @@ class ContentProcessingConfig(BaseModel):
     templates_dir: Path
     static_dir: Path
     output_dir: Path
+    render_window: int = 16  # Maximum number of rendered pages waiting to be written
+    write_workers: int = 4  # Threads writing rendered pages to the output directory
+    cache_dir: Optional[Path] = None  # Persistent build cache, None disables it
+    # True renders all markdown while loading; by default each article's markdown
+    # is rendered right before its page, so not every article's HTML is in memory
+    render_markdown: bool = False
+    shard: Optional[ShardSpec] = None  # Render only this shard's slice of the content
+    output_archive: Optional[Path] = None  # Write the site to this archive instead
+    deploy_delta: Optional[Path] = (
+        None  # Where to write the changes since the last build
+    )
+    profile_memory: bool = False  # Trace allocations and write a memory profile
+    site_snapshot: bool = True  # Reuse the processed site model from the build cache
+    # Warn about templates taking longer than this per render on average
+    template_budget_ms: Optional[float] = None
     required_frontmatter: List[str] = Field(
         default_factory=lambda: REQUIRED_FRONTMATTER.copy()
     )
@@ -0,0 +1,181 @@
+"""
+Single-archive output: collects the site in one archive instead of a directory tree.
+
+Written files are appended to one temporary spool file as they arrive, so a
+build creates two files on disk instead of one per page. When the build is done
+the spooled files are written to the archive in path order with fixed
+timestamps and permissions, so the same site always produces the same archive.
+"""
+
+import gzip
+import importlib.util
+import io
+import json
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import IO, Any
+
+# 1980-01-01, the earliest timestamp a zip file can store
+DEFAULT_ARCHIVE_MTIME = 315532800
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.zst")
+# Files that do not get smaller when deflated again
+PRECOMPRESSED_SUFFIXES = {".gz", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".woff2"}
+
+
+def get_archive_format(archive_path: Path) -> str | None:
+    """Return the archive suffix of a path, or None if it is not a supported archive."""
+    name = archive_path.name.lower()
+    return next((suffix for suffix in ARCHIVE_SUFFIXES if name.endswith(suffix)), None)
+
+
+def compute_archive_mtime() -> int:
+    """Return the timestamp stored for every archive member (honours SOURCE_DATE_EPOCH)."""
+    source_date_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if source_date_epoch and source_date_epoch.isdigit():
+        return max(int(source_date_epoch), DEFAULT_ARCHIVE_MTIME)
+    return DEFAULT_ARCHIVE_MTIME
+
+
+class OutputArchive:
+    """
+    Collects output files in a spool file and writes them to an archive on close.
+
+    `add_file` is thread-safe so the page writer threads can share one archive.
+    Adding a path again replaces its previous content.
+    """
+
+    def __init__(self, archive_path: Path) -> None:
+        archive_format = get_archive_format(archive_path)
+        if archive_format is None:
+            raise ValueError(
+                f"Unsupported archive {archive_path}, expected one of: {', '.join(ARCHIVE_SUFFIXES)}"
+            )
+        if (
+            archive_format == ".tar.zst"
+            and importlib.util.find_spec("zstandard") is None
+        ):
+            raise RuntimeError(
+                "Writing .tar.zst archives requires the zstandard package "
+                "(pip install straightshot[zstd])"
+            )
+        self.archive_path = archive_path
+        self.archive_format = archive_format
+        self._spool: IO[bytes] = tempfile.TemporaryFile(prefix="straightshot-")
+        self._entries: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def add_file(self, relative_path: Path, data: bytes) -> None:
+        """Add a file to the archive."""
+        with self._lock:
+            offset = self._spool.seek(0, io.SEEK_END)
+            self._spool.write(data)
+            self._entries[relative_path.as_posix()] = (offset, len(data))
+
+    def _read_entry(self, name: str) -> bytes:
+        offset, size = self._entries[name]
+        self._spool.seek(offset)
+        return self._spool.read(size)
+
+    def write_archive(self) -> None:
+        """
+        Write all added files to the archive, replacing any previous archive.
+
+        For `.zip` and `.tar` archives an index file (`<archive>.index.json`)
+        maps every path to the offset and size of its data within the archive,
+        so a server can answer requests straight from the archive.
+        """
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.archive_path.with_name(self.archive_path.name + ".tmp")
+        index: dict[str, Any] | None
+        with self._lock:
+            names = sorted(self._entries)
+            try:
+                with open(temp_path, "wb") as f:
+                    if self.archive_format == ".zip":
+                        index = self._write_zip(f, names)
+                    else:
+                        index = self._write_tar(f, names)
+                temp_path.replace(self.archive_path)
+            finally:
+                temp_path.unlink(missing_ok=True)
+
+        index_path = self.archive_path.with_name(self.archive_path.name + ".index.json")
+        if index is not None:
+            index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+        else:
+            index_path.unlink(missing_ok=True)
+
+    def _write_zip(self, f: io.BufferedIOBase, names: list[str]) -> dict[str, Any]:
+        index: dict[str, Any] = {}
+        year, month, day, hour, minute, second = time.gmtime(compute_archive_mtime())[
+            :6
+        ]
+        date_time = (year, month, day, hour, minute, second)
+        with zipfile.ZipFile(f, "w") as archive:
+            for name in names:
+                info = zipfile.ZipInfo(name, date_time=date_time)
+                info.create_system = 3  # Unix, so the permissions below are used
+                info.external_attr = 0o644 << 16
+                info.compress_type = (
+                    zipfile.ZIP_STORED
+                    if Path(name).suffix.lower() in PRECOMPRESSED_SUFFIXES
+                    else zipfile.ZIP_DEFLATED
+                )
+                archive.writestr(info, self._read_entry(name))
+                header_size = 30 + len(info.filename.encode("utf-8")) + len(info.extra)
+                index[name] = {
+                    "offset": info.header_offset + header_size,
+                    "size": info.file_size,
+                    "compressed_size": info.compress_size,
+                    "compression": "deflate"
+                    if info.compress_type == zipfile.ZIP_DEFLATED
+                    else "none",
+                }
+        return index
+
+    def _write_tar(
+        self, f: io.BufferedIOBase, names: list[str]
+    ) -> dict[str, Any] | None:
+        if self.archive_format == ".tar.zst":
+            import zstandard
+
+            with zstandard.ZstdCompressor().stream_writer(f, closefd=False) as stream:
+                self._write_tar_members(stream, names)
+            return None
+        if self.archive_format in (".tar.gz", ".tgz"):
+            with gzip.GzipFile(fileobj=f, mode="wb", filename="", mtime=0) as stream:
+                self._write_tar_members(stream, names)
+            return None
+        return self._write_tar_members(f, names)
+
+    def _write_tar_members(
+        self, f: io.BufferedIOBase, names: list[str]
+    ) -> dict[str, Any]:
+        index: dict[str, Any] = {}
+        mtime = compute_archive_mtime()
+        with tarfile.open(fileobj=f, mode="w", format=tarfile.PAX_FORMAT) as archive:
+            for name in names:
+                data = self._read_entry(name)
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = mtime
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(data))
+                # Member data ends at the current offset, padded to whole blocks
+                padded_size = -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                index[name] = {
+                    "offset": archive.offset - padded_size,
+                    "size": len(data),
+                    "compressed_size": len(data),
+                    "compression": "none",
+                }
+        return index
+
+    def close(self) -> None:
+        """Discard the spool file."""
+        self._spool.close()
@@ -1,44 +1,202 @@
 """
 Handles writing rendered content and static files to the output directory.
+
+All writers accept an `OutputTarget`: either the output directory or an
+`OutputArchive` that collects the site in a single archive file.
 """
 
+import hashlib
 import json
+import queue
 import shutil
+import sys
+import threading
 from pathlib import Path
+from types import TracebackType
 from typing import Any
 
-from straightshot.models import BuildResult
+from straightshot.models import BuildResult, OutputFileRecord, RenderedPage
+from straightshot.output_archive import OutputArchive
+
+OutputTarget = Path | OutputArchive
+COPY_CHUNK_SIZE = 1024 * 1024  # Bytes read at a time when copying static files
+
+
+def record_output_file(
+    build_result: BuildResult, relative_output_path: Path, data: bytes
+) -> None:
+    """Record the size and hash of a file written to the output directory."""
+    build_result.output_files[relative_output_path.as_posix()] = OutputFileRecord(
+        size=len(data), sha256=hashlib.sha256(data).hexdigest()
+    )
+
+
+def get_output_path(output: OutputTarget, relative_output_path: Path) -> Path:
+    """Return the path of an output file, for messages when writing to an archive."""
+    if isinstance(output, OutputArchive):
+        return output.archive_path / relative_output_path
+    return output / relative_output_path
+
+
+def write_output_bytes(
+    output: OutputTarget, relative_output_path: Path, data: bytes
+) -> None:
+    """Write a file to the output directory or archive; its directory must exist."""
+    if isinstance(output, OutputArchive):
+        output.add_file(relative_output_path, data)
+    else:
+        (output / relative_output_path).write_bytes(data)
 
 
 def write_rendered_page(
-    output_dir: Path,
+    output: OutputTarget,
     relative_output_path: Path,
     content: str,
     build_result: BuildResult,
 ) -> bool:
     """Write rendered HTML content to a file in the output directory."""
-    absolute_output_path = output_dir / relative_output_path
+    absolute_output_path = get_output_path(output, relative_output_path)
     try:
-        absolute_output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(absolute_output_path, "w", encoding="utf-8") as file:
-            file.write(content)
-        return True
+        if isinstance(output, Path):
+            absolute_output_path.parent.mkdir(parents=True, exist_ok=True)
     except Exception as e:
         build_result.errors.append(
             f"Error writing file {absolute_output_path}: {str(e)}"
         )
         return False
+    return write_page_file(output, relative_output_path, content, build_result)
+
+
+def write_page_file(
+    output: OutputTarget,
+    relative_output_path: Path,
+    content: str,
+    build_result: BuildResult,
+) -> bool:
+    """Write rendered HTML content to a file whose directory already exists."""
+    try:
+        data = content.encode("utf-8")
+        write_output_bytes(output, relative_output_path, data)
+        record_output_file(build_result, relative_output_path, data)
+        return True
+    except Exception as e:
+        build_result.errors.append(
+            f"Error writing file {get_output_path(output, relative_output_path)}: {str(e)}"
+        )
+        return False
+
+
+class BoundedPageWriter:
+    """
+    Writes rendered pages on a pool of background threads.
+
+    At most `window` pages wait in the queue; `submit` blocks once the window is
+    full, so rendering can never run far ahead of the disk. Writes overlap with
+    rendering and with each other, and every output directory is created only
+    once per writer. Pages are dropped as soon as they are written, releasing
+    their HTML.
+    """
+
+    def __init__(
+        self,
+        output: OutputTarget,
+        window: int,
+        build_result: BuildResult,
+        workers: int = 1,
+    ) -> None:
+        self.output = output
+        self.build_result = build_result
+        self.failed = False
+        self.peak_in_flight_bytes = 0
+        self._in_flight_bytes = 0
+        self._lock = threading.Lock()
+        self._created_dirs: set[Path] = set()
+        self._queue: queue.Queue[RenderedPage | None] = queue.Queue(
+            maxsize=max(1, window)
+        )
+        self._threads = [
+            threading.Thread(
+                target=self._run, name=f"straightshot-writer-{i}", daemon=True
+            )
+            for i in range(max(1, workers))
+        ]
+
+    def __enter__(self) -> "BoundedPageWriter":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.build_result.peak_in_flight_bytes = max(
+            self.build_result.peak_in_flight_bytes, self.peak_in_flight_bytes
+        )
+
+    def submit(self, page: RenderedPage) -> None:
+        """Queue a page for writing, blocking while the in-flight window is full."""
+        size = sys.getsizeof(page.content)
+        with self._lock:
+            self._in_flight_bytes += size
+            self.peak_in_flight_bytes = max(
+                self.peak_in_flight_bytes, self._in_flight_bytes
+            )
+        self._queue.put(page)
+
+    def _ensure_directory(self, relative_output_path: Path) -> bool:
+        """Create the directory of an output file unless this writer already did."""
+        if isinstance(self.output, OutputArchive):
+            return True
+        relative_dir = relative_output_path.parent
+        with self._lock:
+            if relative_dir in self._created_dirs:
+                return True
+        try:
+            (self.output / relative_dir).mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            self.build_result.errors.append(
+                f"Error writing file {self.output / relative_output_path}: {str(e)}"
+            )
+            return False
+        with self._lock:
+            self._created_dirs.add(relative_dir)
+        return True
+
+    def _run(self) -> None:
+        while (page := self._queue.get()) is not None:
+            size = sys.getsizeof(page.content)
+            if not self._ensure_directory(page.relative_path):
+                self.failed = True
+            elif not write_page_file(
+                self.output, page.relative_path, page.content, self.build_result
+            ):
+                self.failed = True
+            del page
+            with self._lock:
+                self._in_flight_bytes -= size
 
 
 def write_json_file(
-    output_dir: Path, relative_output_path: Path, data: Any, build_result: BuildResult
+    output: OutputTarget,
+    relative_output_path: Path,
+    data: Any,
+    build_result: BuildResult,
 ) -> bool:
     """Write JSON data to a file in the output directory."""
-    absolute_output_path = output_dir / relative_output_path
+    absolute_output_path = get_output_path(output, relative_output_path)
     try:
-        absolute_output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(absolute_output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if isinstance(output, Path):
+            absolute_output_path.parent.mkdir(parents=True, exist_ok=True)
+        encoded = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        write_output_bytes(output, relative_output_path, encoded)
+        record_output_file(build_result, relative_output_path, encoded)
         return True
     except Exception as e:
         build_result.errors.append(
@@ -47,8 +205,25 @@ def write_json_file(
         return False
 
 
+def copy_static_file(
+    source: Path, destination: Path, output_dir: Path, build_result: BuildResult
+) -> None:
+    """Copy a file like `shutil.copy2`, recording its size and hash as it is read."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        while chunk := src.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+            dst.write(chunk)
+    shutil.copystat(source, destination)
+    build_result.output_files[destination.relative_to(output_dir).as_posix()] = (
+        OutputFileRecord(size=size, sha256=digest.hexdigest())
+    )
+
+
 def copy_static_assets(
-    static_dir: Path, output_dir: Path, build_result: BuildResult
+    static_dir: Path, output: OutputTarget, build_result: BuildResult
 ) -> bool:
     """Copy static files from the static directory to the output directory."""
     import logging
@@ -56,7 +231,7 @@ def copy_static_assets(
 
     logger = logging.getLogger(__name__)
 
-    static_output = output_dir / "static"
+    static_output = get_output_path(output, Path("static"))
 
     if not static_dir.exists():
         logger.debug(f"Static directory not found, skipping copy: {static_dir}")
@@ -70,9 +245,29 @@ def copy_static_assets(
         file_count = sum(1 for root, dirs, files in os.walk(static_dir) for _ in files)
 
         logger.info(f"Copying {file_count} static files from {static_dir}")
-        if static_output.exists():
-            shutil.rmtree(static_output)
-        shutil.copytree(static_dir, static_output, dirs_exist_ok=True)
+        if isinstance(output, OutputArchive):
+            for root, _, files in os.walk(static_dir):
+                for file in files:
+                    file_path = Path(root) / file
+                    relative_output_path = Path("static") / file_path.relative_to(
+                        static_dir
+                    )
+                    data = file_path.read_bytes()
+                    output.add_file(relative_output_path, data)
+                    record_output_file(build_result, relative_output_path, data)
+        else:
+            if static_output.exists():
+                shutil.rmtree(static_output)
+
+            def copy_and_record(source: str, destination: str) -> None:
+                copy_static_file(Path(source), Path(destination), output, build_result)
+
+            shutil.copytree(
+                static_dir,
+                static_output,
+                copy_function=copy_and_record,
+                dirs_exist_ok=True,
+            )
         logger.debug("Successfully copied static assets")
         return True
     except Exception as e:
@@ -0,0 +1,346 @@
+"""
+Render-on-request previews that skip the full site build.
+"""
+
+import json
+import logging
+import threading
+from collections.abc import Callable
+from html import escape
+from pathlib import Path
+
+from straightshot.build_cache import MemoCache
+from straightshot.builder import (
+    create_page_post_processors,
+    generate_article_index_data,
+    load_and_process_content,
+    post_process_page,
+    process_site_metadata,
+    render_content_page,
+    render_standalone_page,
+)
+from straightshot.content_processor import load_content_file, render_content_markdown
+from straightshot.custom_tags import process_custom_tags
+from straightshot.image_dimensions import (
+    IMAGE_DIMENSIONS_CACHE_NAME,
+    IMAGE_DIMENSIONS_CACHE_SIZE,
+    ImageDimensionReader,
+)
+from straightshot.models import (
+    BuildResult,
+    ContentFile,
+    ContentProcessingConfig,
+    RenderedPage,
+    SiteContext,
+)
+from straightshot.syntax_css import create_syntax_stylesheet
+from straightshot.template_analysis import find_article_html_reads
+from straightshot.templating import (
+    MARKDOWN_CACHE_NAME,
+    MARKDOWN_CACHE_SIZE,
+    create_jinja_environment,
+)
+
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+
+
+class PreviewSite:
+    """
+    Renders the pages of a site when they are requested.
+
+    Only the frontmatter of the content is loaded up front, which is enough for
+    navigation, topics and related links. A requested article or standalone page
+    goes through the same custom tag and template rendering as in a build, and
+    the result is cached until one of the watched inputs changes. If templates
+    read the HTML of other articles, every article's markdown is rendered (and
+    kept) when the first page is requested.
+    """
+
+    def __init__(
+        self,
+        load_site: Callable[[], SiteContext],
+        content_config: ContentProcessingConfig,
+    ) -> None:
+        self._load_site = load_site
+        self.content_config = content_config.model_copy(
+            update={"render_markdown": False}
+        )
+        self._lock = threading.RLock()
+        self._markdown_cache = MemoCache(MARKDOWN_CACHE_NAME, MARKDOWN_CACHE_SIZE)
+        self._image_cache = MemoCache(
+            IMAGE_DIMENSIONS_CACHE_NAME, IMAGE_DIMENSIONS_CACHE_SIZE
+        )
+        self._rendered: dict[str, bytes] = {}
+        self._files_by_path: dict[Path, ContentFile] = {}
+        self._reload_site()
+
+    def _reload_site(self) -> None:
+        """Load the site configuration and the frontmatter of all content."""
+        self.site_context = self._load_site()
+        self._image_reader = ImageDimensionReader(
+            self.content_config.static_dir,
+            self.site_context.base_url,
+            self._image_cache,
+        )
+        self._post_processors = create_page_post_processors(
+            self.site_context, self._image_reader
+        )
+        build_result = BuildResult()
+        content_files = load_and_process_content(
+            self.content_config, self.site_context, build_result
+        )
+        # Markdown is rendered on request, so the stylesheet covers every token type
+        self._syntax_css = create_syntax_stylesheet(
+            self.site_context, None, build_result
+        )
+        _log_build_problems(build_result)
+        self._files_by_path = {cf.path.resolve(): cf for cf in content_files}
+        self._reload_templates()
+        self._update_site_metadata()
+
+    def _reload_templates(self) -> None:
+        self._env = create_jinja_environment(
+            self.content_config.templates_dir,
+            self.site_context,
+            self.content_config.content_root,
+            self._markdown_cache,
+            self._image_reader,
+        )
+        self._html_readers = find_article_html_reads(self._env)
+        # Custom tag templates may have changed the HTML kept for those templates
+        for content_file in self._files_by_path.values():
+            content_file.html = ""
+        self._rendered.clear()
+
+    def _reload_content_file(self, file_path: Path) -> None:
+        # Slugs are derived relative to the configured content directories, so
+        # the file is loaded by the path it was found under
+        self._files_by_path.pop(file_path.resolve(), None)
+        if not file_path.is_file():
+            return
+        build_result = BuildResult()
+        content_file = load_content_file(
+            self.content_config,
+            build_result,
+            file_path,
+            True,
+            self.site_context.language,
+        )
+        _log_build_problems(build_result)
+        if content_file and not content_file.metadata.disabled:
+            self._files_by_path[file_path.resolve()] = content_file
+
+    def _update_site_metadata(self) -> None:
+        content_files = sorted(
+            self._files_by_path.values(),
+            key=lambda x: x.metadata.written,
+            reverse=True,
+        )
+        process_site_metadata(content_files, self.site_context)
+        self._articles_by_url = {cf.url: cf for cf in content_files}
+        self._article_index = generate_article_index_data(content_files)
+        self._rendered.clear()
+
+    def apply_changes(self, changed_paths: set[str]) -> bool:
+        """
+        Update the preview after files changed and drop the cached pages.
+
+        Changed articles are reloaded individually; changed templates only
+        recreate the template environment. Any other change (site config, data
+        includes) reloads the whole site.
+        """
+        logger = logging.getLogger(__name__)
+        templates_dir = self.content_config.templates_dir.resolve()
+        static_dir = self.content_config.static_dir.resolve()
+        content_dirs = [d.resolve() for d in self.content_config.content_dirs]
+
+        changed_articles: list[Path] = []
+        reload_templates = False
+        reload_site = False
+        for path_str in changed_paths:
+            path = Path(path_str).resolve()
+            if path.is_relative_to(templates_dir):
+                reload_templates = True
+            elif path.suffix in MARKDOWN_SUFFIXES and any(
+                path.is_relative_to(d) for d in content_dirs
+            ):
+                changed_articles.append(Path(path_str))
+            elif (
+                not path.is_relative_to(static_dir)
+                and path.suffix not in MARKDOWN_SUFFIXES
+            ):
+                # Markdown outside the content directories is only used through
+                # include_markdown, whose cache tracks file changes by itself
+                reload_site = True
+
+        with self._lock:
+            try:
+                if reload_site:
+                    self._reload_site()
+                    return True
+                if reload_templates:
+                    self._reload_templates()
+                for path in changed_articles:
+                    self._reload_content_file(path)
+                self._update_site_metadata()
+            except (Exception, SystemExit) as e:
+                logger.error(f"Could not update preview: {e}")
+                return False
+        return True
+
+    def _load_article_html(self, build_result: BuildResult) -> None:
+        """Give every article its HTML, for templates reading other articles'."""
+        logger = logging.getLogger(__name__)
+        for article in self._articles_by_url.values():
+            if article.html:
+                continue
+            logger.debug(
+                f"Rendering markdown of {article.path}, read by: "
+                f"{', '.join(self._html_readers)}"
+            )
+            try:
+                markdown_html = render_content_markdown(article)
+            except Exception as e:
+                build_result.errors.append(f"Error processing {article.path}: {e}")
+                continue
+            article.html = process_custom_tags(
+                markdown_html, self._env, self.site_context, build_result
+            )
+
+    def _compute_relative_path(self, url_path: str) -> str | None:
+        """Return the output path a URL path names, None if outside the site."""
+        base_url = self.site_context.base_url
+        if not url_path.startswith(base_url):
+            return None
+        relative_path = url_path[len(base_url) :]
+        if relative_path == "" or relative_path.endswith("/"):
+            relative_path += "index.html"
+        return relative_path
+
+    def has_page(self, url_path: str) -> bool:
+        """Return whether a URL path names a page, without rendering it."""
+        with self._lock:
+            return self._has_page(url_path)
+
+    def _has_page(self, url_path: str) -> bool:
+        relative_path = self._compute_relative_path(url_path)
+        if relative_path is None:
+            return False
+        if relative_path.startswith("static/"):
+            return (
+                self._find_static_file(relative_path.removeprefix("static/"))
+                is not None
+            )
+        syntax_css = self._syntax_css
+        return (
+            relative_path in self._rendered
+            or relative_path in self._articles_by_url
+            or relative_path == "content/index.json"
+            or (
+                syntax_css is not None
+                and relative_path == syntax_css.relative_path.as_posix()
+            )
+            or any(
+                cfg.output.as_posix() == relative_path
+                for cfg in self.site_context.standalone_pages
+            )
+        )
+
+    def render_page(self, url_path: str) -> bytes | None:
+        """Return the page for a URL path, rendering it if it is not cached."""
+        # A reload replaces the base URL and the stylesheet
+        with self._lock:
+            relative_path = self._compute_relative_path(url_path)
+            syntax_css = self._syntax_css
+        if relative_path is None:
+            return None
+
+        if (
+            syntax_css is not None
+            and relative_path == syntax_css.relative_path.as_posix()
+        ):
+            return syntax_css.content.encode("utf-8")
+        if relative_path.startswith("static/"):
+            return self._read_static_file(relative_path.removeprefix("static/"))
+
+        with self._lock:
+            body = self._rendered.get(relative_path)
+            if body is None:
+                body = self._render(relative_path)
+                if body is not None:
+                    self._rendered[relative_path] = body
+            return body
+
+    def _find_static_file(self, relative_path: str) -> Path | None:
+        static_dir = self.content_config.static_dir.resolve()
+        file_path = (static_dir / relative_path).resolve()
+        if not file_path.is_relative_to(static_dir) or not file_path.is_file():
+            return None
+        return file_path
+
+    def _read_static_file(self, relative_path: str) -> bytes | None:
+        file_path = self._find_static_file(relative_path)
+        return file_path.read_bytes() if file_path is not None else None
+
+    def _render(self, relative_path: str) -> bytes | None:
+        logger = logging.getLogger(__name__)
+        build_result = BuildResult()
+        page: RenderedPage | None = None
+
+        if relative_path == "content/index.json":
+            return json.dumps(self._article_index, ensure_ascii=False, indent=2).encode(
+                "utf-8"
+            )
+
+        if self._html_readers:
+            self._load_article_html(build_result)
+        if article := self._articles_by_url.get(relative_path):
+            logger.info(f"Rendering preview of {article.path}")
+            article.html = render_content_markdown(article)
+            page = render_content_page(
+                self._env, self.site_context, build_result, article
+            )
+            if not self._html_readers:
+                article.html = ""
+        else:
+            page_cfg = next(
+                (
+                    cfg
+                    for cfg in self.site_context.standalone_pages
+                    if cfg.output.as_posix() == relative_path
+                ),
+                None,
+            )
+            if page_cfg is None:
+                return None
+            logger.info(f"Rendering preview of {page_cfg.template}")
+            page = render_standalone_page(
+                self._env,
+                self.site_context,
+                build_result,
+                page_cfg,
+                self._article_index,
+            )
+
+        _log_build_problems(build_result)
+        if page is None:
+            return _generate_error_page(build_result.errors).encode("utf-8")
+        post_process_page(page, self._post_processors)
+        return page.content.encode("utf-8")
+
+
+def _log_build_problems(build_result: BuildResult) -> None:
+    logger = logging.getLogger(__name__)
+    for warning in build_result.warnings:
+        logger.warning(warning)
+    for error in build_result.errors:
+        logger.error(error)
+
+
+def _generate_error_page(errors: list[str]) -> str:
+    """Generate a minimal HTML page listing rendering errors."""
+    items = "".join(f"<li>{escape(error)}</li>" for error in errors)
+    return (
+        "<!DOCTYPE html><html><head><title>Preview error</title></head>"
+        f"<body><h1>Preview error</h1><ul>{items}</ul></body></html>"
+    )
@@ -0,0 +1,110 @@
+"""
+Resource hints for the pages a visitor likely opens next.
+
+The navigation the builder computes for every article (`next`, `previous` and
+`related`) is also where visitors usually go next. With a `resource_hints`
+section in the site configuration, article pages get prefetch hints for those
+articles, either as `<link rel="prefetch">` tags or as a speculation rules
+block, and every HTML page gets preload hints for the configured static files.
+Templates place the hints with `{{ resource_hints }}` in their `<head>`.
+"""
+
+import html
+import json
+from pathlib import PurePosixPath
+from urllib.parse import urlsplit
+
+from markupsafe import Markup
+
+from straightshot.models import ContentFile, ResourceHintsConfig, SiteContext
+
+# `as` destination of a preloaded file by suffix; anything else is a plain fetch
+PRELOAD_DESTINATIONS = {
+    ".css": "style",
+    ".js": "script",
+    ".mjs": "script",
+    ".woff2": "font",
+    ".woff": "font",
+    ".ttf": "font",
+    ".otf": "font",
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".gif": "image",
+    ".webp": "image",
+    ".svg": "image",
+}
+
+
+def compute_hint_url(base_url: str, path: str) -> str:
+    """Return the URL of a site path (as `url_for` does), keeping absolute URLs."""
+    if urlsplit(path).scheme:
+        return path
+    return base_url.rstrip("/") + "/" + path.lstrip("/")
+
+
+def compute_prefetch_targets(
+    content_file: ContentFile, config: ResourceHintsConfig
+) -> list[ContentFile]:
+    """Return the articles to prefetch from a page: next, previous, then related."""
+    candidates = [
+        content_file.next,
+        content_file.previous,
+        *content_file.related[: max(config.max_related, 0)],
+    ]
+    targets: list[ContentFile] = []
+    seen = {content_file.url}
+    for candidate in candidates:
+        if candidate is not None and candidate.url not in seen:
+            seen.add(candidate.url)
+            targets.append(candidate)
+    return targets[: max(config.max_prefetch, 0)]
+
+
+def _generate_preload_link(url: str) -> str:
+    destination = PRELOAD_DESTINATIONS.get(
+        PurePosixPath(urlsplit(url).path).suffix.lower(), "fetch"
+    )
+    # Fonts are always fetched in CORS mode, so their preload must be too
+    crossorigin = " crossorigin" if destination in ("font", "fetch") else ""
+    return (
+        f'<link rel="preload" href="{html.escape(url)}" as="{destination}"'
+        f"{crossorigin}>"
+    )
+
+
+def _generate_prefetch_hints(urls: list[str], mode: str) -> list[str]:
+    if not urls:
+        return []
+    if mode == "speculation-rules":
+        rules = json.dumps({"prefetch": [{"source": "list", "urls": urls}]})
+        # A URL must not be able to close the script element
+        rules = rules.replace("</", "<\\/")
+        return [f'<script type="speculationrules">{rules}</script>']
+    return [f'<link rel="prefetch" href="{html.escape(url)}">' for url in urls]
+
+
+def generate_resource_hints(
+    site_context: SiteContext, content_file: ContentFile | None = None
+) -> Markup:
+    """
+    Generate the resource hints of a page, empty if they are not enabled.
+
+    Standalone pages (no `content_file`) only get the preload hints.
+    """
+    config = site_context.resource_hints
+    if config is None or not config.enabled:
+        return Markup("")
+    base_url = site_context.base_url
+    hints = [
+        _generate_preload_link(compute_hint_url(base_url, path))
+        for path in config.preload
+    ]
+    if content_file is not None:
+        urls = [
+            compute_hint_url(base_url, target.url)
+            for target in compute_prefetch_targets(content_file, config)
+        ]
+        hints += _generate_prefetch_hints(urls, config.mode)
+    # Every URL is escaped or JSON encoded above
+    return Markup("\n".join(hints))  # noqa: S704
@@ -0,0 +1,176 @@
+"""
+Build stage scheduler: runs the stages of a build as a dependency graph.
+
+Each stage declares the artifacts it needs (`inputs`) and the artifact it
+produces (`output`). A stage starts as soon as all stages producing its inputs
+have finished, so stages that share no inputs run concurrently on one thread
+pool. A stage that raises fails the build, and the stages depending on it are
+skipped. From the stage durations the scheduler computes the critical path:
+the chain of dependent stages that determined how long the whole graph took.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from straightshot.metrics import get_metrics_collector
+from straightshot.models import BuildResult, StageTiming
+
+DEFAULT_STAGE_WORKERS = 4
+
+
+class BuildStage:
+    """One step of the build and the artifacts it consumes and produces."""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Mapping[str, Any]], Any],
+        inputs: Sequence[str] = (),
+        output: str | None = None,
+    ) -> None:
+        self.name = name
+        self.run = run  # Called with the values of `inputs`, returns `output`
+        self.inputs = tuple(inputs)
+        self.output = output
+
+
+def compute_stage_dependencies(stages: Sequence[BuildStage]) -> dict[str, set[str]]:
+    """
+    Map every stage to the stages producing its inputs.
+
+    Raises ValueError for duplicate names or outputs, inputs no stage produces
+    and dependency cycles.
+    """
+    producers: dict[str, str] = {}
+    names: set[str] = set()
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Duplicate build stage {stage.name}")
+        names.add(stage.name)
+        if stage.output is not None:
+            if stage.output in producers:
+                raise ValueError(
+                    f"Artifact {stage.output} produced by both "
+                    f"{producers[stage.output]} and {stage.name}"
+                )
+            producers[stage.output] = stage.name
+
+    dependencies: dict[str, set[str]] = {}
+    for stage in stages:
+        missing = [name for name in stage.inputs if name not in producers]
+        if missing:
+            raise ValueError(
+                f"Build stage {stage.name} needs {', '.join(missing)}, which no stage produces"
+            )
+        dependencies[stage.name] = {producers[name] for name in stage.inputs}
+    _check_acyclic(dependencies)
+    return dependencies
+
+
+def _check_acyclic(dependencies: Mapping[str, set[str]]) -> None:
+    # Kahn's algorithm: a cycle leaves stages that never become ready
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(
+                f"Build stages form a cycle: {', '.join(sorted(remaining))}"
+            )
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def compute_critical_path(
+    dependencies: Mapping[str, set[str]], durations: Mapping[str, float]
+) -> list[StageTiming]:
+    """Return the chain of finished stages with the longest total duration."""
+    finish: dict[str, float] = {}
+    predecessor: dict[str, str | None] = {}
+
+    def visit(name: str) -> float:
+        if name not in finish:
+            before = [dep for dep in dependencies[name] if dep in durations]
+            slowest = max(before, key=visit, default=None)
+            predecessor[name] = slowest
+            finish[name] = durations[name] + (
+                finish[slowest] if slowest is not None else 0.0
+            )
+        return finish[name]
+
+    end = max(durations, key=visit, default=None)
+    path = []
+    while end is not None:
+        path.append(StageTiming(name=end, seconds=durations[end]))
+        end = predecessor[end]
+    return path[::-1]
+
+
+def _run_stage(stage: BuildStage, inputs: dict[str, Any]) -> tuple[Any, float]:
+    with get_metrics_collector().measure_phase(stage.name):
+        start = time.perf_counter()
+        value = stage.run(inputs)
+        return value, time.perf_counter() - start
+
+
+def run_build_stages(
+    stages: Sequence[BuildStage],
+    build_result: BuildResult,
+    max_workers: int = DEFAULT_STAGE_WORKERS,
+) -> list[StageTiming]:
+    """
+    Run build stages in dependency order, independent stages concurrently.
+
+    Returns the critical path of the stages that ran. Stages report problems
+    through `build_result` like any build step; an exception in a stage is
+    recorded as a build error and its dependents are skipped.
+    """
+    logger = logging.getLogger(__name__)
+    dependencies = compute_stage_dependencies(stages)
+    pending = {stage.name: stage for stage in stages}
+    artifacts: dict[str, Any] = {}
+    durations: dict[str, float] = {}
+    unfinished: set[str] = set()  # Failed or skipped
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_workers), thread_name_prefix="straightshot-stage"
+    ) as executor:
+        running: dict[Future[tuple[Any, float]], BuildStage] = {}
+        while pending or running:
+            for name, stage in list(pending.items()):
+                blocked = dependencies[name] & unfinished
+                if blocked:
+                    del pending[name]
+                    unfinished.add(name)
+                    build_result.warnings.append(
+                        f"Skipped build stage {name} because {', '.join(sorted(blocked))} did not complete"
+                    )
+                elif dependencies[name] <= durations.keys():
+                    del pending[name]
+                    logger.debug(f"Starting build stage {name}")
+                    inputs = {key: artifacts[key] for key in stage.inputs}
+                    running[executor.submit(_run_stage, stage, inputs)] = stage
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    value, seconds = future.result()
+                except Exception as e:
+                    logger.error(f"Build stage {stage.name} failed: {e}")
+                    build_result.errors.append(f"Build stage {stage.name} failed: {e}")
+                    build_result.success = False
+                    unfinished.add(stage.name)
+                    continue
+                logger.debug(f"Finished build stage {stage.name} in {seconds:.3f}s")
+                durations[stage.name] = seconds
+                if stage.output is not None:
+                    artifacts[stage.output] = value
+
+    return compute_critical_path(dependencies, durations)
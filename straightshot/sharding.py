@@ -0,0 +1,169 @@
+"""
+Sharded builds: splitting the rendering of a site across machines and merging the results.
+
+Every shard loads the frontmatter of all content and computes the site-wide
+metadata (topics, navigation, related content, article index) identically, but
+only renders its own slice of the articles. Shard 1 additionally writes the
+standalone pages, the article index JSON and the static assets. Each shard
+records the files it wrote in a manifest, which `merge_shard_outputs` uses to
+combine the shard outputs and to verify that no path was written twice; the
+merged output gets the combined manifest.
+"""
+
+import hashlib
+import logging
+import shutil
+from pathlib import Path
+
+from straightshot.models import BuildResult, ContentFile, ShardManifest, ShardSpec
+
+SHARD_MANIFEST_NAME = ".straightshot-shard.json"
+
+
+def compute_shard_slice(
+    content_files: list[ContentFile], shard: ShardSpec
+) -> list[ContentFile]:
+    """
+    Return the content files rendered by a shard.
+
+    Files are assigned by a hash of their slug, so the assignment is the same on
+    every machine and does not move existing articles between shards when
+    articles are added or removed.
+    """
+    return [
+        content_file
+        for content_file in content_files
+        if int(hashlib.sha256(content_file.slug.encode("utf-8")).hexdigest(), 16)
+        % shard.count
+        == shard.index - 1
+    ]
+
+
+def write_shard_manifest(
+    output_dir: Path, shard: ShardSpec, build_result: BuildResult
+) -> bool:
+    """Write the manifest of the files this shard produced into its output directory."""
+    manifest = ShardManifest(
+        shard=shard, files=dict(sorted(build_result.output_files.items()))
+    )
+    manifest_path = output_dir / SHARD_MANIFEST_NAME
+    try:
+        manifest_path.write_text(manifest.model_dump_json(indent=2), encoding="utf-8")
+        return True
+    except Exception as e:
+        build_result.errors.append(f"Error writing shard manifest {manifest_path}: {e}")
+        return False
+
+
+def load_shard_manifest(shard_dir: Path) -> ShardManifest:
+    """Load the manifest written by a shard build."""
+    manifest_path = shard_dir / SHARD_MANIFEST_NAME
+    return ShardManifest.model_validate_json(manifest_path.read_text(encoding="utf-8"))
+
+
+def _validate_shard_set(
+    manifests: list[tuple[Path, ShardManifest]], build_result: BuildResult
+) -> None:
+    """Check that the manifests cover every shard of one build exactly once."""
+    counts = {manifest.shard.count for _, manifest in manifests}
+    if len(counts) != 1:
+        build_result.errors.append(
+            f"Shard outputs come from builds with different shard counts: {sorted(counts)}"
+        )
+        return
+    count = counts.pop()
+    seen: dict[int, Path] = {}
+    for shard_dir, manifest in manifests:
+        index = manifest.shard.index
+        if index in seen:
+            build_result.errors.append(
+                f"Shard {manifest.shard} found in both {seen[index]} and {shard_dir}"
+            )
+        seen[index] = shard_dir
+    missing = sorted(set(range(1, count + 1)) - seen.keys())
+    if missing:
+        build_result.errors.append(
+            f"Missing output for shards {', '.join(f'{i}/{count}' for i in missing)}"
+        )
+
+
+def _find_overlapping_paths(
+    manifests: list[tuple[Path, ShardManifest]], build_result: BuildResult
+) -> None:
+    """Report every output path that was written by more than one shard."""
+    owners: dict[str, Path] = {}
+    for shard_dir, manifest in manifests:
+        for relative_path in manifest.files:
+            if relative_path in owners:
+                build_result.errors.append(
+                    f"Output path {relative_path} written by both {owners[relative_path]} and {shard_dir}"
+                )
+            else:
+                owners[relative_path] = shard_dir
+
+
+def _copy_shard_file(
+    shard_dir: Path, output_dir: Path, relative_path: str, build_result: BuildResult
+) -> None:
+    """Copy one file of a shard, verifying it against the shard's manifest."""
+    source = shard_dir / relative_path
+    destination = output_dir / relative_path
+    try:
+        data = source.read_bytes()
+    except OSError as e:
+        build_result.errors.append(f"Error reading shard file {source}: {e}")
+        return
+    record = build_result.output_files[relative_path]
+    if len(data) != record.size or hashlib.sha256(data).hexdigest() != record.sha256:
+        build_result.errors.append(
+            f"Shard file {source} does not match its manifest (modified after the build?)"
+        )
+        return
+    try:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(data)
+        shutil.copystat(source, destination)
+    except OSError as e:
+        build_result.errors.append(f"Error writing file {destination}: {e}")
+
+
+def merge_shard_outputs(shard_dirs: list[Path], output_dir: Path) -> BuildResult:
+    """
+    Combine the outputs of all shards of a build into one output directory.
+
+    Nothing is copied unless the shard manifests form a complete set without
+    overlapping paths. Every file is verified against its manifest entry. The
+    merged output gets a manifest of all shard files, as the single shard 1/1.
+    """
+    logger = logging.getLogger(__name__)
+    build_result = BuildResult()
+
+    manifests: list[tuple[Path, ShardManifest]] = []
+    for shard_dir in shard_dirs:
+        try:
+            manifests.append((shard_dir, load_shard_manifest(shard_dir)))
+        except Exception as e:
+            build_result.errors.append(
+                f"Could not read shard manifest in {shard_dir}: {e}"
+            )
+    if not build_result.errors:
+        _validate_shard_set(manifests, build_result)
+        _find_overlapping_paths(manifests, build_result)
+    if build_result.errors:
+        build_result.success = False
+        return build_result
+
+    for shard_dir, manifest in sorted(manifests, key=lambda item: item[1].shard.index):
+        logger.info(
+            f"Merging {len(manifest.files)} files of shard {manifest.shard} from {shard_dir}"
+        )
+        build_result.output_files.update(manifest.files)
+        for relative_path in manifest.files:
+            _copy_shard_file(shard_dir, output_dir, relative_path, build_result)
+        build_result.files_processed += len(manifest.files)
+
+    if build_result.errors or not write_shard_manifest(
+        output_dir, ShardSpec(index=1, count=1), build_result
+    ):
+        build_result.success = False
+    return build_result
@@ -0,0 +1,132 @@
+"""
+Indexed queries over the site model for templates.
+
+Filtering `site.articles` in a Jinja loop scans every article on every page
+that does it, so a sidebar in `base.html` costs O(pages x articles) per build.
+`SiteQueries` answers the same questions (`articles_by`, `recent`, `by_year`)
+from indexes by language, topic and category that are built once per site
+model, and memoizes each distinct query for as long as the model is current.
+"""
+
+import threading
+from collections.abc import Sequence
+
+from straightshot.models import ContentFile, SiteContext
+
+ArticleList = tuple[ContentFile, ...]
+
+
+def get_article_category(content_file: ContentFile) -> str | None:
+    """Return the directory an article is filed under (e.g. `articles`, `talks`)."""
+    directory, _, _ = content_file.reference_slug.rpartition("/")
+    return directory.split("/")[0] if directory else None
+
+
+class SiteIndex:
+    """Articles grouped by language, topic and category, in site order."""
+
+    def __init__(self, articles: list[ContentFile]) -> None:
+        self.articles = articles
+        self.all: ArticleList = tuple(articles)
+        by_lang: dict[str, list[ContentFile]] = {}
+        by_topic: dict[str, list[ContentFile]] = {}
+        by_category: dict[str, list[ContentFile]] = {}
+        for content_file in articles:
+            by_lang.setdefault(content_file.metadata.lang, []).append(content_file)
+            for topic in content_file.metadata.topics:
+                by_topic.setdefault(topic, []).append(content_file)
+            category = get_article_category(content_file)
+            if category is not None:
+                by_category.setdefault(category, []).append(content_file)
+        self.by_lang = {key: tuple(value) for key, value in by_lang.items()}
+        self.by_topic = {key: tuple(value) for key, value in by_topic.items()}
+        self.by_category = {key: tuple(value) for key, value in by_category.items()}
+        # Query results, memoized for as long as this index is current
+        self.filtered: dict[tuple[str | None, ...], ArticleList] = {}
+        self.years: dict[str | None, list[tuple[int, ArticleList]]] = {}
+
+
+class SiteQueries:
+    """
+    Query functions registered as Jinja globals.
+
+    The index is rebuilt when the site context holds a different article list
+    than it was built from, i.e. once per build or preview reload.
+    """
+
+    def __init__(self, site_context: SiteContext) -> None:
+        self._site_context = site_context
+        self._index: SiteIndex | None = None
+        self._lock = threading.Lock()
+
+    def _get_index(self) -> SiteIndex:
+        articles = self._site_context.articles
+        with self._lock:
+            if self._index is None or self._index.articles is not articles:
+                self._index = SiteIndex(articles)
+            return self._index
+
+    def articles_by(
+        self,
+        lang: str | None = None,
+        topic: str | None = None,
+        category: str | None = None,
+        limit: int | None = None,
+    ) -> ArticleList:
+        """Return the articles matching all given criteria, newest first."""
+        index = self._get_index()
+        key = (lang, topic, category)
+        with self._lock:
+            result = index.filtered.get(key)
+        if result is None:
+            result = self._filter(index, lang, topic, category)
+            with self._lock:
+                index.filtered[key] = result
+        return result[:limit] if limit is not None else result
+
+    def _filter(
+        self,
+        index: SiteIndex,
+        lang: str | None,
+        topic: str | None,
+        category: str | None,
+    ) -> ArticleList:
+        candidates: list[Sequence[ContentFile]] = []
+        if lang is not None:
+            candidates.append(index.by_lang.get(lang, ()))
+        if topic is not None:
+            candidates.append(index.by_topic.get(topic, ()))
+        if category is not None:
+            candidates.append(index.by_category.get(category, ()))
+        if not candidates:
+            return index.all
+        # Walk the smallest group, keeping only articles that are in all others
+        candidates.sort(key=len)
+        others = [{id(content_file) for content_file in c} for c in candidates[1:]]
+        return tuple(
+            content_file
+            for content_file in candidates[0]
+            if all(id(content_file) in other for other in others)
+        )
+
+    def recent(self, n: int = 5, lang: str | None = None) -> ArticleList:
+        """Return the `n` newest articles, optionally in one language."""
+        return self.articles_by(lang=lang, limit=n)
+
+    def by_year(self, lang: str | None = None) -> list[tuple[int, ArticleList]]:
+        """Group the articles by the year they were written, newest year first."""
+        index = self._get_index()
+        with self._lock:
+            result = index.years.get(lang)
+        if result is None:
+            groups: dict[int, list[ContentFile]] = {}
+            for content_file in self.articles_by(lang=lang):
+                groups.setdefault(content_file.metadata.written.year, []).append(
+                    content_file
+                )
+            result = [
+                (year, tuple(groups[year])) for year in sorted(groups, reverse=True)
+            ]
+            with self._lock:
+                index.years[lang] = result
+        return result
@@ -0,0 +1,249 @@
+"""
+Site snapshot: the processed site model, saved for warm restarts.
+
+Loading a site parses the frontmatter (and markdown) of every content file and
+then computes topics, language links and related content across all of them.
+After a build has done that, the result is stored as JSON in the build cache:
+every article with its metadata, slugs and (when rendered up front) HTML, and
+the links between articles as indices into the article list. The snapshot is
+stored with a fingerprint of the inputs (path, modification time and size of
+every content file plus the settings that affect loading), and a later build
+with the same fingerprint restores the model instead of processing the corpus.
+Tools can read the same file with `load_site_snapshot`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from straightshot.build_cache import compute_file_fingerprint
+from straightshot.models import (
+    ArticleRecord,
+    BuildResult,
+    ContentFile,
+    ContentProcessingConfig,
+    SiteContext,
+    SiteSnapshot,
+)
+
+SITE_SNAPSHOT_DIR_NAME = "site-snapshot"
+# Bump when loading content or computing site metadata changes its results
+SITE_SNAPSHOT_VERSION = 2
+
+
+def _list_content_paths(content_config: ContentProcessingConfig) -> list[Path]:
+    """List the files `load_content_files` would read, in a stable order."""
+    paths: list[Path] = []
+    for directory in content_config.content_dirs:
+        for root, _, files in os.walk(directory):
+            paths.extend(
+                Path(root) / name
+                for name in files
+                if name.endswith((".md", ".markdown"))
+            )
+    return sorted(paths)
+
+
+def compute_site_fingerprint(
+    content_config: ContentProcessingConfig, default_language: str
+) -> str:
+    """Fingerprint the content files and the settings a site snapshot depends on."""
+    inputs = {
+        "version": SITE_SNAPSHOT_VERSION,
+        "content_dirs": [str(path) for path in content_config.content_dirs],
+        "default_language": default_language,
+        "render_markdown": content_config.render_markdown,
+        "required_frontmatter": content_config.required_frontmatter,
+        "optional_frontmatter": content_config.optional_frontmatter,
+        "files": [
+            (str(path), *compute_file_fingerprint(path))
+            for path in _list_content_paths(content_config)
+        ],
+    }
+    return hashlib.sha256(json.dumps(inputs).encode("utf-8")).hexdigest()
+
+
+def get_site_snapshot_path(
+    content_config: ContentProcessingConfig, default_language: str
+) -> Path | None:
+    """Return where the snapshot of this content configuration is stored."""
+    if content_config.cache_dir is None:
+        return None
+    key = json.dumps(
+        [
+            [str(path.resolve()) for path in content_config.content_dirs],
+            default_language,
+            content_config.render_markdown,
+        ]
+    )
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return content_config.cache_dir / SITE_SNAPSHOT_DIR_NAME / f"{digest}.json"
+
+
+def generate_site_snapshot(
+    content_files: list[ContentFile],
+    site_context: SiteContext,
+    fingerprint: str,
+    files_processed: int,
+    files_skipped: int,
+    warnings: list[str],
+) -> SiteSnapshot:
+    """Convert the processed site model into a snapshot."""
+    indices = {id(content_file): i for i, content_file in enumerate(content_files)}
+
+    def index_of(content_file: ContentFile | None) -> int | None:
+        return None if content_file is None else indices[id(content_file)]
+
+    return SiteSnapshot(
+        version=SITE_SNAPSHOT_VERSION,
+        fingerprint=fingerprint,
+        articles=[
+            ArticleRecord(
+                path=content_file.path,
+                slug=content_file.slug,
+                reference_slug=content_file.reference_slug,
+                url=content_file.url,
+                html=content_file.html,
+                metadata=content_file.metadata,
+                content_id=content_file.content_id,
+                previous=index_of(content_file.previous),
+                next=index_of(content_file.next),
+                related=[indices[id(related)] for related in content_file.related],
+                alternate_languages={
+                    lang: indices[id(alternate)]
+                    for lang, alternate in content_file.alternate_languages.items()
+                },
+            )
+            for content_file in content_files
+        ],
+        topics={
+            topic: [indices[id(content_file)] for content_file in files]
+            for topic, files in site_context.topics.items()
+        },
+        languages=site_context.languages,
+        files_processed=files_processed,
+        files_skipped=files_skipped,
+        warnings=warnings,
+    )
+
+
+def restore_site_model(
+    snapshot: SiteSnapshot, site_context: SiteContext
+) -> list[ContentFile]:
+    """Recreate the content files and site metadata stored in a snapshot."""
+    content_files = [
+        ContentFile(
+            path=record.path,
+            slug=record.slug,
+            reference_slug=record.reference_slug,
+            url=record.url,
+            html=record.html,
+            metadata=record.metadata,
+            content_id=record.content_id,
+        )
+        for record in snapshot.articles
+    ]
+    for content_file, record in zip(content_files, snapshot.articles, strict=True):
+        if record.previous is not None:
+            content_file.previous = content_files[record.previous]
+        if record.next is not None:
+            content_file.next = content_files[record.next]
+        content_file.related = [content_files[i] for i in record.related]
+        content_file.alternate_languages = {
+            lang: content_files[i] for lang, i in record.alternate_languages.items()
+        }
+
+    site_context.articles = content_files
+    site_context.topics = {
+        topic: [content_files[i] for i in indices]
+        for topic, indices in snapshot.topics.items()
+    }
+    site_context.languages = list(snapshot.languages)
+    return content_files
+
+
+def load_site_snapshot(snapshot_path: Path) -> SiteSnapshot | None:
+    """Load a snapshot, or None if it is missing, unreadable or of another version."""
+    try:
+        snapshot = SiteSnapshot.model_validate_json(snapshot_path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.getLogger(__name__).debug(
+            f"Ignoring unreadable site snapshot {snapshot_path}: {e}"
+        )
+        return None
+    return snapshot if snapshot.version == SITE_SNAPSHOT_VERSION else None
+
+
+def save_site_snapshot(snapshot_path: Path, snapshot: SiteSnapshot) -> None:
+    """Write a snapshot, replacing the previous one atomically."""
+    temp_path = snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(snapshot.model_dump_json(), encoding="utf-8")
+        temp_path.replace(snapshot_path)
+    except Exception as e:
+        logging.getLogger(__name__).debug(
+            f"Could not write site snapshot {snapshot_path}: {e}"
+        )
+        temp_path.unlink(missing_ok=True)
+
+
+def restore_site_snapshot(
+    content_config: ContentProcessingConfig,
+    site_context: SiteContext,
+    build_result: BuildResult,
+) -> tuple[list[ContentFile] | None, str | None]:
+    """
+    Restore the site model from a snapshot matching the current inputs.
+
+    Returns the content files (None if there is no matching snapshot) and the
+    fingerprint of the current inputs for storing a new snapshot (None if
+    snapshots are disabled). The fingerprint is taken before the content is
+    loaded, so a file changing during the build invalidates the new snapshot.
+    """
+    logger = logging.getLogger(__name__)
+    snapshot_path = get_site_snapshot_path(content_config, site_context.language)
+    if snapshot_path is None or not content_config.site_snapshot:
+        return None, None
+
+    fingerprint = compute_site_fingerprint(content_config, site_context.language)
+    snapshot = load_site_snapshot(snapshot_path)
+    if snapshot is None or snapshot.fingerprint != fingerprint:
+        logger.debug("No site snapshot matches the current content")
+        return None, fingerprint
+
+    content_files = restore_site_model(snapshot, site_context)
+    build_result.files_processed += snapshot.files_processed
+    build_result.files_skipped += snapshot.files_skipped
+    build_result.warnings.extend(snapshot.warnings)
+    logger.info(
+        f"Restored {len(content_files)} content files from site snapshot {snapshot_path}"
+    )
+    return content_files, fingerprint
+
+
+def store_site_snapshot(
+    content_config: ContentProcessingConfig,
+    site_context: SiteContext,
+    content_files: list[ContentFile],
+    fingerprint: str,
+    build_result: BuildResult,
+    warnings: list[str],
+) -> None:
+    """Save the freshly processed site model, unless loading it reported errors."""
+    snapshot_path = get_site_snapshot_path(content_config, site_context.language)
+    if snapshot_path is None or build_result.errors:
+        return
+    snapshot = generate_site_snapshot(
+        content_files,
+        site_context,
+        fingerprint,
+        build_result.files_processed,
+        build_result.files_skipped,
+        warnings,
+    )
+    save_site_snapshot(snapshot_path, snapshot)
@@ -0,0 +1,166 @@
+"""
+Syntax highlighting stylesheet generated from the token classes a site uses.
+
+Highlighted code blocks mark every token with a Pygments class (`k` for
+keywords, `s2` for double-quoted strings, ...). Instead of a hand-maintained
+stylesheet with rules for every token type, the build collects the classes that
+occur in the articles and generates the rules for just those from the Pygments
+style configured as `theme.highlight_style`. When markdown is rendered right
+before each page, the classes are collected one article at a time and memoized
+per file, so finding them needs neither all articles' HTML in memory nor, for
+unchanged articles, a second rendering. Code that templates render
+themselves with `include_markdown` is only known once pages are rendered, so
+such sites get the rules for every token type. The stylesheet name carries a
+hash of its content, so it can be cached like any other static file, and
+templates get its path as `syntax_stylesheet` only on pages that contain
+highlighted code.
+"""
+
+import hashlib
+import logging
+import re
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from pygments.formatters import HtmlFormatter
+from pygments.util import ClassNotFound
+
+from straightshot.build_cache import MemoCache, compute_file_fingerprint
+from straightshot.content_processor import render_content_markdown
+from straightshot.models import BuildResult, ContentFile, RenderedPage, SiteContext
+
+SYNTAX_CSS_DIR = Path("static") / "css"
+SYNTAX_CSS_HASH_LENGTH = 12
+SYNTAX_CLASSES_CACHE_NAME = "token_classes"
+SYNTAX_CLASSES_CACHE_SIZE = 65536  # Articles whose token classes are kept
+HIGHLIGHT_SELECTOR = ".highlight"
+# Start of every code block the highlighter writes
+HIGHLIGHTED_CODE_MARKER = '<pre class="highlight"'
+HIGHLIGHTED_CODE_PATTERN = re.compile(
+    r'<pre class="highlight"[^>]*>(.*?)</pre>', re.DOTALL
+)
+TOKEN_CLASS_PATTERN = re.compile(r'<span class="([^"\s]+)"')
+TOKEN_RULE_PATTERN = re.compile(rf"^\{HIGHLIGHT_SELECTOR} \.([\w-]+) ")
+
+
+def has_highlighted_code(html: str) -> bool:
+    """Return whether HTML contains a highlighted code block."""
+    return HIGHLIGHTED_CODE_MARKER in html
+
+
+def compute_token_classes(html: str) -> set[str]:
+    """Return the token classes used in the highlighted code blocks of HTML."""
+    return {
+        token_class
+        for block in HIGHLIGHTED_CODE_PATTERN.finditer(html)
+        for token_class in TOKEN_CLASS_PATTERN.findall(block.group(1))
+    }
+
+
+def _compute_file_token_classes(
+    content_file: ContentFile, memo: MemoCache
+) -> tuple[str, ...]:
+    """Return the token classes of an article's markdown, memoized by file."""
+    cache_key = (str(content_file.path), *compute_file_fingerprint(content_file.path))
+    token_classes: tuple[str, ...] | None = memo.get(cache_key)
+    if token_classes is None:
+        try:
+            html = render_content_markdown(content_file)
+        except Exception:
+            # Rendering the page reports the error
+            return ()
+        token_classes = tuple(sorted(compute_token_classes(html)))
+        memo.put(cache_key, token_classes)
+    return token_classes
+
+
+def compute_site_token_classes(
+    content_files: Iterable[ContentFile], memo: MemoCache | None = None
+) -> set[str]:
+    """
+    Return the token classes used across the highlighted code of all articles.
+
+    Without a memo, the articles' rendered HTML is read. With one, their
+    markdown has not been rendered yet: each article is rendered on its own and
+    only its classes are kept.
+    """
+    token_classes: set[str] = set()
+    for content_file in content_files:
+        if memo is not None:
+            token_classes.update(_compute_file_token_classes(content_file, memo))
+        elif has_highlighted_code(content_file.html):
+            token_classes |= compute_token_classes(content_file.html)
+    return token_classes
+
+
+def render_with_syntax_stylesheet(
+    site_context: SiteContext,
+    render: Callable[[str | None], str],
+    has_code: bool = False,
+) -> str:
+    """
+    Render a page, passing `render` the syntax stylesheet if the page has code.
+
+    `has_code` says the page's own content has highlighted code. Code its
+    template renders (through `include_markdown`) only shows in the output, so
+    such a page is rendered a second time with the stylesheet.
+    """
+    stylesheet = site_context.syntax_stylesheet
+    if stylesheet is None or has_code:
+        return render(stylesheet)
+    rendered = render(None)
+    if has_highlighted_code(rendered):
+        return render(stylesheet)
+    return rendered
+
+
+def generate_syntax_css(style_name: str, token_classes: set[str] | None) -> str:
+    """
+    Generate the rules of a Pygments style for the given token classes.
+
+    With `token_classes` None the rules for every token type are generated.
+    Raises ValueError for an unknown style.
+    """
+    try:
+        formatter = HtmlFormatter(style=style_name)
+    except ClassNotFound as e:
+        raise ValueError(f"Unknown highlight style {style_name!r}") from e
+    rules: list[str] = formatter.get_background_style_defs(HIGHLIGHT_SELECTOR)  # type: ignore[no-untyped-call]
+    for rule in formatter.get_token_style_defs(HIGHLIGHT_SELECTOR):  # type: ignore[no-untyped-call]
+        match = TOKEN_RULE_PATTERN.match(rule)
+        if token_classes is None or match is None or match.group(1) in token_classes:
+            rules.append(rule)
+    return "\n".join(rules) + "\n"
+
+
+def create_syntax_stylesheet(
+    site_context: SiteContext,
+    token_classes: set[str] | None,
+    build_result: BuildResult,
+) -> RenderedPage | None:
+    """
+    Generate the stylesheet for `theme.highlight_style` and point templates to it.
+
+    Sets `site_context.syntax_stylesheet` to the stylesheet's output path, or to
+    None if the site configures no style (or an unknown one, which is an error).
+    """
+    logger = logging.getLogger(__name__)
+    site_context.syntax_stylesheet = None
+    style_name = site_context.theme.get("highlight_style")
+    if not style_name:
+        return None
+    try:
+        css = generate_syntax_css(str(style_name), token_classes)
+    except ValueError as e:
+        build_result.errors.append(f"Error generating syntax stylesheet: {e}")
+        build_result.success = False
+        return None
+
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:SYNTAX_CSS_HASH_LENGTH]
+    relative_path = SYNTAX_CSS_DIR / f"syntax-{digest}.css"
+    site_context.syntax_stylesheet = relative_path.as_posix()
+    used = "all" if token_classes is None else str(len(token_classes))
+    logger.info(
+        f"Syntax stylesheet {relative_path} for style {style_name}: {used} token classes"
+    )
+    return RenderedPage(relative_path=relative_path, content=css)
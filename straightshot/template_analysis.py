@@ -0,0 +1,292 @@
+"""
+Template cost analysis: finds template code that makes builds scale badly.
+
+A template rendered for every article that loops over `site.articles` (or
+scans it with a filter like `selectattr`) makes the build quadratic in the
+number of articles, and so does a loop over a site-wide collection nested in
+another one. `analyze_templates` finds both in the Jinja AST of the templates.
+
+With a render budget, the build also times every template and block, and
+`report_template_budgets` warns about templates that took longer per render
+than the budget, pointing at their slowest block and at the loops found by
+the static analysis.
+"""
+
+import logging
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import jinja2
+from jinja2 import nodes
+
+from straightshot.custom_tags import LINK_TAG_TEMPLATE
+from straightshot.models import (
+    BuildMetrics,
+    BuildResult,
+    ContentProcessingConfig,
+    SiteContext,
+    TemplateFinding,
+)
+from straightshot.template_dependencies import (
+    compute_template_closure,
+    compute_template_graph,
+)
+from straightshot.templating import ARTICLE_TEMPLATE
+
+# Attributes of `site` holding a collection that grows with the site
+SITE_COLLECTIONS = ("articles", "topics")
+# Variables standalone pages get with the same collections
+CONTEXT_COLLECTIONS = ("articles", "topics", "article_index")
+# Filters that do not walk the sequence they are applied to
+CONSTANT_FILTERS = ("length", "count", "first", "last", "default", "d")
+TAG_TEMPLATES_PREFIX = "tags/"
+
+
+def create_analysis_environment(templates_dir: Path) -> jinja2.Environment:
+    """Create an environment that can parse, but not render, the templates."""
+    # Nothing is rendered, so escaping does not matter
+    return jinja2.Environment(loader=jinja2.FileSystemLoader(templates_dir))  # noqa: S701
+
+
+def compute_article_templates(
+    env: jinja2.Environment, custom_tags: dict[str, str]
+) -> set[str]:
+    """Return the templates rendered once per article: the page and tag templates."""
+    roots = [ARTICLE_TEMPLATE, LINK_TAG_TEMPLATE, *custom_tags.values()]
+    roots += [
+        name for name in env.list_templates() if name.startswith(TAG_TEMPLATES_PREFIX)
+    ]
+    return compute_template_closure(compute_template_graph(env), roots)
+
+
+def _find_collection(node: nodes.Node) -> str | None:
+    """Return the site-wide collection an expression walks, if any."""
+    if isinstance(node, nodes.Name):
+        return node.name if node.name in CONTEXT_COLLECTIONS else None
+    if isinstance(node, nodes.Getattr):
+        if (
+            isinstance(node.node, nodes.Name)
+            and node.node.name == "site"
+            and node.attr in SITE_COLLECTIONS
+        ):
+            return f"site.{node.attr}"
+        return _find_collection(node.node)  # e.g. site.topics.items()
+    if isinstance(node, nodes.Getitem):
+        if isinstance(node.arg, nodes.Slice):
+            # A slice with an end is bounded however large the site grows
+            return None if node.arg.stop is not None else _find_collection(node.node)
+        if (
+            isinstance(node.node, nodes.Name)
+            and node.node.name == "site"
+            and isinstance(node.arg, nodes.Const)
+            and node.arg.value in SITE_COLLECTIONS
+        ):
+            return f"site.{node.arg.value}"
+        return None
+    if isinstance(node, (nodes.Filter, nodes.Call)) and node.node is not None:
+        return _find_collection(node.node)
+    return None
+
+
+def _analyze_node(
+    template: str,
+    node: nodes.Node,
+    per_article: bool,
+    enclosing: str | None,
+    findings: list[TemplateFinding],
+) -> None:
+    """Record costly constructs below `node`; `enclosing` is the outer site-wide loop."""
+    if isinstance(node, nodes.For):
+        collection = _find_collection(node.iter)
+        if collection is not None and enclosing is not None:
+            message = (
+                f"loop over {collection} inside a loop over {enclosing} is quadratic"
+            )
+            findings.append(
+                TemplateFinding(template=template, line=node.lineno, message=message)
+            )
+        elif collection is not None and per_article:
+            message = f"loop over {collection} runs for every article"
+            findings.append(
+                TemplateFinding(template=template, line=node.lineno, message=message)
+            )
+        for child in [*node.body, *node.else_]:
+            _analyze_node(
+                template, child, per_article, collection or enclosing, findings
+            )
+        return
+
+    if isinstance(node, nodes.Filter) and node.name not in CONSTANT_FILTERS:
+        collection = _find_collection(node)
+        if collection is not None and (per_article or enclosing is not None):
+            where = (
+                f"inside a loop over {enclosing}" if enclosing else "for every article"
+            )
+            # Name the filter that scans, not the ones converting its result
+            scanning = node
+            while (
+                isinstance(scanning.node, nodes.Filter)
+                and scanning.node.name not in CONSTANT_FILTERS
+            ):
+                scanning = scanning.node
+            message = f"filter {scanning.name} scans {collection} {where}"
+            findings.append(
+                TemplateFinding(template=template, line=node.lineno, message=message)
+            )
+            return  # The rest of the filter chain scans the same collection
+
+    for child in node.iter_child_nodes():
+        _analyze_node(template, child, per_article, enclosing, findings)
+
+
+def analyze_templates(
+    env: jinja2.Environment, custom_tags: dict[str, str]
+) -> list[TemplateFinding]:
+    """Find loops and filters over site-wide collections that multiply render time."""
+    logger = logging.getLogger(__name__)
+    article_templates = compute_article_templates(env, custom_tags)
+    findings: list[TemplateFinding] = []
+    for name in env.list_templates():
+        try:
+            source, _, _ = env.loader.get_source(env, name)  # type: ignore[union-attr]
+            ast = env.parse(source, name)
+        except Exception as e:
+            # The build reports broken templates where they are rendered
+            logger.debug(f"Could not parse template {name}: {e}")
+            continue
+        _analyze_node(name, ast, name in article_templates, None, findings)
+    return findings
+
+
+def _reads_article_html(node: nodes.Node) -> bool:
+    if isinstance(node, nodes.Getattr):
+        target, attribute = node.node, node.attr
+    elif isinstance(node, nodes.Getitem) and isinstance(node.arg, nodes.Const):
+        target, attribute = node.node, node.arg.value
+    else:
+        return False
+    own_page = isinstance(target, nodes.Name) and target.name == "page"
+    return bool(attribute == "html" and not own_page)
+
+
+def _find_templates(
+    env: jinja2.Environment, predicate: Callable[[nodes.Node], bool]
+) -> list[str]:
+    """Return the templates with an AST node matching `predicate`."""
+    logger = logging.getLogger(__name__)
+    matches = []
+    for name in env.list_templates():
+        try:
+            source, _, _ = env.loader.get_source(env, name)  # type: ignore[union-attr]
+            ast = env.parse(source, name)
+        except Exception as e:
+            logger.debug(f"Could not parse template {name}: {e}")
+            continue
+        if any(predicate(node) for node in ast.find_all(nodes.Node)):
+            matches.append(name)
+    return matches
+
+
+def find_article_html_reads(env: jinja2.Environment) -> list[str]:
+    """
+    Return the templates that read the `html` of another article.
+
+    `page.html` is the page's own content; any other `.html` (`page.next.html`,
+    `article.html` in a loop) needs the HTML of articles rendered elsewhere.
+    """
+    return _find_templates(env, _reads_article_html)
+
+
+def _includes_markdown(node: nodes.Node) -> bool:
+    return (
+        isinstance(node, nodes.Call)
+        and isinstance(node.node, nodes.Name)
+        and node.node.name == "include_markdown"
+    )
+
+
+def find_markdown_includes(env: jinja2.Environment) -> list[str]:
+    """Return the templates that render Markdown files with `include_markdown`."""
+    return _find_templates(env, _includes_markdown)
+
+
+def _find_block_line(env: jinja2.Environment, template: str, block: str) -> int | None:
+    try:
+        source, _, _ = env.loader.get_source(env, template)  # type: ignore[union-attr]
+        ast = env.parse(source, template)
+    except Exception:
+        return None
+    for node in ast.find_all(nodes.Block):
+        if node.name == block:
+            return node.lineno
+    return None
+
+
+def _describe_slowest_block(
+    env: jinja2.Environment, metrics: BuildMetrics, templates: Iterable[str]
+) -> str | None:
+    slowest: tuple[float, str, str] | None = None
+    for template in templates:
+        stats = metrics.templates.get(template)
+        for block, block_stats in (stats.blocks if stats else {}).items():
+            if block_stats.renders:
+                per_render = block_stats.total_seconds / block_stats.renders
+                if slowest is None or per_render > slowest[0]:
+                    slowest = (per_render, template, block)
+    if slowest is None:
+        return None
+    per_render, template, block = slowest
+    line = _find_block_line(env, template, block)
+    location = f"{template}:{line}" if line is not None else template
+    return f"slowest block {block} at {location} ({per_render * 1000:.1f} ms)"
+
+
+def check_template_budgets(
+    env: jinja2.Environment,
+    metrics: BuildMetrics,
+    budget_ms: float,
+    findings: list[TemplateFinding],
+) -> list[str]:
+    """Describe the templates that took longer than the budget per render on average."""
+    graph = compute_template_graph(env)
+    messages = []
+    for name, stats in metrics.templates.items():
+        if not stats.renders:
+            continue
+        per_render_ms = stats.total_seconds / stats.renders * 1000
+        if per_render_ms <= budget_ms:
+            continue
+        closure = compute_template_closure(graph, [name])
+        causes = [
+            f"{finding.template}:{finding.line}: {finding.message}"
+            for finding in findings
+            if finding.template in closure
+        ]
+        slowest_block = _describe_slowest_block(env, metrics, closure)
+        if slowest_block is not None:
+            causes.insert(0, slowest_block)
+        details = f"; {'; '.join(causes)}" if causes else ""
+        messages.append(
+            f"Template {name} took {per_render_ms:.1f} ms per render over "
+            f"{stats.renders} renders (budget {budget_ms:g} ms){details}"
+        )
+    return messages
+
+
+def report_template_budgets(
+    content_config: ContentProcessingConfig,
+    site_context: SiteContext,
+    build_result: BuildResult,
+) -> None:
+    """Add a warning for every template over the render budget of this build."""
+    if content_config.template_budget_ms is None or build_result.metrics is None:
+        return
+    env = create_analysis_environment(content_config.templates_dir)
+    build_result.warnings.extend(
+        check_template_budgets(
+            env,
+            build_result.metrics,
+            content_config.template_budget_ms,
+            analyze_templates(env, site_context.custom_tags),
+        )
+    )
@@ -0,0 +1,275 @@
+"""
+Template dependency tracking for re-rendering only the pages a template edit affects.
+
+The template graph is read from the Jinja AST of every template: the templates
+it extends, includes and imports. Each rendered page records the closure of
+the templates it used (the page template plus the templates of the custom tags
+in an article) and the file it produced. The next build compares the source
+hashes of the templates with the previous build's; when the content and site
+configuration are unchanged, a page is only rendered again if one of its
+templates changed or its output file is gone, and the reason is recorded.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+import jinja2
+import jinja2.meta
+
+from straightshot.build_cache import (
+    compute_file_fingerprint,
+    load_cache_entry,
+    save_cache_entry,
+)
+from straightshot.config import compute_data_fingerprint
+from straightshot.deploy_manifest import get_output_key
+from straightshot.image_dimensions import IMAGE_SUFFIXES
+from straightshot.models import (
+    BuildResult,
+    ContentProcessingConfig,
+    PageRenderRecord,
+    RenderManifest,
+    SiteContext,
+)
+
+RENDER_MANIFEST_NAMESPACE = "render-manifest"
+RENDER_MANIFEST_VERSION = 2
+# Stands for "any template" where a template name is only known at render time
+DYNAMIC_TEMPLATE = "*"
+RENDER_REASON_EXAMPLES = 5  # Pages listed per reason in the build summary
+
+
+def compute_template_graph(env: jinja2.Environment) -> dict[str, set[str]]:
+    """Map every template to the templates it extends, includes or imports."""
+    logger = logging.getLogger(__name__)
+    graph: dict[str, set[str]] = {}
+    for name in env.list_templates():
+        try:
+            source, _, _ = env.loader.get_source(env, name)  # type: ignore[union-attr]
+            ast = env.parse(source, name)
+        except Exception as e:
+            # Rendering reports broken templates; depend on everything meanwhile
+            logger.debug(f"Could not parse template {name}: {e}")
+            graph[name] = {DYNAMIC_TEMPLATE}
+            continue
+        graph[name] = {
+            reference or DYNAMIC_TEMPLATE
+            for reference in jinja2.meta.find_referenced_templates(ast)
+        }
+    return graph
+
+
+def compute_template_closure(
+    graph: dict[str, set[str]], roots: Iterable[str]
+) -> set[str]:
+    """Return the given templates and every template they depend on."""
+    closure: set[str] = set()
+    stack = list(roots)
+    while stack:
+        name = stack.pop()
+        if name not in closure:
+            closure.add(name)
+            stack.extend(graph.get(name, ()))
+    return closure
+
+
+def compute_template_fingerprints(env: jinja2.Environment) -> dict[str, str]:
+    """Return the SHA-256 of the source of every template."""
+    fingerprints = {}
+    for name in env.list_templates():
+        source, _, _ = env.loader.get_source(env, name)  # type: ignore[union-attr]
+        fingerprints[name] = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    return fingerprints
+
+
+def compute_render_inputs_fingerprint(
+    content_config: ContentProcessingConfig, site_context: SiteContext
+) -> str:
+    """
+    Fingerprint everything except templates that rendered pages depend on.
+
+    That is every file below the content root (articles, but also files
+    `include_markdown` reads), the images in the static directory whose
+    dimensions pages are given, the content directories of this build and the
+    site configuration including its data includes.
+    """
+    content_files = sorted(
+        Path(root) / name
+        for root, _, files in os.walk(content_config.content_root)
+        for name in files
+    )
+    image_files = sorted(
+        Path(root) / name
+        for root, _, files in os.walk(content_config.static_dir)
+        for name in files
+        if Path(name).suffix.lower() in IMAGE_SUFFIXES
+    )
+    inputs = {
+        "version": RENDER_MANIFEST_VERSION,
+        "content_dirs": [str(path) for path in content_config.content_dirs],
+        "render_markdown": content_config.render_markdown,
+        "files": [
+            (str(path), *compute_file_fingerprint(path)) for path in content_files
+        ],
+        "images": [
+            (str(path), *compute_file_fingerprint(path)) for path in image_files
+        ],
+        "site": site_context.model_dump_json(
+            exclude={"articles", "topics", "languages", "data"}
+        ),
+        "data": compute_data_fingerprint(site_context.data),
+    }
+    return hashlib.sha256(json.dumps(inputs).encode("utf-8")).hexdigest()
+
+
+def load_render_manifest(
+    content_config: ContentProcessingConfig,
+) -> RenderManifest | None:
+    """Load what the previous build of this output rendered."""
+    manifest: RenderManifest | None = load_cache_entry(
+        content_config.cache_dir,
+        RENDER_MANIFEST_NAMESPACE,
+        get_output_key(content_config),
+        RENDER_MANIFEST_VERSION,
+    )
+    return manifest
+
+
+def save_render_manifest(
+    content_config: ContentProcessingConfig, manifest: RenderManifest
+) -> None:
+    """Store what this build rendered."""
+    save_cache_entry(
+        content_config.cache_dir,
+        RENDER_MANIFEST_NAMESPACE,
+        get_output_key(content_config),
+        RENDER_MANIFEST_VERSION,
+        manifest,
+    )
+
+
+class RenderTracker:
+    """
+    Decides which pages a build renders and records what each page depends on.
+
+    Thread-safe, as content and standalone pages are rendered concurrently.
+    """
+
+    def __init__(
+        self,
+        env: jinja2.Environment,
+        content_config: ContentProcessingConfig,
+        site_context: SiteContext,
+    ) -> None:
+        self.output_dir = content_config.output_dir
+        self.graph = compute_template_graph(env)
+        self.inputs_fingerprint = compute_render_inputs_fingerprint(
+            content_config, site_context
+        )
+        self.template_fingerprints = compute_template_fingerprints(env)
+        self._page_templates: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+        # Pages can only be kept in an output directory that still has them
+        previous = None
+        self._full_render_reason: str | None = None
+        if content_config.output_archive is not None:
+            self._full_render_reason = "archive output is always written completely"
+        else:
+            previous = load_render_manifest(content_config)
+            if previous is None:
+                self._full_render_reason = "no record of a previous build"
+            elif previous.inputs_fingerprint != self.inputs_fingerprint:
+                self._full_render_reason = "content or site configuration changed"
+        self._previous_pages = previous.pages if previous else {}
+        self._changed_templates = (
+            {
+                name
+                for name in previous.templates.keys()
+                | self.template_fingerprints.keys()
+                if previous.templates.get(name) != self.template_fingerprints.get(name)
+            }
+            if previous
+            else set()
+        )
+
+    def compute_render_reason(self, relative_path: str) -> str | None:
+        """Return why a page must be rendered, or None if its output is current."""
+        if self._full_render_reason is not None:
+            return self._full_render_reason
+        record = self._previous_pages.get(relative_path)
+        if record is None:
+            return "new page"
+        changed = self._changed_templates.intersection(record.templates)
+        if changed:
+            return f"template {', '.join(sorted(changed))} changed"
+        if DYNAMIC_TEMPLATE in record.templates and self._changed_templates:
+            return "page includes a template chosen at render time"
+        try:
+            data = (self.output_dir / relative_path).read_bytes()
+        except OSError:
+            return "output file missing"
+        # Pages are small; an edit that keeps the size only shows in the hash
+        if len(data) != record.output.size or (
+            hashlib.sha256(data).hexdigest() != record.output.sha256
+        ):
+            return "output file was modified"
+        return None
+
+    def keep_page(self, relative_path: str, build_result: BuildResult) -> None:
+        """Carry over a page that does not need rendering from the previous build."""
+        record = self._previous_pages[relative_path]
+        with self._lock:
+            self._page_templates[relative_path] = record.templates
+            build_result.output_files[relative_path] = record.output
+            build_result.pages_kept += 1
+
+    def record_page(
+        self,
+        relative_path: str,
+        templates: Iterable[str],
+        reason: str,
+        build_result: BuildResult,
+    ) -> None:
+        """Record that a page is rendered from these templates, and why."""
+        dependencies = sorted(compute_template_closure(self.graph, templates))
+        with self._lock:
+            self._page_templates[relative_path] = dependencies
+            build_result.render_reasons[relative_path] = reason
+
+    def compute_manifest(self, build_result: BuildResult) -> RenderManifest:
+        """Describe the pages of this build that were written or kept."""
+        with self._lock:
+            return RenderManifest(
+                inputs_fingerprint=self.inputs_fingerprint,
+                templates=self.template_fingerprints,
+                pages={
+                    relative_path: PageRenderRecord(
+                        templates=templates,
+                        output=build_result.output_files[relative_path],
+                    )
+                    for relative_path, templates in sorted(self._page_templates.items())
+                    if relative_path in build_result.output_files
+                },
+            )
+
+
+def report_render_reasons(build_result: BuildResult) -> None:
+    """Log why pages were rendered, grouped by reason."""
+    logger = logging.getLogger(__name__)
+    by_reason: dict[str, list[str]] = {}
+    for relative_path, reason in sorted(build_result.render_reasons.items()):
+        by_reason.setdefault(reason, []).append(relative_path)
+        logger.debug(f"Rendered {relative_path}: {reason}")
+    if build_result.pages_kept:
+        logger.info(f"Kept {build_result.pages_kept} unchanged pages")
+    for reason, pages in sorted(by_reason.items(), key=lambda item: -len(item[1])):
+        examples = ", ".join(pages[:RENDER_REASON_EXAMPLES])
+        more = len(pages) - RENDER_REASON_EXAMPLES
+        suffix = f" and {more} more" if more > 0 else ""
+        logger.info(f"Rendered {len(pages)} pages ({reason}): {examples}{suffix}")
@@ -3,6 +3,7 @@ Handles Jinja2 environment setup, context creation, and template rendering to st
 """
 
 import logging
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
@@ -17,8 +18,33 @@ from jinja2 import (
 )
 from markupsafe import Markup
 
+from straightshot.build_cache import MemoCache, compute_file_fingerprint
+from straightshot.config import materialize_data, serialize_data
 from straightshot.content_processor import process_markdown_content
+from straightshot.image_dimensions import ImageDimensionReader
+from straightshot.metrics import TimedTemplate
 from straightshot.models import SiteContext
+from straightshot.site_queries import SiteQueries
+
+MARKDOWN_CACHE_NAME = "include_markdown"
+MARKDOWN_CACHE_SIZE = 256  # Distinct included markdown files kept in memory
+ARTICLE_TEMPLATE = "article.html"  # Renders every content page
+
+
+class SiteEnvironment(Environment):
+    """
+    Jinja environment that hands templates the parsed content of data includes.
+
+    `site.data.navigation` evaluates to the parsed file rather than its lazy
+    include, so tests such as `is mapping` and filters such as `tojson` see plain
+    dicts and lists.
+    """
+
+    def getattr(self, obj: Any, attribute: str) -> Any:
+        return materialize_data(super().getattr(obj, attribute))
+
+    def getitem(self, obj: Any, argument: Any) -> Any:
+        return materialize_data(super().getitem(obj, argument))
 
 
 def _register_filters(env: Environment, site_context: SiteContext) -> None:
@@ -38,8 +64,27 @@ def _register_filters(env: Environment, site_context: SiteContext) -> None:
     env.filters["now"] = now_filter
 
 
+def _create_image_size(
+    image_reader: ImageDimensionReader | None,
+) -> Callable[[str | None], dict[str, int] | None]:
+    def image_size(path: str | None) -> dict[str, int] | None:
+        """Return the width and height of a local image, or None if unknown."""
+        if image_reader is None or not path:
+            return None
+        dimensions = image_reader.get_dimensions(path)
+        if dimensions is None:
+            return None
+        return {"width": dimensions[0], "height": dimensions[1]}
+
+    return image_size
+
+
 def _register_globals(
-    env: Environment, site_context: SiteContext, content_root: Path
+    env: Environment,
+    site_context: SiteContext,
+    content_root: Path,
+    markdown_cache: MemoCache,
+    image_reader: ImageDimensionReader | None,
 ) -> None:
     """Register custom Jinja global functions."""
     logger = logging.getLogger(__name__)
@@ -82,12 +127,20 @@ def _register_globals(
                 )
                 return f"<!-- Error: Markdown file not found: {relative_path_str} -->"
 
-            # Load using frontmatter to separate content from metadata
-            post = frontmatter.load(markdown_file_path, encoding="utf-8")
-            markdown_content = post.content  # Use only the content part
-
-            # Process markdown content
-            html_content = process_markdown_content(markdown_content)
+            # Reuse the rendered HTML while the file is unchanged
+            cache_key = (
+                str(markdown_file_path),
+                *compute_file_fingerprint(markdown_file_path),
+            )
+            html_content = markdown_cache.get(cache_key)
+            if html_content is None:
+                # Load using frontmatter to separate content from metadata
+                post = frontmatter.load(markdown_file_path, encoding="utf-8")
+                markdown_content = post.content  # Use only the content part
+
+                # Process markdown content
+                html_content = process_markdown_content(markdown_content)
+                markdown_cache.put(cache_key, html_content)
             # Return as Markup to prevent double escaping, suppress Bandit warning
             return Markup(html_content)  # noqa: S704
         except Exception as e:
@@ -97,23 +150,48 @@ def _register_globals(
 
     env.globals["include_markdown"] = _include_markdown
 
+    site_queries = SiteQueries(site_context)
+    env.globals["articles_by"] = site_queries.articles_by
+    env.globals["recent"] = site_queries.recent
+    env.globals["by_year"] = site_queries.by_year
+    env.globals["image_size"] = _create_image_size(image_reader)
+
 
 def create_jinja_environment(
-    templates_dir: Path, site_context: SiteContext, content_root: Path
+    templates_dir: Path,
+    site_context: SiteContext,
+    content_root: Path,
+    markdown_cache: MemoCache | None = None,
+    image_reader: ImageDimensionReader | None = None,
 ) -> Environment:
-    """Create and configure the Jinja2 environment."""
+    """
+    Create and configure the Jinja2 environment.
+
+    `markdown_cache` memoizes `include_markdown` results; pass a shared cache to
+    reuse them across environments and builds. Without an `image_reader`, the
+    `image_size` global knows no image's dimensions.
+    """
     if not templates_dir.exists():
         raise FileNotFoundError(f"Templates directory not found: {templates_dir}")
 
-    env = Environment(
+    env = SiteEnvironment(
         loader=FileSystemLoader(templates_dir),
         autoescape=select_autoescape(["html", "xml"]),
         trim_blocks=True,
         lstrip_blocks=True,
     )
+    env.template_class = TimedTemplate
+    # Includes nested in data passed to `tojson` whole are serialized as parsed
+    env.policies["json.dumps_kwargs"] = {"sort_keys": True, "default": serialize_data}
 
     _register_filters(env, site_context)
-    _register_globals(env, site_context, content_root)
+    _register_globals(
+        env,
+        site_context,
+        content_root,
+        markdown_cache or MemoCache(MARKDOWN_CACHE_NAME, MARKDOWN_CACHE_SIZE),
+        image_reader,
+    )
 
     return env
 
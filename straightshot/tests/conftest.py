@@ -0,0 +1,95 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from straightshot.builder import build_site
+from straightshot.config import load_site_context_from_path
+from straightshot.models import BuildResult, ContentProcessingConfig
+
+# A small site: two articles, a standalone index page and one static file
+SITE_FILES = {
+    "site.yaml": """\
+title: Test Site
+description: A site for tests
+author: Tester
+url: https://example.com
+standalone_pages:
+  - template: index.html
+    output: index.html
+""",
+    "templates/base.html": """\
+<html><head><title>{% block title %}{% endblock %}</title></head>
+<body>{% block body %}{% endblock %}</body></html>
+""",
+    "templates/article.html": """\
+{% extends "base.html" %}
+{% block title %}{{ page.metadata.title }}{% endblock %}
+{% block body %}{{ page.html | safe }}{% endblock %}
+""",
+    "templates/index.html": """\
+{% extends "base.html" %}
+{% block body %}{% for article in articles %}{{ article.url }} {% endfor %}{% endblock %}
+""",
+    "content/publish/alpha.md": """\
+---
+title: Alpha
+written: 2025-01-01
+topics: testing
+---
+First article.
+""",
+    "content/publish/beta.md": """\
+---
+title: Beta
+written: 2025-02-01
+topics: testing
+---
+Second article.
+""",
+    "static/css/main.css": "body { margin: 0; }\n",
+}
+
+SiteBuilder = Callable[..., BuildResult]
+
+
+@pytest.fixture
+def site_dir(tmp_path: Path) -> Path:
+    """A copy of the small test site in a temporary directory."""
+    site_dir = tmp_path / "site"
+    for relative_path, text in SITE_FILES.items():
+        path = site_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return site_dir
+
+
+@pytest.fixture
+def content_config(site_dir: Path) -> ContentProcessingConfig:
+    """Build configuration of the test site, with a build cache."""
+    return ContentProcessingConfig(
+        content_root=site_dir / "content",
+        content_dirs=[site_dir / "content" / "publish"],
+        templates_dir=site_dir / "templates",
+        static_dir=site_dir / "static",
+        output_dir=site_dir / "output",
+        cache_dir=site_dir / ".straightshot-cache",
+    )
+
+
+@pytest.fixture
+def build(site_dir: Path, content_config: ContentProcessingConfig) -> SiteBuilder:
+    """
+    Build the test site, like `straightshot build` does.
+
+    Keyword arguments override fields of the `content_config` fixture.
+    """
+
+    def build(**config: Any) -> BuildResult:
+        site_context = load_site_context_from_path(
+            site_dir / "site.yaml", content_config.cache_dir
+        )
+        return build_site(site_context, content_config.model_copy(update=config))
+
+    return build
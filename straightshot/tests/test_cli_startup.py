@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+from straightshot.docs_index import DOC_NAMES
+from straightshot.docs_utils import get_available_docs
+
+# Modules that only the build needs; importing any of them at startup is a regression
+HEAVY_MODULES = {"jinja2", "pygments", "markdown_it", "pydantic", "yaml", "frontmatter"}
+# Generous budget for the cumulative import time of the CLI entry point
+IMPORT_BUDGET_US = 200_000
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Return the cumulative import time in microseconds of every imported module."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_startup_avoids_heavy_imports() -> None:
+    times = _import_times("straightshot.main")
+    assert HEAVY_MODULES.isdisjoint(times)
+    assert times["straightshot.main"] < IMPORT_BUDGET_US
+
+
+def test_docs_index_is_up_to_date() -> None:
+    assert DOC_NAMES == get_available_docs()
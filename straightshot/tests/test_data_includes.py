@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import pytest
+
+from straightshot.config import (
+    CsvLoader,
+    JsonLinesLoader,
+    LazyRecords,
+    _process_includes,
+)
+from straightshot.models import SiteContext
+from straightshot.templating import create_jinja_environment
+
+
+def _render(tmp_path: Path, source: str, data: dict[str, str]) -> str:
+    """Render a template string with `data` processed as the site's data section."""
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir(exist_ok=True)
+    site_data = _process_includes(data, tmp_path, None)
+    env = create_jinja_environment(
+        templates_dir, SiteContext.model_construct(data=site_data), tmp_path
+    )
+    return env.from_string(source).render(data=site_data)
+
+
+def test_templates_see_parsed_include(tmp_path: Path) -> None:
+    (tmp_path / "nav.yaml").write_text("items: [a, b]\n")
+    data = {"nav": "$$include_yaml nav.yaml"}
+
+    assert _render(tmp_path, "{{ data.nav is mapping }}", data) == "True"
+    assert _render(tmp_path, "{{ data.nav | tojson }}", data) == '{"items": ["a", "b"]}'
+    assert _render(tmp_path, "{{ data | tojson }}", data) == (
+        '{"nav": {"items": ["a", "b"]}}'
+    )
+
+
+def test_broken_include_is_read_once(tmp_path: Path) -> None:
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("items: [\n")
+    site_data = _process_includes(
+        {"broken": "$$include_yaml broken.yaml"}, tmp_path, None
+    )
+
+    with pytest.raises(ValueError, match="broken.yaml"):
+        site_data["broken"].materialize()
+    # The cached error is raised again even once the file is gone
+    broken.unlink()
+    with pytest.raises(ValueError, match="broken.yaml"):
+        site_data["broken"].materialize()
+
+
+# Quoted fields spanning lines, and a record after them to look up by offset
+MULTILINE_CSV = '''sku,name,notes
+A-1,Anvil,"heavy
+iron, black"
+A-2,"Bell, ""brass""",
+'''
+
+
+def _records(
+    path: Path, text: str, loader: CsvLoader | JsonLinesLoader, cache_dir: Path
+) -> LazyRecords:
+    """Write a data file and include it with records keyed by `sku`."""
+    path.write_bytes(text.encode("utf-8"))
+    return LazyRecords(path, loader, {"key": "sku"}, cache_dir)
+
+
+def test_csv_fields_with_embedded_newlines(tmp_path: Path) -> None:
+    records = _records(
+        tmp_path / "items.csv", MULTILINE_CSV, CsvLoader(), tmp_path / "cache"
+    )
+
+    assert list(records) == [
+        {"sku": "A-1", "name": "Anvil", "notes": "heavy\niron, black"},
+        {"sku": "A-2", "name": 'Bell, "brass"', "notes": ""},
+    ]
+    assert records["A-2"]["name"] == 'Bell, "brass"'
+    assert records["A-1"]["notes"] == "heavy\niron, black"
+    assert len(records) == 2
+
+
+def test_crlf_line_endings(tmp_path: Path) -> None:
+    csv_records = _records(
+        tmp_path / "items.csv",
+        "sku,name\r\nA-1,Anvil\r\nA-2,Bell\r\n",
+        CsvLoader(),
+        tmp_path / "cache",
+    )
+    jsonl_records = _records(
+        tmp_path / "items.jsonl",
+        '{"sku": "A-1"}\r\n\r\n{"sku": "A-2"}\r\n',
+        JsonLinesLoader(),
+        tmp_path / "cache",
+    )
+
+    assert csv_records["A-2"] == {"sku": "A-2", "name": "Bell"}
+    assert [record["sku"] for record in jsonl_records] == ["A-1", "A-2"]
+    assert jsonl_records["A-2"] == {"sku": "A-2"}
+
+
+def test_cached_index_is_rebuilt_after_file_change(tmp_path: Path) -> None:
+    path = tmp_path / "items.jsonl"
+    cache_dir = tmp_path / "cache"
+    records = _records(
+        path, '{"sku": "A-1"}\n{"sku": "A-2"}\n', JsonLinesLoader(), cache_dir
+    )
+    assert records["A-2"] == {"sku": "A-2"}
+
+    # Every record moves to another offset, and A-1 is gone
+    changed = _records(
+        path,
+        '{"sku": "A-0", "note": "new"}\n{"sku": "A-2", "note": "moved"}\n',
+        JsonLinesLoader(),
+        cache_dir,
+    )
+
+    assert changed["A-2"] == {"sku": "A-2", "note": "moved"}
+    assert changed.get("A-1") is None
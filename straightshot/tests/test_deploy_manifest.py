@@ -0,0 +1,58 @@
+import hashlib
+from collections.abc import Callable
+from pathlib import Path
+
+from straightshot.models import BuildResult, DeployDelta
+
+SiteBuilder = Callable[..., BuildResult]
+
+GAMMA_ARTICLE = """\
+---
+title: Gamma
+written: 2025-03-01
+topics: testing
+---
+Third article.
+"""
+
+
+def _read_delta(delta_path: Path) -> DeployDelta:
+    return DeployDelta.model_validate_json(delta_path.read_text(encoding="utf-8"))
+
+
+def test_delta_lists_added_changed_and_removed_files(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    delta_path = site_dir / "delta.json"
+    assert build().success
+    content_dir = site_dir / "content" / "publish"
+    alpha = content_dir / "alpha.md"
+    alpha.write_text(alpha.read_text().replace("First", "Edited first"))
+    (content_dir / "beta.md").unlink()
+    (content_dir / "gamma.md").write_text(GAMMA_ARTICLE)
+    (site_dir / "static" / "robots.txt").write_text("User-agent: *\n")
+    assert build(deploy_delta=delta_path).success
+    delta = _read_delta(delta_path)
+
+    assert {"content/en/gamma.html", "static/robots.txt"} <= delta.added.keys()
+    assert "content/en/alpha.html" in delta.changed
+    assert delta.removed == ["content/en/beta.html"]
+    # Unchanged files are in none of the lists
+    unchanged = "static/css/main.css"
+    assert unchanged not in delta.added and unchanged not in delta.changed
+    for relative_path, record in {**delta.added, **delta.changed}.items():
+        data = (site_dir / "output" / relative_path).read_bytes()
+        assert record.size == len(data)
+        assert record.sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_delta_without_previous_build_adds_every_file(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    delta_path = site_dir / "delta.json"
+    result = build(deploy_delta=delta_path)
+    delta = _read_delta(delta_path)
+
+    assert delta.added.keys() == result.output_files.keys()
+    assert not delta.changed and not delta.removed
+    assert any("No manifest of a previous build" in w for w in result.warnings)
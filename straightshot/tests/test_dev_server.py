@@ -0,0 +1,96 @@
+import http.client
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from straightshot.dev_server import DevServer
+
+
+class RecordingPageSource:
+    """A page source with a single `/docs/` page that records every lookup."""
+
+    def __init__(self) -> None:
+        self.rendered: list[str] = []
+        self.checked: list[str] = []
+
+    def render_page(self, url_path: str) -> bytes | None:
+        self.rendered.append(url_path)
+        return b"<p>docs</p>" if url_path == "/docs/" else None
+
+    def has_page(self, url_path: str) -> bool:
+        self.checked.append(url_path)
+        return url_path == "/docs/"
+
+
+@pytest.fixture
+def page_source() -> RecordingPageSource:
+    return RecordingPageSource()
+
+
+@pytest.fixture
+def server(tmp_path: Path, page_source: RecordingPageSource) -> Iterator[DevServer]:
+    """A dev server for a directory with a root and a `blog/` index page."""
+    (tmp_path / "blog").mkdir()
+    (tmp_path / "blog" / "index.html").write_text("<p>blog</p>")
+    (tmp_path / "index.html").write_text("<p>home</p>")
+    server = DevServer(
+        ("127.0.0.1", 0), tmp_path, live_reload=False, page_source=page_source
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server: DevServer, path: str) -> http.client.HTTPResponse:
+    """Send a GET request to the server and read the response body."""
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response
+
+
+def test_directory_without_slash_is_redirected(server: DevServer) -> None:
+    response = _get(server, "/blog?page=2")
+
+    assert response.status == 301
+    assert response.getheader("Location") == "/blog/?page=2"
+    assert _get(server, "/blog/").status == 200
+
+
+def test_page_source_directory_is_redirected_without_rendering(
+    server: DevServer, page_source: RecordingPageSource
+) -> None:
+    response = _get(server, "/docs")
+
+    assert response.status == 301
+    assert response.getheader("Location") == "/docs/"
+    assert page_source.rendered == ["/docs"]
+    assert page_source.checked == ["/docs/"]
+
+
+def test_existing_file_skips_page_source_check(
+    server: DevServer, page_source: RecordingPageSource
+) -> None:
+    assert _get(server, "/index.html").status == 200
+    assert _get(server, "/missing").status == 404
+
+    assert page_source.checked == ["/missing/"]
+
+
+def test_etag_cache_keeps_one_entry_per_file(server: DevServer, tmp_path: Path) -> None:
+    page = tmp_path / "index.html"
+    etags = set()
+    for i in range(3):
+        page.write_text(f"<p>home {i}</p>")
+        os.utime(page, ns=(i * 10**9, i * 10**9))
+        etags.add(_get(server, "/").getheader("ETag"))
+
+    assert len(etags) == 3
+    assert len(server._etags) == 1
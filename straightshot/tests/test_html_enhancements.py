@@ -0,0 +1,119 @@
+import pytest
+
+from straightshot.html_enhancements import enhance_page_html
+
+COPY_BUTTON = '<button type="button" class="copy-button">Copy</button>'
+
+
+def _image_size(src: str) -> tuple[int, int] | None:
+    return (640, 480) if src == "/static/images/photo.png" else None
+
+
+def test_external_link_opens_in_new_tab() -> None:
+    page = '<a href="https://example.org/">out</a>'
+
+    assert enhance_page_html(page) == (
+        '<a href="https://example.org/" rel="noopener noreferrer" '
+        'target="_blank">out</a>'
+    )
+
+
+@pytest.mark.parametrize(
+    "link",
+    [
+        '<a href="/content/en/alpha.html">in</a>',
+        '<a href="#section">anchor</a>',
+        '<a href="mailto:me@example.com">mail</a>',
+        "<a name=top></a>",
+    ],
+)
+def test_internal_links_are_unchanged(link: str) -> None:
+    assert enhance_page_html(link) == link
+
+
+def test_existing_link_attributes_are_kept() -> None:
+    page = '<a href="https://example.org/" rel="me" target="_self">out</a>'
+
+    assert enhance_page_html(page) == (
+        '<a href="https://example.org/" rel="me noopener noreferrer" '
+        'target="_self">out</a>'
+    )
+
+
+def test_existing_noopener_is_not_repeated() -> None:
+    page = '<a href="https://example.org/" rel="noopener">out</a>'
+
+    assert enhance_page_html(page) == (
+        '<a href="https://example.org/" rel="noopener" target="_blank">out</a>'
+    )
+
+
+def test_images_are_lazy_and_sized() -> None:
+    page = '<img src="/static/images/photo.png" alt="">'
+
+    assert enhance_page_html(page, _image_size) == (
+        '<img src="/static/images/photo.png" alt="" width="640" height="480" '
+        'decoding="async" loading="lazy">'
+    )
+
+
+def test_existing_media_attributes_are_kept() -> None:
+    page = (
+        '<img src="/static/images/photo.png" width="10" loading="eager" '
+        'decoding="sync" />'
+        '<iframe src="https://example.org/embed" loading="eager"></iframe>'
+    )
+
+    assert enhance_page_html(page, _image_size) == page
+
+
+def test_data_src_placeholder_becomes_src() -> None:
+    page = '<img data-src="/static/images/other.png">'
+
+    assert enhance_page_html(page, _image_size) == (
+        '<img src="/static/images/other.png" decoding="async" loading="lazy">'
+    )
+
+
+@pytest.mark.parametrize("element", ["script", "style", "textarea"])
+def test_raw_text_elements_are_skipped(element: str) -> None:
+    raw = (
+        f'<{element}>"<a href="https://example.org/">x</a>'
+        f'<img src="a.png"><pre><code>y</code></pre>"</{element}>'
+    )
+    page = f'{raw}<a href="https://example.org/">out</a>'
+
+    assert enhance_page_html(page) == (
+        f'{raw}<a href="https://example.org/" rel="noopener noreferrer" '
+        'target="_blank">out</a>'
+    )
+
+
+def test_code_block_with_language_gets_label() -> None:
+    block = '<pre><code class="language-python">print()</code></pre>'
+
+    assert enhance_page_html(block) == (
+        '<div class="code-block"><div class="code-block-header">'
+        f'<span class="code-language">python</span>{COPY_BUTTON}</div>{block}</div>'
+    )
+
+
+def test_code_block_language_from_data_attribute() -> None:
+    block = '<pre data-language="c++"><code>int x;</code></pre>'
+
+    assert '<span class="code-language">c++</span>' in enhance_page_html(block)
+
+
+def test_code_block_without_language_gets_only_copy_button() -> None:
+    block = "<pre><code>plain text</code></pre>"
+
+    assert enhance_page_html(block) == (
+        '<div class="code-block"><div class="code-block-header">'
+        f"{COPY_BUTTON}</div>{block}</div>"
+    )
+
+
+def test_pre_without_code_is_not_wrapped() -> None:
+    page = "<pre>ascii art</pre>"
+
+    assert enhance_page_html(page) == page
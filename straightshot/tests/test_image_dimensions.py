@@ -0,0 +1,101 @@
+import struct
+
+import pytest
+
+from straightshot.image_dimensions import parse_image_dimensions
+
+
+def _webp(chunk: bytes, payload: bytes) -> bytes:
+    """Return a WebP file header with a single chunk."""
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _jpeg_sof(width: int, height: int) -> bytes:
+    """Return a baseline start-of-frame segment with three components."""
+    frame = struct.pack(">BHHB", 8, height, width, 3) + bytes(9)
+    return b"\xff\xc0" + struct.pack(">H", len(frame) + 2) + frame
+
+
+def _jpeg_exif(orientation: int) -> bytes:
+    """Return an APP1 segment with a little-endian EXIF orientation tag."""
+    entry = struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0)
+    tiff = b"II*\x00" + struct.pack("<IH", 8, 1) + entry + bytes(4)
+    segment = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(segment) + 2) + segment
+
+
+# JFIF header segment that precedes the frame header in most JPEGs
+JPEG_APP0 = b"\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+
+IMAGE_HEADERS = {
+    "png": b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+    + struct.pack(">II", 640, 480)
+    + b"\x08\x06\x00\x00\x00",
+    "gif": b"GIF89a" + struct.pack("<HH", 320, 200) + b"\xf7\x00\x00",
+    # Frame tag, start code, then 14-bit dimensions with 2 scaling bits set
+    "webp-vp8": _webp(
+        b"VP8 ",
+        b"\x30\x01\x00\x9d\x01\x2a" + struct.pack("<HH", 800 | 0x4000, 600 | 0x8000),
+    ),
+    # Signature byte, then width - 1 and height - 1 packed in 14 bits each
+    "webp-vp8l": _webp(
+        b"VP8L", b"\x2f" + struct.pack("<I", (1024 - 1) | (768 - 1) << 14)
+    ),
+    # Flags, then 24-bit width - 1 and height - 1
+    "webp-vp8x": _webp(
+        b"VP8X",
+        bytes(4) + (4000 - 1).to_bytes(3, "little") + (3000 - 1).to_bytes(3, "little"),
+    ),
+    "jpeg": b"\xff\xd8" + JPEG_APP0 + _jpeg_sof(1920, 1080),
+    "svg": b'<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg" '
+    b'viewBox="0 0 120.4 80">',
+}
+
+EXPECTED_DIMENSIONS = {
+    "png": (640, 480),
+    "gif": (320, 200),
+    "webp-vp8": (800, 600),
+    "webp-vp8l": (1024, 768),
+    "webp-vp8x": (4000, 3000),
+    "jpeg": (1920, 1080),
+    "svg": (120, 80),
+}
+
+
+@pytest.mark.parametrize("image_format", sorted(IMAGE_HEADERS))
+def test_parse_image_dimensions(image_format: str) -> None:
+    dimensions = parse_image_dimensions(IMAGE_HEADERS[image_format])
+
+    assert dimensions == EXPECTED_DIMENSIONS[image_format]
+
+
+@pytest.mark.parametrize(
+    ("orientation", "expected"),
+    [(1, (1920, 1080)), (3, (1920, 1080)), (6, (1080, 1920)), (8, (1080, 1920))],
+)
+def test_jpeg_exif_orientation(orientation: int, expected: tuple[int, int]) -> None:
+    data = b"\xff\xd8" + _jpeg_exif(orientation) + _jpeg_sof(1920, 1080)
+
+    assert parse_image_dimensions(data) == expected
+
+
+def test_svg_percentage_size_falls_back_to_view_box() -> None:
+    data = b'<svg width="100%" height="50%" viewBox="0,0,300,150"></svg>'
+
+    assert parse_image_dimensions(data) == (300, 150)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"not an image",
+        IMAGE_HEADERS["png"][:20],  # Truncated before the dimensions
+        b"\xff\xd8" + JPEG_APP0,  # No frame header
+        b"GIF89a\x00\x00\x00\x00",  # Zero width
+        b'<svg width="10em" height="5em">',  # No usable size
+    ],
+)
+def test_unrecognized_images(data: bytes) -> None:
+    assert parse_image_dimensions(data) is None
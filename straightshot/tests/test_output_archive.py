@@ -0,0 +1,98 @@
+import io
+import json
+import tarfile
+import zipfile
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from straightshot.models import BuildResult
+from straightshot.output_archive import DEFAULT_ARCHIVE_MTIME, OutputArchive
+
+SiteBuilder = Callable[..., BuildResult]
+
+# Deflated, stored (precompressed suffix) and empty members, in no particular order
+ARCHIVE_FILES = {
+    "index.html": b"<html>" + b"hello " * 200 + b"</html>",
+    "static/images/logo.png": bytes(range(256)) * 3,
+    "content/en/empty.html": b"",
+    "static/css/main.css": b"body { margin: 0; }\n",
+}
+
+
+def _write_archive(archive_path: Path, files: dict[str, bytes]) -> bytes:
+    """Write files to an archive and return the archive's bytes."""
+    archive = OutputArchive(archive_path)
+    try:
+        for name, data in files.items():
+            archive.add_file(Path(name), data)
+        archive.write_archive()
+    finally:
+        archive.close()
+    return archive_path.read_bytes()
+
+
+def _read_members(archive_path: Path) -> dict[str, bytes]:
+    """Return the content of every member of a zip or tar archive."""
+    if archive_path.suffix == ".zip":
+        with zipfile.ZipFile(archive_path) as archive:
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(archive_path) as archive:
+        return {
+            member.name: archive.extractfile(member).read()  # type: ignore[union-attr]
+            for member in archive.getmembers()
+        }
+
+
+@pytest.mark.parametrize("name", ["site.zip", "site.tar", "site.tar.gz"])
+def test_archive_round_trip_is_deterministic(tmp_path: Path, name: str) -> None:
+    first = _write_archive(tmp_path / "first" / name, ARCHIVE_FILES)
+    reversed_files = dict(reversed(ARCHIVE_FILES.items()))
+    second = _write_archive(tmp_path / "second" / name, reversed_files)
+
+    assert first == second
+    assert _read_members(tmp_path / "first" / name) == ARCHIVE_FILES
+
+
+@pytest.mark.parametrize("name", ["site.zip", "site.tar"])
+def test_index_points_at_member_data(tmp_path: Path, name: str) -> None:
+    archive_path = tmp_path / name
+    data = _write_archive(archive_path, ARCHIVE_FILES)
+    index = json.loads((tmp_path / f"{name}.index.json").read_text())
+
+    assert sorted(index) == sorted(ARCHIVE_FILES)
+    for member, entry in index.items():
+        raw = data[entry["offset"] : entry["offset"] + entry["compressed_size"]]
+        if entry["compression"] == "deflate":
+            raw = zlib.decompress(raw, -zlib.MAX_WBITS)
+        assert raw == ARCHIVE_FILES[member]
+        assert entry["size"] == len(ARCHIVE_FILES[member])
+
+
+def test_compressed_tar_has_no_index(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    (tmp_path / "site.tar.gz.index.json").write_text("{}")
+    data = _write_archive(tmp_path / "site.tar.gz", ARCHIVE_FILES)
+
+    assert not (tmp_path / "site.tar.gz.index.json").exists()
+    # The gzip header's timestamp is zeroed, the members' is fixed
+    assert data[4:8] == bytes(4)
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        mtimes = {member.mtime for member in archive.getmembers()}
+    assert mtimes == {DEFAULT_ARCHIVE_MTIME}
+
+
+def test_site_archive_is_reproducible(build: SiteBuilder, site_dir: Path) -> None:
+    first = site_dir / "first.zip"
+    second = site_dir / "second.zip"
+    assert build(output_archive=first).success
+    assert build(output_archive=second).success
+
+    assert first.read_bytes() == second.read_bytes()
+    members = _read_members(first)
+    assert "content/en/alpha.html" in members
+    assert "static/css/main.css" in members
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from straightshot.config import load_site_context_from_path
+from straightshot.models import ContentProcessingConfig
+from straightshot.preview import PreviewSite
+
+
+def _preview(site_dir: Path, content_config: ContentProcessingConfig) -> PreviewSite:
+    return PreviewSite(
+        lambda: load_site_context_from_path(site_dir / "site.yaml", None),
+        content_config,
+    )
+
+
+def test_index_sees_html_of_other_articles(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    (site_dir / "templates" / "index.html").write_text(
+        "{% for article in articles %}{{ article.html | safe }}{% endfor %}"
+    )
+    preview = _preview(site_dir, content_config)
+
+    index = preview.render_page("/index.html")
+
+    assert index is not None
+    assert b"<p>First article.</p>" in index
+    assert b"<p>Second article.</p>" in index
+    article = preview.render_page("/content/en/alpha.html")
+    assert article is not None and b"<p>First article.</p>" in article
+
+
+def test_article_html_is_released_without_readers(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    preview = _preview(site_dir, content_config)
+
+    assert preview.render_page("/content/en/alpha.html") is not None
+    assert all(not article.html for article in preview.site_context.articles)
+    assert preview.has_page("/content/en/beta.html")
+    assert not preview.has_page("/content/en/gamma.html")
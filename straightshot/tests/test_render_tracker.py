@@ -0,0 +1,150 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from straightshot.config import load_site_context_from_path
+from straightshot.models import BuildResult, ContentProcessingConfig
+from straightshot.template_dependencies import RenderTracker
+from straightshot.templating import create_jinja_environment
+
+SiteBuilder = Callable[..., BuildResult]
+
+ARTICLE_PAGES = {"content/en/alpha.html", "content/en/beta.html"}
+ALL_PAGES = ARTICLE_PAGES | {"index.html"}
+
+
+def test_cold_build_renders_every_page(build: SiteBuilder) -> None:
+    result = build()
+
+    assert result.success
+    assert result.render_reasons == dict.fromkeys(
+        ALL_PAGES, "no record of a previous build"
+    )
+
+
+def test_unchanged_rebuild_keeps_every_page(build: SiteBuilder) -> None:
+    build()
+    result = build()
+
+    assert result.render_reasons == {}
+    assert result.pages_kept == len(ALL_PAGES)
+
+
+def test_template_edit_renders_dependent_pages(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    build()
+    template = site_dir / "templates" / "article.html"
+    template.write_text(
+        template.read_text().replace("{{ page.html", "edited {{ page.html")
+    )
+    result = build()
+
+    assert result.render_reasons == dict.fromkeys(
+        ARTICLE_PAGES, "template article.html changed"
+    )
+    assert result.pages_kept == 1
+    assert (
+        "edited" in (site_dir / "output" / "content" / "en" / "alpha.html").read_text()
+    )
+
+
+def test_base_template_edit_renders_every_page(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    build()
+    template = site_dir / "templates" / "base.html"
+    template.write_text(template.read_text() + "<!-- edited -->\n")
+    result = build()
+
+    assert result.render_reasons == dict.fromkeys(
+        ALL_PAGES, "template base.html changed"
+    )
+
+
+def test_missing_output_file_is_rendered_again(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    build()
+    (site_dir / "output" / "content" / "en" / "beta.html").unlink()
+    result = build()
+
+    assert result.render_reasons == {"content/en/beta.html": "output file missing"}
+    assert (site_dir / "output" / "content" / "en" / "beta.html").is_file()
+
+
+def test_dynamic_include_depends_on_every_template(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    (site_dir / "templates" / "article.html").write_text(
+        """\
+{% extends "base.html" %}
+{% set partial = "empty.html" %}
+{% block body %}{% include partial %}{% endblock %}
+"""
+    )
+    (site_dir / "templates" / "empty.html").write_text("")
+    assert build().success
+    # Only the index uses this template, but article pages could include it
+    template = site_dir / "templates" / "index.html"
+    template.write_text(template.read_text() + "<!-- edited -->\n")
+    result = build()
+
+    assert result.render_reasons == {
+        **dict.fromkeys(
+            ARTICLE_PAGES, "page includes a template chosen at render time"
+        ),
+        "index.html": "template index.html changed",
+    }
+
+
+def test_content_edit_renders_every_page(build: SiteBuilder, site_dir: Path) -> None:
+    build()
+    article = site_dir / "content" / "publish" / "alpha.md"
+    article.write_text(article.read_text() + "More text.\n")
+    result = build()
+
+    assert result.render_reasons == dict.fromkeys(
+        ALL_PAGES, "content or site configuration changed"
+    )
+
+
+def test_archive_output_renders_every_page(build: SiteBuilder, site_dir: Path) -> None:
+    archive = site_dir / "site.zip"
+    build(output_archive=archive)
+    result = build(output_archive=archive)
+
+    assert result.render_reasons == dict.fromkeys(
+        ALL_PAGES, "archive output is always written completely"
+    )
+
+
+def test_page_missing_from_previous_build_is_new(
+    build: SiteBuilder, site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    build()
+    site_context = load_site_context_from_path(
+        site_dir / "site.yaml", content_config.cache_dir
+    )
+    env = create_jinja_environment(
+        content_config.templates_dir, site_context, content_config.content_root
+    )
+    tracker = RenderTracker(env, content_config, site_context)
+
+    assert tracker.compute_render_reason("content/en/gamma.html") == "new page"
+    assert tracker.compute_render_reason("content/en/alpha.html") is None
+
+
+def test_modified_output_file_is_rendered_again(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    build()
+    page = site_dir / "output" / "content" / "en" / "alpha.html"
+    original = page.read_text()
+    # Same size, different content, so only the hash can tell
+    page.write_text(original.swapcase())
+    result = build()
+
+    assert result.render_reasons == {
+        "content/en/alpha.html": "output file was modified"
+    }
+    assert page.read_text() == original
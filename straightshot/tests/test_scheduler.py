@@ -0,0 +1,141 @@
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import pytest
+
+from straightshot.models import BuildResult
+from straightshot.scheduler import (
+    BuildStage,
+    compute_critical_path,
+    compute_stage_dependencies,
+    run_build_stages,
+)
+
+
+def _stage(
+    name: str, inputs: tuple[str, ...] = (), output: str | None = None
+) -> BuildStage:
+    return BuildStage(name, lambda _: None, inputs=inputs, output=output)
+
+
+def _recorder(
+    name: str, log: list[str], value: Any = None
+) -> Callable[[Mapping[str, Any]], Any]:
+    """Return a stage function that logs its name and the inputs it got."""
+
+    def run(inputs: Mapping[str, Any]) -> Any:
+        log.append(f"{name}({', '.join(f'{k}={v}' for k, v in inputs.items())})")
+        return value
+
+    return run
+
+
+def test_dependencies_follow_declared_artifacts() -> None:
+    stages = [
+        _stage("load", output="articles"),
+        _stage("index", inputs=("articles",), output="index"),
+        _stage("pages", inputs=("articles", "index")),
+        _stage("static"),
+    ]
+
+    assert compute_stage_dependencies(stages) == {
+        "load": set(),
+        "index": {"load"},
+        "pages": {"load", "index"},
+        "static": set(),
+    }
+
+
+@pytest.mark.parametrize(
+    ("stages", "message"),
+    [
+        ([_stage("a"), _stage("a")], "Duplicate build stage a"),
+        (
+            [_stage("a", output="x"), _stage("b", output="x")],
+            "Artifact x produced by both a and b",
+        ),
+        (
+            [_stage("a", inputs=("x",))],
+            "Build stage a needs x, which no stage produces",
+        ),
+        (
+            [
+                _stage("a", inputs=("y",), output="x"),
+                _stage("b", inputs=("x",), output="y"),
+            ],
+            "Build stages form a cycle: a, b",
+        ),
+    ],
+)
+def test_invalid_stage_graphs_are_rejected(
+    stages: list[BuildStage], message: str
+) -> None:
+    with pytest.raises(ValueError, match=message):
+        compute_stage_dependencies(stages)
+
+
+def test_critical_path_is_the_slowest_chain() -> None:
+    dependencies = {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}, "e": set()}
+    durations = {"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0, "e": 6.0}
+
+    path = compute_critical_path(dependencies, durations)
+
+    assert [(timing.name, timing.seconds) for timing in path] == [
+        ("a", 1.0),
+        ("b", 5.0),
+        ("d", 1.0),
+    ]
+
+
+def test_critical_path_ignores_stages_that_did_not_finish() -> None:
+    dependencies = {"a": set(), "b": {"a"}, "c": set()}
+
+    path = compute_critical_path(dependencies, {"b": 1.0, "c": 0.5})
+
+    assert [timing.name for timing in path] == ["b"]
+
+
+def test_stages_run_after_their_inputs() -> None:
+    log: list[str] = []
+    stages = [
+        BuildStage("pages", _recorder("pages", log), inputs=["articles", "index"]),
+        BuildStage(
+            "index", _recorder("index", log, 2), inputs=["articles"], output="index"
+        ),
+        BuildStage("load", _recorder("load", log, 1), output="articles"),
+    ]
+    build_result = BuildResult()
+
+    path = run_build_stages(stages, build_result)
+
+    assert build_result.success
+    assert log == ["load()", "index(articles=1)", "pages(articles=1, index=2)"]
+    assert [timing.name for timing in path] == ["load", "index", "pages"]
+
+
+def test_failed_stage_skips_its_dependents() -> None:
+    log: list[str] = []
+
+    def fail(_: Mapping[str, Any]) -> None:
+        raise RuntimeError("disk full")
+
+    stages = [
+        BuildStage("load", fail, output="articles"),
+        BuildStage(
+            "index", _recorder("index", log), inputs=["articles"], output="index"
+        ),
+        BuildStage("pages", _recorder("pages", log), inputs=["index"]),
+        BuildStage("static", _recorder("static", log)),
+    ]
+    build_result = BuildResult()
+
+    path = run_build_stages(stages, build_result, max_workers=1)
+
+    assert not build_result.success
+    assert build_result.errors == ["Build stage load failed: disk full"]
+    assert build_result.warnings == [
+        "Skipped build stage index because load did not complete",
+        "Skipped build stage pages because index did not complete",
+    ]
+    assert log == ["static()"]
+    assert [timing.name for timing in path] == ["static"]
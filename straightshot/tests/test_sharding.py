@@ -0,0 +1,134 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from straightshot.models import BuildResult, ContentFile, ShardSpec
+from straightshot.sharding import (
+    SHARD_MANIFEST_NAME,
+    compute_shard_slice,
+    load_shard_manifest,
+    merge_shard_outputs,
+)
+
+SiteBuilder = Callable[..., BuildResult]
+
+SHARD_COUNT = 3
+
+
+def _content_files(slugs: list[str]) -> list[ContentFile]:
+    return [ContentFile.model_construct(slug=slug) for slug in slugs]
+
+
+def _assign_shards(slugs: list[str]) -> dict[str, int]:
+    """Map every slug to the index of the shard that renders it."""
+    content_files = _content_files(slugs)
+    return {
+        content_file.slug: index
+        for index in range(1, SHARD_COUNT + 1)
+        for content_file in compute_shard_slice(
+            content_files, ShardSpec(index=index, count=SHARD_COUNT)
+        )
+    }
+
+
+def _build_shards(build: SiteBuilder, site_dir: Path) -> list[Path]:
+    """Build both shards of the test site into their own directories."""
+    shard_dirs = []
+    for index in (1, 2):
+        shard_dir = site_dir / f"shard-{index}"
+        result = build(output_dir=shard_dir, shard=ShardSpec(index=index, count=2))
+        assert result.success
+        shard_dirs.append(shard_dir)
+    return shard_dirs
+
+
+def test_shard_slices_partition_the_content() -> None:
+    slugs = [f"article-{i}" for i in range(50)]
+    assignment = _assign_shards(slugs)
+
+    assert sorted(assignment) == sorted(slugs)
+    assert set(assignment.values()) == {1, 2, 3}
+
+
+def test_shard_assignment_is_stable_when_content_changes() -> None:
+    slugs = [f"article-{i}" for i in range(50)]
+    assignment = _assign_shards(slugs)
+    changed = _assign_shards(slugs[5:] + ["new-article"])
+
+    assert all(changed[slug] == assignment[slug] for slug in slugs[5:])
+
+
+def test_merged_shards_hold_every_page(build: SiteBuilder, site_dir: Path) -> None:
+    shard_dirs = _build_shards(build, site_dir)
+    output_dir = site_dir / "merged"
+    result = merge_shard_outputs(shard_dirs, output_dir)
+
+    assert result.success, result.errors
+    for relative_path in (
+        "index.html",
+        "content/en/alpha.html",
+        "content/en/beta.html",
+    ):
+        assert (output_dir / relative_path).is_file()
+    assert set(result.output_files) == {
+        path
+        for shard_dir in shard_dirs
+        for path in load_shard_manifest(shard_dir).files
+    }
+
+
+def test_merged_output_has_combined_manifest(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    shard_dirs = _build_shards(build, site_dir)
+    output_dir = site_dir / "merged"
+    assert merge_shard_outputs(shard_dirs, output_dir).success
+    merged = load_shard_manifest(output_dir)
+
+    assert merged.shard == ShardSpec(index=1, count=1)
+    shard_files = [load_shard_manifest(shard_dir).files for shard_dir in shard_dirs]
+    assert merged.files == {**shard_files[0], **shard_files[1]}
+    assert list(merged.files) == sorted(merged.files)
+    # The merged output is a complete shard set of its own
+    assert merge_shard_outputs([output_dir], site_dir / "copy").success
+
+
+def test_incomplete_shard_set_is_rejected(build: SiteBuilder, site_dir: Path) -> None:
+    shard_dirs = _build_shards(build, site_dir)
+    output_dir = site_dir / "merged"
+    result = merge_shard_outputs(shard_dirs[:1], output_dir)
+
+    assert not result.success
+    assert result.errors == ["Missing output for shards 2/2"]
+    assert not output_dir.exists()
+
+
+def test_overlapping_shard_outputs_are_rejected(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    shard_dirs = _build_shards(build, site_dir)
+    # Claim shard 1's index page for shard 2 as well
+    first = load_shard_manifest(shard_dirs[0])
+    second = load_shard_manifest(shard_dirs[1])
+    second.files["index.html"] = first.files["index.html"]
+    (shard_dirs[1] / SHARD_MANIFEST_NAME).write_text(second.model_dump_json())
+    result = merge_shard_outputs(shard_dirs, site_dir / "merged")
+
+    assert not result.success
+    assert result.errors == [
+        f"Output path index.html written by both {shard_dirs[0]} and {shard_dirs[1]}"
+    ]
+
+
+def test_modified_shard_file_fails_the_merge(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    shard_dirs = _build_shards(build, site_dir)
+    modified = shard_dirs[0] / "index.html"
+    # Same size, different content, so only the hash can tell
+    modified.write_text(modified.read_text().swapcase())
+    result = merge_shard_outputs(shard_dirs, site_dir / "merged")
+
+    assert not result.success
+    assert result.errors == [
+        f"Shard file {modified} does not match its manifest (modified after the build?)"
+    ]
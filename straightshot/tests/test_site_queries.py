@@ -0,0 +1,114 @@
+from datetime import date
+
+from straightshot.models import ContentFile, Metadata, SiteContext
+from straightshot.site_queries import SiteIndex, SiteQueries, get_article_category
+
+
+def _article(
+    reference_slug: str, written: date, topics: list[str], lang: str = "en"
+) -> ContentFile:
+    metadata = Metadata.model_construct(
+        title=reference_slug, written=written, topics=topics, lang=lang
+    )
+    return ContentFile.model_construct(
+        slug=f"{lang}/{reference_slug}",
+        reference_slug=reference_slug,
+        metadata=metadata,
+    )
+
+
+# In site order: newest first
+ARTICLES = [
+    _article("articles/caching", date(2025, 3, 1), ["python", "performance"]),
+    _article("talks/profiling", date(2025, 1, 10), ["performance"]),
+    _article("articles/caching", date(2024, 11, 5), ["python"], lang="de"),
+    _article("articles/typing", date(2024, 6, 1), ["python"]),
+    _article("about", date(2023, 2, 1), []),
+]
+
+
+def _queries(articles: list[ContentFile]) -> SiteQueries:
+    return SiteQueries(SiteContext.model_construct(articles=articles))
+
+
+def _slugs(articles: tuple[ContentFile, ...]) -> list[str]:
+    return [article.slug for article in articles]
+
+
+def test_category_is_the_top_directory() -> None:
+    assert get_article_category(ARTICLES[0]) == "articles"
+    assert get_article_category(ARTICLES[1]) == "talks"
+    assert get_article_category(ARTICLES[4]) is None
+
+
+def test_index_groups_articles_in_site_order() -> None:
+    index = SiteIndex(ARTICLES)
+
+    assert _slugs(index.by_lang["en"]) == [
+        "en/articles/caching",
+        "en/talks/profiling",
+        "en/articles/typing",
+        "en/about",
+    ]
+    assert _slugs(index.by_topic["performance"]) == [
+        "en/articles/caching",
+        "en/talks/profiling",
+    ]
+    assert sorted(index.by_category) == ["articles", "talks"]
+    assert len(index.by_category["articles"]) == 3
+
+
+def test_articles_by_combines_criteria() -> None:
+    queries = _queries(ARTICLES)
+
+    assert _slugs(queries.articles_by(lang="en", topic="python")) == [
+        "en/articles/caching",
+        "en/articles/typing",
+    ]
+    assert _slugs(queries.articles_by(topic="python", category="articles")) == [
+        "en/articles/caching",
+        "de/articles/caching",
+        "en/articles/typing",
+    ]
+    assert queries.articles_by(lang="fr") == ()
+    assert queries.articles_by() == tuple(ARTICLES)
+    assert _slugs(queries.articles_by(topic="python", limit=1)) == [
+        "en/articles/caching"
+    ]
+
+
+def test_recent_and_by_year() -> None:
+    queries = _queries(ARTICLES)
+
+    assert _slugs(queries.recent(2, lang="en")) == [
+        "en/articles/caching",
+        "en/talks/profiling",
+    ]
+    assert [
+        (year, _slugs(articles)) for year, articles in queries.by_year(lang="en")
+    ] == [
+        (2025, ["en/articles/caching", "en/talks/profiling"]),
+        (2024, ["en/articles/typing"]),
+        (2023, ["en/about"]),
+    ]
+
+
+def test_query_results_are_memoized() -> None:
+    queries = _queries(ARTICLES)
+
+    assert queries.articles_by(topic="python") is queries.articles_by(topic="python")
+    assert queries.by_year() is queries.by_year()
+
+
+def test_index_is_rebuilt_when_articles_change() -> None:
+    site_context = SiteContext.model_construct(articles=ARTICLES[:2])
+    queries = SiteQueries(site_context)
+    assert len(queries.articles_by(topic="performance")) == 2
+    assert [year for year, _ in queries.by_year()] == [2025]
+
+    # A new build or preview reload assigns a new article list
+    site_context.articles = ARTICLES[3:]
+
+    assert queries.articles_by(topic="performance") == ()
+    assert _slugs(queries.articles_by(topic="python")) == ["en/articles/typing"]
+    assert [year for year, _ in queries.by_year()] == [2024, 2023]
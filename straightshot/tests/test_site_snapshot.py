@@ -0,0 +1,119 @@
+import os
+from pathlib import Path
+
+from straightshot.builder import load_site_model
+from straightshot.config import load_site_context_from_path
+from straightshot.models import BuildResult, ContentFile, ContentProcessingConfig
+from straightshot.site_snapshot import (
+    get_site_snapshot_path,
+    load_site_snapshot,
+    restore_site_snapshot,
+)
+
+
+def _load(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> tuple[list[ContentFile] | None, str | None]:
+    """Try to restore the site model from the snapshot of a fresh site context."""
+    site_context = load_site_context_from_path(
+        site_dir / "site.yaml", content_config.cache_dir
+    )
+    return restore_site_snapshot(content_config, site_context, BuildResult())
+
+
+def _store(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> list[ContentFile]:
+    """Load the site model the way a build does, which stores the snapshot."""
+    site_context = load_site_context_from_path(
+        site_dir / "site.yaml", content_config.cache_dir
+    )
+    return load_site_model(content_config, site_context, BuildResult())
+
+
+def _describe(content_files: list[ContentFile]) -> list[tuple[object, ...]]:
+    """Summarize the fields and links of a site model for comparison."""
+    return [
+        (
+            content_file.path,
+            content_file.slug,
+            content_file.url,
+            content_file.metadata,
+            content_file.previous and content_file.previous.slug,
+            content_file.next and content_file.next.slug,
+            [related.slug for related in content_file.related],
+        )
+        for content_file in content_files
+    ]
+
+
+def test_snapshot_round_trip_restores_the_site_model(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    loaded = _store(site_dir, content_config)
+    site_language = load_site_context_from_path(site_dir / "site.yaml", None).language
+    snapshot_path = get_site_snapshot_path(content_config, site_language)
+    assert snapshot_path is not None
+    snapshot = load_site_snapshot(snapshot_path)
+    assert snapshot is not None
+    assert [record.slug for record in snapshot.articles] == [
+        content_file.slug for content_file in loaded
+    ]
+
+    restored, fingerprint = _load(site_dir, content_config)
+
+    assert restored is not None
+    assert fingerprint == snapshot.fingerprint
+    assert _describe(restored) == _describe(loaded)
+    assert restored[0].next is restored[1]
+
+
+def test_snapshot_is_invalidated_by_content_edit(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    _store(site_dir, content_config)
+    article = site_dir / "content" / "publish" / "alpha.md"
+    article.write_text(article.read_text().replace("First", "Edited"))
+    # Make sure the edit shows in the modification time, not only the size
+    os.utime(article, ns=(0, 0))
+
+    restored, fingerprint = _load(site_dir, content_config)
+
+    assert restored is None
+    assert fingerprint is not None
+
+
+def test_snapshot_is_invalidated_by_new_content_file(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    _store(site_dir, content_config)
+    alpha = site_dir / "content" / "publish" / "alpha.md"
+    (site_dir / "content" / "publish" / "gamma.md").write_text(
+        alpha.read_text().replace("Alpha", "Gamma")
+    )
+
+    assert _load(site_dir, content_config)[0] is None
+
+
+def test_snapshot_is_invalidated_by_settings(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    _store(site_dir, content_config)
+    changed = content_config.model_copy(
+        update={
+            "required_frontmatter": [*content_config.required_frontmatter, "topics"]
+        }
+    )
+
+    assert _load(site_dir, changed)[0] is None
+    assert _load(site_dir, content_config)[0] is not None
+
+
+def test_disabled_snapshot_is_neither_restored_nor_stored(
+    site_dir: Path, content_config: ContentProcessingConfig
+) -> None:
+    disabled = content_config.model_copy(update={"site_snapshot": False})
+    _store(site_dir, disabled)
+
+    assert _load(site_dir, disabled) == (None, None)
+    assert _load(site_dir, content_config)[0] is None
@@ -0,0 +1,63 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from straightshot.models import BuildResult, SiteContext
+from straightshot.syntax_css import (
+    SYNTAX_CLASSES_CACHE_NAME,
+    render_with_syntax_stylesheet,
+)
+
+SiteBuilder = Callable[..., BuildResult]
+
+STYLESHEET = "static/css/syntax-0123456789ab.css"
+CODE_HTML = '<pre class="highlight"><code><span class="k">def</span></code></pre>'
+
+
+def _render_page(body: str, renders: list[str | None]) -> Callable[[str | None], str]:
+    """Return a render callback that records the stylesheet of every render."""
+
+    def render(syntax_stylesheet: str | None) -> str:
+        renders.append(syntax_stylesheet)
+        return body
+
+    return render
+
+
+def test_page_with_code_from_template_gets_stylesheet() -> None:
+    site_context = SiteContext.model_construct(syntax_stylesheet=STYLESHEET)
+    renders: list[str | None] = []
+
+    render_with_syntax_stylesheet(site_context, _render_page(CODE_HTML, renders))
+
+    assert renders == [None, STYLESHEET]
+
+
+def test_page_without_code_is_rendered_once() -> None:
+    site_context = SiteContext.model_construct(syntax_stylesheet=STYLESHEET)
+    renders: list[str | None] = []
+
+    render_with_syntax_stylesheet(site_context, _render_page("<p>text</p>", renders))
+    render_with_syntax_stylesheet(
+        site_context, _render_page("<p>text</p>", renders), has_code=True
+    )
+
+    assert renders == [None, STYLESHEET]
+
+
+def test_deferred_markdown_stylesheet_covers_used_tokens(
+    build: SiteBuilder, site_dir: Path
+) -> None:
+    site_yaml = site_dir / "site.yaml"
+    site_yaml.write_text(site_yaml.read_text() + "theme:\n  highlight_style: default\n")
+    article = site_dir / "content" / "publish" / "alpha.md"
+    article.write_text(article.read_text() + "\n```python\ndef f(): pass\n```\n")
+    first = build()
+    second = build()
+
+    assert first.success, first.errors
+    assert second.cache_stats[SYNTAX_CLASSES_CACHE_NAME].hits == 2
+    stylesheets = list((site_dir / "output" / "static" / "css").glob("syntax-*.css"))
+    assert len(stylesheets) == 1
+    css = stylesheets[0].read_text()
+    assert ".highlight .k " in css
+    assert ".highlight .nb " not in css
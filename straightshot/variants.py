@@ -0,0 +1,66 @@
+"""
+Multi-variant builds: several outputs of the same site from one content load.
+
+Building a site for staging, production and a mirror under another base URL,
+with or without drafts, repeats the same frontmatter parsing, markdown
+rendering and highlighting every time. A multi-variant build loads the content
+of all variants once and then renders the templates for each variant with its
+own base URL, output directory and subset of the content.
+"""
+
+from pathlib import Path
+
+from straightshot.models import BuildResult, BuildVariant, CacheStats, ContentFile
+
+
+def compute_variant_content_dirs(variants: list[BuildVariant]) -> list[Path]:
+    """Return the content directories of all variants, in order of first use."""
+    content_dirs: list[Path] = []
+    for variant in variants:
+        content_dirs += [d for d in variant.content_dirs if d not in content_dirs]
+    return content_dirs
+
+
+def compute_variant_content(
+    content_files: list[ContentFile], content_dirs: list[Path]
+) -> list[ContentFile]:
+    """Return the content files loaded from the given directories, in site order."""
+    return [
+        content_file
+        for content_file in content_files
+        if any(content_file.path.is_relative_to(d) for d in content_dirs)
+    ]
+
+
+def merge_variant_result(
+    build_result: BuildResult, variant_result: BuildResult, variant: BuildVariant
+) -> None:
+    """
+    Add the outcome of a variant's output generation to the build result.
+
+    Output paths and messages are prefixed with the variant's output directory,
+    as every variant writes the same relative paths.
+    """
+    prefix = variant.output_dir.as_posix()
+    build_result.success = build_result.success and variant_result.success
+    build_result.errors += [f"{prefix}: {error}" for error in variant_result.errors]
+    build_result.warnings += [
+        f"{prefix}: {warning}" for warning in variant_result.warnings
+    ]
+    build_result.peak_in_flight_bytes = max(
+        build_result.peak_in_flight_bytes, variant_result.peak_in_flight_bytes
+    )
+    build_result.pages_kept += variant_result.pages_kept
+    for path, record in variant_result.output_files.items():
+        build_result.output_files[f"{prefix}/{path}"] = record
+    for path, reason in variant_result.render_reasons.items():
+        build_result.render_reasons[f"{prefix}/{path}"] = reason
+    for name, stats in variant_result.cache_stats.items():
+        total = build_result.cache_stats.setdefault(name, CacheStats())
+        total.hits += stats.hits
+        total.misses += stats.misses
+    # The variants are generated one after another
+    build_result.critical_path += [
+        stage.model_copy(update={"name": f"{prefix}:{stage.name}"})
+        for stage in variant_result.critical_path
+    ]